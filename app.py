@@ -1,13 +1,34 @@
 import os
+import sys
 import logging
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+import server_config
+
+# Configure logging: LOG_LEVEL (DEBUG, INFO, WARNING, ...), INFO unless FLASK_DEBUG is set.
+# Libraries that are chatty at DEBUG (PIL, urllib3, ...) follow LIBRARY_LOG_LEVEL instead
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "DEBUG" if os.environ.get("FLASK_DEBUG") == "1" else "INFO").upper()
+logging.basicConfig(level=LOG_LEVEL)
+for _name in ('PIL', 'urllib3', 'weasyprint', 'fontTools', 'asyncio'):
+    logging.getLogger(_name).setLevel(os.environ.get("LIBRARY_LOG_LEVEL", "WARNING").upper())
+
+# Under gunicorn's gevent worker, let psycopg2 yield to other greenlets while it waits on PostgreSQL.
+# Only gunicorn.conf.py imports gevent; elsewhere it is not loaded at all
+GEVENT_PATCHED = False
+if 'gevent' in sys.modules:
+    from gevent import monkey
+    GEVENT_PATCHED = monkey.is_module_patched('socket')
+    if GEVENT_PATCHED:
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            pass
 
 class Base(DeclarativeBase):
     pass
@@ -26,11 +47,64 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_recycle": 300,
     "pool_pre_ping": True,
 }
+if not database_url.startswith("sqlite"):
+    # Pool size, overflow and timeout from the worker count and DB_MAX_CONNECTIONS
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"].update(server_config.pool_options())
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
 # Configure file uploads
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['UPLOAD_MAX_DIMENSION'] = int(os.environ.get("UPLOAD_MAX_DIMENSION", 1600))  # px, longest side
+app.config['UPLOAD_THUMBNAIL_SIZE'] = int(os.environ.get("UPLOAD_THUMBNAIL_SIZE", 320))
+app.config['UPLOAD_JPEG_QUALITY'] = int(os.environ.get("UPLOAD_JPEG_QUALITY", 85))
+app.config['UPLOAD_WORKERS'] = int(os.environ.get("UPLOAD_WORKERS", 2))
+
+# Hand upload bodies to the front proxy instead of streaming them from Python:
+# USE_X_SENDFILE for Apache/lighttpd, UPLOAD_ACCEL_REDIRECT (internal location prefix) for nginx
+app.config['USE_X_SENDFILE'] = os.environ.get("USE_X_SENDFILE", "0") == "1"
+app.config['UPLOAD_ACCEL_REDIRECT'] = os.environ.get("UPLOAD_ACCEL_REDIRECT")  # e.g. /protected-uploads/
+
+# Server-side certificate PDFs
+app.config['CERTIFICATE_CACHE_FOLDER'] = os.environ.get("CERTIFICATE_CACHE_FOLDER", "certificate_cache")
+app.config['CERTIFICATE_FONT_PATH'] = os.environ.get("CERTIFICATE_FONT_PATH")  # e.g. NotoSansDevanagari-Regular.ttf
+app.config['CERTIFICATE_WORKERS'] = int(os.environ.get("CERTIFICATE_WORKERS", os.cpu_count() or 1))
+
+# Background jobs (jobs.py): in-process worker threads per web process (0 when running
+# `flask jobs-worker` separately), heartbeat timeout and how long finished jobs are kept.
+# Under gevent those threads would be greenlets that stall requests during CPU-heavy jobs, so
+# gunicorn.conf.py runs a `flask jobs-worker` process next to the master instead
+app.config['JOB_WORKERS'] = int(os.environ.get("JOB_WORKERS", 0 if GEVENT_PATCHED else 1))
+app.config['JOB_TIMEOUT'] = int(os.environ.get("JOB_TIMEOUT", 3600))  # seconds
+app.config['JOB_RESULT_TTL_DAYS'] = int(os.environ.get("JOB_RESULT_TTL_DAYS", 7))
+app.config['JOB_RESULT_FOLDER'] = os.environ.get("JOB_RESULT_FOLDER", "job_results")
+
+# Cache for dashboard data and rendered listing fragments (cache.py): 'memory' (per-process LRU,
+# for a single worker), 'sqlite' (CACHE_PATH shared by all workers on the host) or 'none'
+app.config['CACHE_BACKEND'] = os.environ.get("CACHE_BACKEND", "memory")
+app.config['CACHE_PATH'] = os.environ.get("CACHE_PATH", "cache.sqlite3")
+app.config['CACHE_TTL'] = int(os.environ.get("CACHE_TTL", 300))  # seconds
+app.config['CACHE_MAX_ENTRIES'] = int(os.environ.get("CACHE_MAX_ENTRIES", 2000))
+
+# Server-sent event streams (push.py) held open per worker process; further clients get a 503
+# and fall back to polling /api/stats. A stream occupies its request for push.STREAM_LIFETIME,
+# which costs a greenlet under gevent but a whole thread otherwise, so without gevent none are
+# served unless PUSH_MAX_CLIENTS says so
+app.config['PUSH_MAX_CLIENTS'] = int(os.environ.get("PUSH_MAX_CLIENTS", 500 if GEVENT_PATCHED else 0))
+
+# Werkzeug hash method for new passwords, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000';
+# existing hashes are upgraded when their owner next logs in
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+# Seconds a logged-in user's row is served from the cache instead of queried per request
+app.config['USER_CACHE_TTL'] = int(os.environ.get("USER_CACHE_TTL", 60))
+
+# Autosaved form drafts (drafts.py): days kept after the last change, and the largest
+# draft accepted (uncompressed JSON bytes)
+app.config['DRAFT_TTL_DAYS'] = int(os.environ.get("DRAFT_TTL_DAYS", 14))
+app.config['DRAFT_MAX_BYTES'] = int(os.environ.get("DRAFT_MAX_BYTES", 64 * 1024))
+
+# Bearer token that lets a Prometheus scraper read /metrics without an admin session
+app.config['METRICS_TOKEN'] = os.environ.get("METRICS_TOKEN")
 
 # Initialize extensions
 db.init_app(app)
@@ -41,14 +115,41 @@ login_manager.login_message = 'कृपया प्रवेश करा / Pl
 
 @login_manager.user_loader
 def load_user(user_id):
-    from models import User
-    return User.query.get(int(user_id))
+    import auth
+    return auth.load_user(user_id)
+
+# Import models (and SchemaVersion, defined in migrations) so they are registered
+import models  # noqa: F401,E402
+import migrations  # noqa: E402
 
-# Create upload directory
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+def init_storage():
+    # Folders, tables and migrations. Under gunicorn this runs once in the master
+    # (gunicorn.conf.py) rather than in every worker; elsewhere from create_app()
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    os.makedirs(app.config['CERTIFICATE_CACHE_FOLDER'], exist_ok=True)
+    os.makedirs(app.config['JOB_RESULT_FOLDER'], exist_ok=True)
+    with app.app_context():
+        db.create_all()
+        logging.info("Database tables created")
+        applied = migrations.upgrade()
+        if applied:
+            logging.info("Applied schema migrations %s", applied)
 
-with app.app_context():
-    # Import models to ensure tables are created
-    import models  # noqa: F401
-    db.create_all()
-    logging.info("Database tables created")
+def create_app(config=None, storage=None):
+    # Every module imports the `app` singleton, so the factory finishes that one instance
+    # instead of building a new one: config overrides, views and CLI commands, then storage.
+    # `import app` alone (jobs, migrations, scripts) skips routes and everything they pull in.
+    # main.py calls this for `main:app`; gunicorn can also load 'app:create_app()'
+    if config:
+        app.config.update(config)
+    import routes  # noqa: F401
+    if click.get_current_context(silent=True) is not None:
+        # Loaded by the `flask` command: add the bench-* and import-* commands, whose modules
+        # web workers only import on demand
+        import benchmark  # noqa: F401
+        import importer  # noqa: F401
+    if storage is None:
+        storage = os.environ.get("INIT_STORAGE", "1") == "1"
+    if storage:
+        init_storage()
+    return app
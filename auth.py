@@ -0,0 +1,75 @@
+import sys
+from functools import lru_cache
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import make_transient_to_detached, object_session
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from app import app, db
+from models import User
+import cache
+
+# Columns of the session principal kept in the cache; never the password hash
+PRINCIPAL_COLUMNS = ('id', 'username', 'email', 'full_name', 'student_id', 'is_admin', 'created_at')
+
+def principal_namespace(user_id):
+    return f'principal:{user_id}'
+
+def _principal_row(user_id):
+    row = db.session.execute(
+        select(*[getattr(User, name) for name in PRINCIPAL_COLUMNS]).where(User.id == user_id)).first()
+    return row._asdict() if row else None
+
+def load_user(user_id):
+    # Flask-Login keeps the result for the rest of the request; across requests the row comes
+    # from the cache for up to USER_CACHE_TTL, or until the user changes
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    row = cache.cached(principal_namespace(user_id), (principal_namespace(user_id),),
+                       lambda: _principal_row(user_id), ttl=app.config['USER_CACHE_TTL'])
+    if row is None:
+        return None
+    user = User(**row)
+    make_transient_to_detached(user)
+    # Attach without a SELECT; attributes left out (password_hash) load on first access
+    return db.session.merge(user, load=False)
+
+def _user_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        cache.invalidate_on_commit(session, principal_namespace(target.id))
+
+event.listen(User, 'after_update', _user_changed)
+event.listen(User, 'after_delete', _user_changed)
+
+def run_blocking(fn, *args):
+    # Hashing releases the GIL, so threaded workers keep serving other requests; a gevent
+    # worker would still stall all its greenlets, so there it runs on the hub's thread pool
+    if 'gevent' not in sys.modules:
+        return fn(*args)
+    from gevent import get_hub, monkey
+    if monkey.is_module_patched('threading'):
+        return get_hub().threadpool.apply(fn, args)
+    return fn(*args)
+
+@lru_cache(maxsize=8)
+def hash_prefix(method):
+    # 'scrypt' is stored as 'scrypt:32768:8:1': compare against what the method really writes
+    return generate_password_hash('', method).split('$', 1)[0]
+
+def hash_password(password, method=None):
+    return run_blocking(generate_password_hash, password, method or app.config['PASSWORD_HASH_METHOD'])
+
+def needs_rehash(password_hash):
+    return password_hash.split('$', 1)[0] != hash_prefix(app.config['PASSWORD_HASH_METHOD'])
+
+def verify_password(user, password):
+    # On success, hashes made with other PASSWORD_HASH_METHOD parameters are replaced;
+    # the caller commits
+    if not run_blocking(check_password_hash, user.password_hash, password):
+        return False
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(password)
+    return True
@@ -0,0 +1,691 @@
+import csv
+import fnmatch
+import io
+import json
+import math
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import click
+from sqlalchemy import Boolean, Date, Integer, event, insert, select, func
+from sqlalchemy.engine import Engine
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from app import app, db
+import auth
+from models import User, Job, AdmissionForm, FORM_MODELS, STUDENT_ID_LIMIT, allocate_student_numbers
+import cache
+import form_schema
+import search
+import stats
+
+# Load benchmark: `flask bench-seed` fills an empty database with realistic volumes and
+# `flask bench-run` drives every route at fixed concurrency, either in-process through the
+# test client or against a running server (--url, which must use the same database).
+# Run it from the project directory (upload paths are relative to it). Submissions write
+# to the database, so point DATABASE_URL at a throwaway copy. `flask bench-startup` times
+# a cold import of the app instead.
+
+BENCH_ADMIN = 'bench_admin'
+BENCH_PASSWORD = 'bench-pass'
+SEED_CHUNK = 5000
+
+# Share of seeded forms per type
+FORM_WEIGHTS = {'admission': 30, 'bonafide': 25, 'hostel': 15, 'case_record': 10, 'pratinidhan': 20}
+STATUS_WEIGHTS = {'pending': 55, 'approved': 35, 'rejected': 10}
+
+FIRST_NAMES = ('आदित्य', 'अनिकेत', 'ओंकार', 'प्रथमेश', 'सोहम', 'ऋषिकेश', 'तेजस', 'विनायक', 'सिद्धार्थ', 'गणेश',
+               'श्रुती', 'प्रियांका', 'सायली', 'ऋतुजा', 'अश्विनी', 'पूजा', 'स्नेहा', 'मृणाल', 'गौरी', 'वैष्णवी')
+LAST_NAMES = ('पाटील', 'जाधव', 'कुलकर्णी', 'देशमुख', 'शिंदे', 'पवार', 'गायकवाड', 'जोशी', 'भोसले', 'चव्हाण',
+              'काळे', 'माने', 'सावंत', 'निकम', 'वाघमारे')
+PLACES = ('पुणे', 'नाशिक', 'सातारा', 'कोल्हापूर', 'सांगली', 'अहमदनगर', 'सोलापूर', 'बारामती', 'लातूर', 'जळगाव')
+CASTES = ('मराठा', 'माळी', 'धनगर', 'महार', 'ब्राह्मण', 'कुणबी', 'वंजारी', 'लिंगायत')
+WORDS = ('चांगले', 'शेतकरी', 'शिक्षक', 'मजूर', 'व्यवसाय', 'नोकरी', 'मराठी', 'हिंदू', 'ग्रामीण', 'शहरी',
+         'माहिती पूर्ण', 'नियमित', 'good', 'farmer', 'service')
+ACADEMIC_YEARS = ('2022-23', '2023-24', '2024-25')
+
+# Endpoints bench-run does not drive, and why
+EXCLUDED_ENDPOINTS = {
+    'static': 'served by the front proxy in production',
+    'logout': 'ends the session the other scenarios reuse',
+    'admin_event_stream': 'long-lived stream, not a request/response',
+    'job_download': 'needs a finished job result file',
+}
+
+_CSRF_FIELD = re.compile(r'name="csrf_token"[^>]*value="([^"]+)"')
+
+# SQL statements issued by the current thread's in-process request; the listener is only
+# attached while bench-run is measuring
+_queries = threading.local()
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_queries, 'active', False):
+        _queries.count += 1
+
+def full_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+def fake_text(name, rng):
+    if 'mobile' in name or 'phone' in name:
+        return f"9{rng.randrange(10 ** 9):09d}"
+    if 'aadhaar' in name:
+        return f"{rng.randrange(10 ** 12):012d}"
+    if name == 'academic_year':
+        return rng.choice(ACADEMIC_YEARS)
+    if name in ('class_standard', 'admission_class'):
+        return str(rng.randint(1, 12))
+    if name == 'division':
+        return rng.choice('ABCD')
+    if name == 'gender':
+        return rng.choice(('male', 'female'))
+    if 'caste' in name:
+        return rng.choice(CASTES)
+    if 'address' in name:
+        return f"{rng.randint(1, 400)}, {rng.choice(LAST_NAMES)} गल्ली, {rng.choice(PLACES)}"
+    if 'name' in name:
+        return full_name(rng)
+    if 'place' in name or name.startswith('birth_') or name == 'hostel_address':
+        return rng.choice(PLACES)
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+
+def fake_value(column, rng):
+    if isinstance(column.type, Date):
+        return date(rng.randint(2006, 2019), rng.randint(1, 12), rng.randint(1, 28))
+    if isinstance(column.type, Boolean):
+        return rng.random() < 0.2
+    if isinstance(column.type, Integer):
+        return rng.randint(0, 11) if column.name.endswith('months') else rng.randint(5, 18)
+    value = fake_text(column.name, rng)
+    length = getattr(column.type, 'length', None)
+    return value[:length] if length else value
+
+def fake_form(form_type, rng):
+    # Values for every field a student submits, keyed like the form schema
+    columns = FORM_MODELS[form_type].__table__.columns
+    return {name: fake_value(columns[name], rng) for name, _ in form_schema.SCHEMAS[form_type].fields}
+
+def form_post_data(values):
+    # Browser encoding: ISO dates, checked boxes as 'y', unchecked ones left out
+    data = {}
+    for name, value in values.items():
+        if value is True:
+            data[name] = 'y'
+        elif value is not False and value is not None:
+            data[name] = value.isoformat() if isinstance(value, date) else str(value)
+    return data
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+def seed(students, forms, seed_value=42):
+    rng = random.Random(seed_value)
+    if db.session.scalar(select(User.id).where(User.username == BENCH_ADMIN)) is not None:
+        raise click.ClickException('This database is already seeded; use a fresh DATABASE_URL')
+
+    # One hash for every account: hashing thousands of passwords would dominate seeding
+    admin = User(username=BENCH_ADMIN, email='bench_admin@example.com', full_name='Bench Admin', is_admin=True)
+    admin.set_password(BENCH_PASSWORD)
+    password_hash = admin.password_hash
+    db.session.add(admin)
+    db.session.commit()
+
+    # Only STUDENT_ID_LIMIT student numbers exist; the remaining accounts have none
+    numbered = allocate_student_numbers(min(students, STUDENT_ID_LIMIT)) if students else []
+    now = datetime.utcnow()
+    user_ids = []
+    for start in range(0, students, SEED_CHUNK):
+        rows = []
+        for index in range(start, min(students, start + SEED_CHUNK)):
+            number = numbered[index] if index < len(numbered) else None
+            rows.append({'username': f"bench{index + 1:05d}", 'email': f"bench{index + 1:05d}@example.com",
+                         'full_name': full_name(rng), 'password_hash': password_hash,
+                         'student_id': f"STU{number:03d}" if number else None, 'is_admin': False,
+                         'created_at': now - timedelta(days=rng.randint(0, 730))})
+        user_ids += db.session.scalars(insert(User).returning(User.id), rows).all()
+        db.session.commit()
+    click.echo(f"Seeded {len(user_ids)} students")
+
+    if forms and user_ids:
+        plan = {form_type: 0 for form_type in FORM_MODELS}
+        for _ in range(forms):
+            plan[_weighted(rng, FORM_WEIGHTS)] += 1
+        for form_type, count in plan.items():
+            model = FORM_MODELS[form_type]
+            for start in range(0, count, SEED_CHUNK):
+                rows = []
+                for _ in range(min(SEED_CHUNK, count - start)):
+                    values = fake_form(form_type, rng)
+                    values.update(user_id=rng.choice(user_ids), status=_weighted(rng, STATUS_WEIGHTS),
+                                  created_at=now - timedelta(minutes=rng.randint(0, 365 * 24 * 60)))
+                    rows.append(values)
+                db.session.execute(insert(model), rows)
+                db.session.commit()
+            click.echo(f"Seeded {count} {form_type} forms")
+
+    # Bulk INSERTs skip the ORM events behind the counters, search index and cache
+    stats.rebuild_form_stats()
+    stats.bump_stats_version()
+    indexed = search.rebuild_index(db.session.connection())
+    db.session.commit()
+    cache.get_backend().clear()
+    click.echo(f"Indexed {indexed} search documents")
+
+class LocalClient:
+    # Requests through the Flask test client, in this process and thread
+    counts_queries = True
+
+    def __init__(self):
+        self.client = app.test_client()
+        self.tokens = {}
+
+    def request(self, method, path, data=None, json=None, files=None, headers=None):
+        if files:
+            data = dict(data or {})
+            data.update({name: (io.BytesIO(body), filename) for name, (filename, body) in files.items()})
+        response = self.client.open(path, method=method, data=data, json=json, headers=headers)
+        body = response.get_data()
+        response.close()
+        return response.status_code, body
+
+    def csrf_token(self, path):
+        if path not in self.tokens:
+            match = _CSRF_FIELD.search(self.request('GET', path)[1].decode('utf-8', 'replace'))
+            self.tokens[path] = match.group(1) if match else None
+        return self.tokens[path]
+
+class HttpClient(LocalClient):
+    # Requests to a running server; its workers do the counting in /metrics
+    counts_queries = False
+
+    def __init__(self, base_url):
+        import requests
+        self.session = requests.Session()
+        self.base_url = base_url.rstrip('/')
+        self.tokens = {}
+
+    def request(self, method, path, data=None, json=None, files=None, headers=None):
+        files = {name: (filename, body) for name, (filename, body) in files.items()} if files else None
+        response = self.session.request(method, self.base_url + path, data=data, json=json, files=files,
+                                        headers=headers, allow_redirects=False)
+        return response.status_code, response.content
+
+def login(client, username):
+    status, _ = client.request('POST', '/login', data={
+        'username': username, 'password': BENCH_PASSWORD, 'csrf_token': client.csrf_token('/login') or ''})
+    if status != 302:
+        raise click.ClickException(f"Login as {username} failed with HTTP {status}")
+
+class Scenario:
+    def __init__(self, name, endpoint, role, path, method='GET', build=None, fresh_session=False, heavy=False):
+        self.name = name
+        self.endpoint = endpoint
+        self.role = role  # None, 'student' or 'admin'
+        self.path = path  # str or fn(rng, context)
+        self.method = method
+        self.build = build  # fn(rng, client, context) -> request kwargs
+        self.fresh_session = fresh_session
+        self.heavy = heavy
+
+class Context:
+    # Ids the scenarios pick from, sampled once from the benchmark database
+    def __init__(self):
+        self.form_ids = {}
+        for form_type, model in FORM_MODELS.items():
+            self.form_ids[form_type] = db.session.scalars(
+                select(model.id).order_by(model.id.desc()).limit(2000)).all()
+        self.student_ids = db.session.scalars(
+            select(User.student_id).where(User.student_id.is_not(None), User.username.like('bench%'))
+            .limit(200)).all()
+        if db.session.scalar(select(func.max(Job.id))) is None:
+            # job_status needs a job to look at
+            db.session.add(Job(kind='reindex_search', status='succeeded', result='{}',
+                               finished_at=datetime.utcnow()))
+            db.session.commit()
+        self.photo = self._image()
+        self._upload = None
+
+    @staticmethod
+    def _image():
+        try:
+            from PIL import Image
+        except ImportError:
+            return b'\xff\xd8\xff\xd9'
+        buffer = io.BytesIO()
+        Image.new('RGB', (1200, 900), (200, 180, 150)).save(buffer, 'JPEG', quality=85)
+        return buffer.getvalue()
+
+    def photo_file(self, rng):
+        # A random trailer after the JPEG end marker keeps content-addressed uploads from deduplicating
+        return ('photo.jpg', self.photo + rng.randbytes(16))
+
+    def form_id(self, rng, form_type):
+        ids = self.form_ids[form_type]
+        return rng.choice(ids) if ids else 0
+
+    def upload(self):
+        if self._upload is None:
+            with app.app_context():
+                self._upload = db.session.scalar(
+                    select(AdmissionForm.student_photo).where(AdmissionForm.student_photo.is_not(None))
+                    .order_by(AdmissionForm.id.desc()).limit(1)) or 'missing.jpg'
+        return self._upload
+
+    def job_id(self):
+        with app.app_context():
+            return db.session.scalar(select(func.max(Job.id))) or 0
+
+def _submission(form_type, csrf_path=None, files=()):
+    def build(rng, client, context):
+        data = form_post_data(fake_form(form_type, rng))
+        if csrf_path:
+            data['csrf_token'] = client.csrf_token(csrf_path) or ''
+        return {'data': data, 'files': {name: context.photo_file(rng) for name in files}}
+    return build
+
+def _api_forms(rng, client, context):
+    items = [{name: value.isoformat() if isinstance(value, date) else value
+              for name, value in fake_form('bonafide', rng).items()} for _ in range(10)]
+    return {'json': items}
+
+def _draft_patch(rng, client, context):
+    # What autosave sends after a pause in typing: the two or three fields just edited
+    values = form_post_data(fake_form('case_record', rng))
+    return {'json': {name: values[name] for name in rng.sample(sorted(values), min(3, len(values)))}}
+
+def _import_csv(rng, client, context):
+    schema = form_schema.SCHEMAS['bonafide']
+    handle = io.StringIO()
+    writer = csv.writer(handle)
+    names = sorted(schema.field_names)
+    writer.writerow(['student_id'] + names)
+    for _ in range(20):
+        values = form_post_data(fake_form('bonafide', rng))
+        writer.writerow([rng.choice(context.student_ids) if context.student_ids else ''] +
+                        [values.get(name, '') for name in names])
+    return {'data': {'kind': 'bonafide', 'csrf_token': client.csrf_token('/admin/import') or ''},
+            'files': {'file': ('bench.csv', handle.getvalue().encode('utf-8'))}}
+
+def scenarios():
+    month_ago = (date.today() - timedelta(days=30)).isoformat()
+    items = [
+        Scenario('index', 'index', None, '/'),
+        Scenario('login_page', 'login', None, '/login'),
+        Scenario('register_page', 'register', None, '/register'),
+        Scenario('login', 'login', None, '/login', 'POST', fresh_session=True, build=lambda rng, client, context: {
+            'data': {'username': f"bench{rng.randint(1, max(1, len(context.student_ids))):05d}",
+                     'password': BENCH_PASSWORD, 'csrf_token': client.csrf_token('/login') or ''}}),
+        Scenario('student_dashboard', 'student_dashboard', 'student', '/student_dashboard'),
+        Scenario('admin_dashboard', 'admin_dashboard', 'admin', '/admin_dashboard'),
+        Scenario('api_stats_student', 'api_stats', 'student', '/api/stats'),
+        Scenario('api_stats_admin', 'api_stats', 'admin', '/api/stats'),
+    ]
+    for form_type in FORM_MODELS:
+        items.append(Scenario(f'{form_type}_form_page', f'{form_type}_form', 'student', f'/{form_type}_form'))
+    items += [
+        Scenario('submit_admission', 'admission_form', 'student', '/admission_form', 'POST',
+                 _submission('admission', '/admission_form', files=('student_photo', 'parent_photo'))),
+        Scenario('submit_bonafide', 'bonafide_form', 'student', '/bonafide_form', 'POST',
+                 _submission('bonafide', '/bonafide_form')),
+        Scenario('submit_hostel', 'hostel_form', 'student', '/hostel_form', 'POST',
+                 _submission('hostel', files=('parent_signature', 'student_signature'))),
+        Scenario('submit_case_record', 'case_record_form', 'student', '/case_record_form', 'POST',
+                 _submission('case_record')),
+        Scenario('submit_pratinidhan', 'pratinidhan_form', 'student', '/pratinidhan_form', 'POST',
+                 _submission('pratinidhan')),
+        Scenario('api_submit_forms', 'api_submit_forms', 'student', '/api/forms/bonafide', 'POST', _api_forms),
+        Scenario('draft_patch', 'api_draft', 'student', '/api/drafts/case_record', 'PATCH', _draft_patch),
+        Scenario('draft_load', 'api_draft', 'student', '/api/drafts/case_record'),
+        Scenario('form_success', 'form_success', 'student',
+                 lambda rng, context: f"/form_success/bonafide/{context.form_id(rng, 'bonafide')}"),
+        Scenario('uploaded_file', 'uploaded_file', 'student', lambda rng, context: f"/uploads/{context.upload()}"),
+        Scenario('bonafide_certificate', 'bonafide_certificate', 'admin',
+                 lambda rng, context: f"/bonafide_certificate/{context.form_id(rng, 'bonafide')}"),
+        Scenario('certificate_pdf', 'certificate_pdf', 'admin',
+                 lambda rng, context: f"/certificate/bonafide/{context.form_id(rng, 'bonafide')}.pdf", heavy=True),
+        Scenario('certificate_bundle', 'certificate_bundle', 'admin',
+                 '/admin/certificates/bonafide?format=zip&class_standard=5&division=A&academic_year=2024-25',
+                 heavy=True),
+    ]
+    for form_type in FORM_MODELS:
+        items.append(Scenario(f'admin_forms_{form_type}', 'admin_forms', 'admin', f'/admin/forms/{form_type}'))
+    items += [
+        Scenario('admin_forms_filtered', 'admin_forms', 'admin',
+                 lambda rng, context: f"/admin/forms/bonafide?status=pending&class_standard={rng.randint(1, 12)}"),
+        Scenario('export_forms', 'export_forms', 'admin',
+                 f'/admin/forms/bonafide/export?format=csv&status=rejected&date_from={month_ago}', heavy=True),
+        Scenario('admin_search', 'admin_search', 'admin',
+                 lambda rng, context: f"/admin/search?q={rng.choice(FIRST_NAMES)}+{rng.choice(LAST_NAMES)}"),
+        Scenario('admin_import_page', 'admin_import', 'admin', '/admin/import'),
+        Scenario('admin_import', 'admin_import', 'admin', '/admin/import', 'POST', _import_csv, heavy=True),
+        Scenario('admin_metrics', 'admin_metrics', 'admin', '/admin/metrics'),
+        Scenario('prometheus_metrics', 'prometheus_metrics', 'admin', '/metrics'),
+        Scenario('turnaround_report', 'turnaround_report', 'admin', '/admin/reports/turnaround'),
+        Scenario('form_history', 'form_history', 'admin',
+                 lambda rng, context: f"/admin/form/bonafide/{context.form_id(rng, 'bonafide')}/history"),
+        Scenario('update_form_status', 'update_form_status', 'admin',
+                 lambda rng, context: f"/admin/form/bonafide/{context.form_id(rng, 'bonafide')}/update_status",
+                 'POST', lambda rng, client, context: {'data': {'status': rng.choice(list(STATUS_WEIGHTS))}}),
+        Scenario('bulk_update_status', 'bulk_update_status', 'admin', '/admin/forms/bonafide/bulk_status', 'POST',
+                 lambda rng, client, context: {'json': {
+                     'status': rng.choice(list(STATUS_WEIGHTS)),
+                     'ids': rng.sample(context.form_ids['bonafide'], min(20, len(context.form_ids['bonafide'])))}}),
+        Scenario('admin_jobs', 'admin_jobs', 'admin', '/admin/jobs'),
+        Scenario('job_status', 'job_status', 'admin', lambda rng, context: f"/admin/jobs/{context.job_id()}"),
+    ]
+    return items
+
+def uncovered_endpoints(items):
+    covered = {scenario.endpoint for scenario in items} | set(EXCLUDED_ENDPOINTS)
+    return sorted({rule.endpoint for rule in app.url_map.iter_rules()} - covered)
+
+def percentile(values, q):
+    # Nearest-rank percentile of sorted values
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+def _make_client(url):
+    return HttpClient(url) if url else LocalClient()
+
+def run_scenario(scenario, context, url, concurrency, requests, warmup):
+    latencies = []
+    query_counts = []
+    failures = []
+    lock = threading.Lock()
+    issued = iter(range(requests))
+    ready = threading.Barrier(concurrency + 1)
+
+    def one(client, rng):
+        if scenario.fresh_session:
+            client = _make_client(url)
+        path = scenario.path(rng, context) if callable(scenario.path) else scenario.path
+        kwargs = scenario.build(rng, client, context) if scenario.build else {}
+        _queries.active, _queries.count = True, 0
+        start = time.perf_counter()
+        try:
+            status, _ = client.request(scenario.method, path, **kwargs)
+        finally:
+            _queries.active = False
+        return time.perf_counter() - start, status, _queries.count
+
+    def worker(index):
+        rng = random.Random(f"{scenario.name}:{index}")
+        try:
+            client = _make_client(url)
+            if scenario.role == 'admin':
+                login(client, BENCH_ADMIN)
+            elif scenario.role == 'student':
+                login(client, f"bench{index + 1:05d}")
+            for _ in range(warmup):
+                one(client, rng)
+        except Exception as e:
+            with lock:
+                failures.append(repr(e))
+            client = None
+        ready.wait()
+        if client is None:
+            return
+        for _ in issued:
+            elapsed, status, queries = one(client, rng)
+            with lock:
+                latencies.append(elapsed)
+                query_counts.append(queries)
+                if status >= 400:
+                    failures.append(status)
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    ready.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'endpoint': scenario.endpoint,
+        'requests': len(latencies),
+        'errors': len(failures),
+        'mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'rps': len(latencies) / wall if wall else 0.0,
+        'queries': sum(query_counts) / len(query_counts) if query_counts and not url else None,
+    }
+
+def _server_query_counts(url):
+    # Query and request totals per endpoint from the server's /metrics. Exact only with one worker
+    # process, and the untimed setup requests (logins, CSRF token pages) are counted in too
+    client = HttpClient(url)
+    login(client, BENCH_ADMIN)
+    status, body = client.request('GET', '/metrics')
+    totals = {}
+    if status == 200:
+        for metric, endpoint, value in re.findall(
+                r'^(harmony_request_queries_total|harmony_request_duration_seconds_count)'
+                r'\{endpoint="([^"]+)"\} (\S+)$', body.decode('utf-8'), re.MULTILINE):
+            totals[(metric, endpoint)] = float(value)
+    return totals
+
+def compare(results, baseline, tolerance):
+    # Regressions against a stored run: slower p95, lower throughput or more queries per request
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms")
+        if current['rps'] < previous['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['rps']:.1f} -> {current['rps']:.1f} req/s")
+        if None not in (current['queries'], previous.get('queries')) and current['queries'] > previous['queries'] + 0.5:
+            regressions.append(f"{name}: queries {previous['queries']:.1f} -> {current['queries']:.1f} per request")
+    return regressions
+
+def _report_line(name, result, previous=None):
+    line = (f"{name:<28} {result['requests']:>6} {result['errors']:>5} {result['p50_ms']:>9.1f} "
+            f"{result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['rps']:>8.1f} "
+            f"{result['queries'] if result['queries'] is not None else float('nan'):>7.1f}")
+    if previous and previous.get('p95_ms'):
+        line += f"  p95 {(result['p95_ms'] / previous['p95_ms'] - 1) * 100:+.0f}%"
+    return line
+
+@app.cli.command('bench-seed')
+@click.option('--students', type=int, default=3000, help='Student accounts to create')
+@click.option('--forms', type=int, default=200000, help='Forms spread across the five form types')
+@click.option('--seed', 'seed_value', type=int, default=42, help='Random seed, for reproducible data')
+def bench_seed_command(students, forms, seed_value):
+    """Fill an empty database with benchmark users and forms (Marathi text included)."""
+    started = time.perf_counter()
+    seed(students, forms, seed_value)
+    click.echo(f"Seeded in {time.perf_counter() - started:.1f}s; log in as {BENCH_ADMIN} / {BENCH_PASSWORD}")
+
+@app.cli.command('bench-run')
+@click.option('--concurrency', type=int, default=4, help='Clients issuing requests at the same time')
+@click.option('--requests', 'request_count', type=int, default=200, help='Measured requests per scenario')
+@click.option('--warmup', type=int, default=2, help='Unmeasured requests per client before measuring')
+@click.option('--url', default=None, help='Benchmark a running server instead of the in-process app')
+@click.option('--only', multiple=True, help='Scenario name patterns to run (e.g. "admin_*")')
+@click.option('--heavy', is_flag=True, help='Include exports, PDF certificates and CSV imports')
+@click.option('--output', type=click.Path(), default=None, help='Write the results as JSON')
+@click.option('--baseline', type=click.Path(), default=None, help='Stored results to compare against')
+@click.option('--save-baseline', is_flag=True, help='Store these results as the new baseline')
+@click.option('--tolerance', type=float, default=0.25, help='Allowed p95/throughput drift before failing')
+def bench_run_command(concurrency, request_count, warmup, url, only, heavy, output, baseline,
+                      save_baseline, tolerance):
+    """Drive every route at fixed concurrency and report latency, throughput and queries."""
+    event.listen(Engine, 'after_cursor_execute', _count_query)
+    try:
+        _bench_run(concurrency, request_count, warmup, url, only, heavy, output, baseline,
+                   save_baseline, tolerance)
+    finally:
+        event.remove(Engine, 'after_cursor_execute', _count_query)
+
+def _bench_run(concurrency, request_count, warmup, url, only, heavy, output, baseline,
+               save_baseline, tolerance):
+    if db.session.scalar(select(User.id).where(User.username == BENCH_ADMIN)) is None:
+        raise click.ClickException('Run `flask bench-seed` against this database first')
+    items = [scenario for scenario in scenarios()
+             if (heavy or not scenario.heavy) and (not only or any(fnmatch.fnmatch(scenario.name, pattern)
+                                                                   for pattern in only))]
+    for endpoint in uncovered_endpoints(scenarios()):
+        click.echo(f"warning: no scenario covers endpoint {endpoint}", err=True)
+    context = Context()
+    db.session.remove()
+    previous_run = {}
+    if baseline and os.path.exists(baseline):
+        with open(baseline, encoding='utf-8') as handle:
+            previous_run = json.load(handle)
+
+    click.echo(f"{'scenario':<28} {'reqs':>6} {'errs':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+               f"{'req/s':>8} {'queries':>7}")
+    results = {}
+    for scenario in items:
+        before = _server_query_counts(url) if url else None
+        result = run_scenario(scenario, context, url, concurrency, request_count, warmup)
+        if url:
+            after = _server_query_counts(url)
+            key_queries = ('harmony_request_queries_total', scenario.endpoint)
+            key_count = ('harmony_request_duration_seconds_count', scenario.endpoint)
+            served = after.get(key_count, 0) - before.get(key_count, 0)
+            if served:
+                result['queries'] = (after.get(key_queries, 0) - before.get(key_queries, 0)) / served
+        results[scenario.name] = result
+        click.echo(_report_line(scenario.name, result, previous_run.get('scenarios', {}).get(scenario.name)))
+
+    run = {
+        'meta': {'at': datetime.utcnow().isoformat(timespec='seconds'), 'mode': 'http' if url else 'in-process',
+                 'database': db.engine.dialect.name, 'concurrency': concurrency, 'requests': request_count,
+                 'cpus': os.cpu_count(), 'python': platform.python_version()},
+        'scenarios': results,
+    }
+    if output:
+        with open(output, 'w', encoding='utf-8') as handle:
+            json.dump(run, handle, indent=2)
+    if baseline and save_baseline:
+        with open(baseline, 'w', encoding='utf-8') as handle:
+            json.dump(run, handle, indent=2)
+        click.echo(f"Baseline saved to {baseline}")
+    elif previous_run:
+        regressions = compare(results, previous_run, tolerance)
+        for regression in regressions:
+            click.echo(f"REGRESSION {regression}", err=True)
+        if regressions:
+            raise SystemExit(1)
+        click.echo(f"No regressions against {baseline}")
+
+# Hash settings compared by bench-login besides PASSWORD_HASH_METHOD
+LOGIN_HASH_METHODS = ('scrypt:32768:8:1', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000', 'pbkdf2:sha256:260000')
+
+def verifications_per_second(password_hash, threads, seconds):
+    # Password checks completed by `threads` threads in `seconds`, through the same
+    # offloading the login view uses
+    done = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def worker(index):
+        while time.perf_counter() < deadline:
+            auth.run_blocking(check_password_hash, password_hash, BENCH_PASSWORD)
+            done[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sum(done) / (time.perf_counter() - started)
+
+@app.cli.command('bench-login')
+@click.option('--method', 'methods', multiple=True, help='Werkzeug hash methods to measure')
+@click.option('--threads', type=int, default=None, help='Concurrent logins (default: CPU count)')
+@click.option('--seconds', type=float, default=3.0, help='Measuring time per method')
+def bench_login_command(methods, threads, seconds):
+    """Password verifications per second per core for each hash setting."""
+    cpus = os.cpu_count() or 1
+    threads = threads or cpus
+    methods = methods or (app.config['PASSWORD_HASH_METHOD'],) + LOGIN_HASH_METHODS
+    click.echo(f"{'method':<24} {'ms/login':>9} {'1 thread/s':>11} {f'{threads} threads/s':>13} {'per core/s':>11}")
+    for method in dict.fromkeys(auth.hash_prefix(method) for method in methods):
+        password_hash = generate_password_hash(BENCH_PASSWORD, method)
+        single = verifications_per_second(password_hash, 1, seconds)
+        parallel = verifications_per_second(password_hash, threads, seconds)
+        click.echo(f"{method:<24} {1000 / single:>9.1f} {single:>11.1f} "
+                   f"{parallel:>13.1f} {parallel / min(threads, cpus):>11.1f}")
+
+# Cold start: `import main` in fresh interpreters with CPython's import profiler, i.e. what each
+# gunicorn master (or worker without preload) and every `flask` command pays before serving
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+_IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+def import_profile(storage=False):
+    # (wall ms including interpreter start, {module: (self ms, cumulative ms)})
+    env = dict(os.environ, INIT_STORAGE='1' if storage else '0')
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                            cwd=PROJECT_DIR, env=env, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+    if result.returncode:
+        raise click.ClickException(f"import main failed: {result.stderr.strip().splitlines()[-1]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)) / 1000, int(match.group(2)) / 1000)
+    return wall_ms, modules
+
+def project_modules():
+    return {name[:-3] for name in os.listdir(PROJECT_DIR) if name.endswith('.py')}
+
+@app.cli.command('bench-startup')
+@click.option('--runs', type=int, default=5, help='Fresh interpreters to start; medians are reported')
+@click.option('--top', type=int, default=15, help='Modules to list by their own import time')
+@click.option('--storage', is_flag=True, help='Include folder, table and migration setup (INIT_STORAGE=1)')
+@click.option('--baseline', type=click.Path(), default=None, help='Stored results to compare against')
+@click.option('--save-baseline', is_flag=True, help='Store these results as the new baseline')
+@click.option('--tolerance', type=float, default=0.25, help='Allowed startup time drift before failing')
+def bench_startup_command(runs, top, storage, baseline, save_baseline, tolerance):
+    """Cold import time of the app and the modules that account for it."""
+    profiles = [import_profile(storage) for _ in range(max(1, runs))]
+    # Medians per module across runs: a single cold start is noisy
+    names = set.intersection(*(set(modules) for _, modules in profiles))
+    modules = {name: (percentile(sorted(m[name][0] for _, m in profiles), 0.5),
+                      percentile(sorted(m[name][1] for _, m in profiles), 0.5)) for name in names}
+    result = {'wall_ms': percentile(sorted(wall for wall, _ in profiles), 0.5),
+              'import_ms': modules['main'][1],
+              'modules': {name: modules[name][1] for name in sorted(project_modules() & names)}}
+
+    click.echo(f"{'process start + import main':<32} {result['wall_ms']:>9.1f} ms")
+    click.echo(f"{'import main':<32} {result['import_ms']:>9.1f} ms")
+    click.echo(f"\n{'slowest modules':<40} {'self ms':>9} {'cumul. ms':>9}")
+    for name, (self_ms, cumulative_ms) in sorted(modules.items(), key=lambda item: -item[1][0])[:top]:
+        click.echo(f"{name:<40} {self_ms:>9.1f} {cumulative_ms:>9.1f}")
+    click.echo(f"\n{'project modules':<40} {'cumul. ms':>9}")
+    for name, cumulative_ms in sorted(result['modules'].items(), key=lambda item: -item[1]):
+        click.echo(f"{name:<40} {cumulative_ms:>9.1f}")
+
+    result['meta'] = {'at': datetime.utcnow().isoformat(timespec='seconds'), 'runs': runs,
+                      'storage': storage, 'python': platform.python_version()}
+    if baseline and save_baseline:
+        with open(baseline, 'w', encoding='utf-8') as handle:
+            json.dump(result, handle, indent=2)
+        click.echo(f"Baseline saved to {baseline}")
+    elif baseline and os.path.exists(baseline):
+        with open(baseline, encoding='utf-8') as handle:
+            previous = json.load(handle)
+        regressions = [f"{key}: {previous[key]:.1f} -> {result[key]:.1f} ms" for key in ('wall_ms', 'import_ms')
+                       if result[key] > previous[key] * (1 + tolerance)]
+        for regression in regressions:
+            click.echo(f"REGRESSION {regression}", err=True)
+        if regressions:
+            raise SystemExit(1)
+        click.echo(f"No regressions against {baseline}")
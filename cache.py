@@ -0,0 +1,211 @@
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import click
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from app import app
+from models import User
+
+# Cached values are tagged with the generation of each namespace they depend on:
+#   'stats'            any form created or moved between statuses, any user added
+#   'forms:<type>'     forms of that type
+#   'user:<id>'        forms owned by that student
+#   'users'            user rows (names shown in listings, student count)
+# Writers bump generations after their transaction commits, so stale entries are
+# simply never looked up again and age out of the backend.
+
+class MemoryBackend:
+    # Per-process LRU; generations are per process too, so only use it with one worker
+    # (or accept up to CACHE_TTL of staleness in the other workers)
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def get_generations(self, namespaces):
+        with self.lock:
+            return [self.generations.get(namespace, 0) for namespace in namespaces]
+
+    def bump(self, namespaces):
+        with self.lock:
+            for namespace in namespaces:
+                self.generations[namespace] = self.generations.get(namespace, 0) + 1
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.entries[key] = (time.time() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.generations.clear()
+
+class SQLiteBackend:
+    # One file shared by every worker process on the host, so invalidation reaches all of them
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self.local = threading.local()
+        with self._connect() as connection:
+            connection.executescript(
+                "CREATE TABLE IF NOT EXISTS cache_entry ("
+                "  key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value BLOB NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS ix_cache_entry_expires ON cache_entry (expires_at);"
+                "CREATE TABLE IF NOT EXISTS cache_generation ("
+                "  namespace TEXT PRIMARY KEY, generation INTEGER NOT NULL);")
+
+    def _connect(self):
+        # One connection per thread and process; WAL lets readers proceed during writes
+        connection = getattr(self.local, 'connection', None)
+        if connection is None or self.local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+            self.local.pid = os.getpid()
+        return connection
+
+    def get_generations(self, namespaces):
+        placeholders = ','.join('?' * len(namespaces))
+        rows = dict(self._connect().execute(
+            f"SELECT namespace, generation FROM cache_generation WHERE namespace IN ({placeholders})",
+            list(namespaces)).fetchall())
+        return [rows.get(namespace, 0) for namespace in namespaces]
+
+    def bump(self, namespaces):
+        self._connect().executemany(
+            "INSERT INTO cache_generation (namespace, generation) VALUES (?, 1) "
+            "ON CONFLICT (namespace) DO UPDATE SET generation = generation + 1",
+            [(namespace,) for namespace in namespaces])
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT expires_at, value FROM cache_entry WHERE key = ? AND expires_at >= ?",
+            (key, time.time())).fetchone()
+        return (row[0], pickle.loads(row[1])) if row else None
+
+    def set(self, key, value, ttl):
+        connection = self._connect()
+        connection.execute("INSERT OR REPLACE INTO cache_entry (key, expires_at, value) VALUES (?, ?, ?)",
+                           (key, time.time() + ttl, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+        if random.random() < 0.01:
+            # Occasional sweep of expired and surplus entries
+            connection.execute("DELETE FROM cache_entry WHERE expires_at < ?", (time.time(),))
+            connection.execute(
+                "DELETE FROM cache_entry WHERE key IN (SELECT key FROM cache_entry "
+                "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def clear(self):
+        self._connect().executescript("DELETE FROM cache_entry; DELETE FROM cache_generation;")
+
+class NullBackend:
+    def get_generations(self, namespaces):
+        return [0] * len(namespaces)
+
+    def bump(self, namespaces):
+        pass
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def clear(self):
+        pass
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                kind = app.config['CACHE_BACKEND']
+                max_entries = app.config['CACHE_MAX_ENTRIES']
+                if kind == 'sqlite':
+                    _backend = SQLiteBackend(app.config['CACHE_PATH'], max_entries)
+                elif kind == 'memory':
+                    _backend = MemoryBackend(max_entries)
+                else:
+                    _backend = NullBackend()
+    return _backend
+
+def cached(name, namespaces, compute, ttl=None):
+    # Returns compute() from the cache while none of `namespaces` has been invalidated
+    backend = get_backend()
+    generations = backend.get_generations(namespaces)
+    key = name + '|' + ','.join(f"{namespace}={generation}"
+                                for namespace, generation in zip(namespaces, generations))
+    entry = backend.get(key)
+    if entry is not None:
+        return entry[1]
+    value = compute()
+    backend.set(key, value, ttl or app.config['CACHE_TTL'])
+    return value
+
+def invalidate(*namespaces):
+    get_backend().bump(namespaces)
+
+def invalidate_on_commit(session, *namespaces):
+    # Bumped after COMMIT: bumping earlier would let a concurrent reader cache
+    # pre-commit data under the new generation
+    session.info.setdefault('cache_namespaces', set()).update(namespaces)
+
+def form_namespaces(form_type, user_ids=()):
+    return ('stats', f'forms:{form_type}', *(f'user:{user_id}' for user_id in user_ids))
+
+@event.listens_for(Session, 'after_commit')
+def _bump_staged_namespaces(session):
+    namespaces = session.info.pop('cache_namespaces', None)
+    if namespaces:
+        invalidate(*sorted(namespaces))
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_staged_namespaces(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('cache_namespaces', None)
+
+def _user_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        invalidate_on_commit(session, 'users', 'stats')
+
+def _user_updated(mapper, connection, target):
+    # A password rehash on login changes nothing listings or counters show
+    state = inspect(target)
+    if any(state.attrs[attr.key].history.has_changes()
+           for attr in mapper.column_attrs if attr.key != 'password_hash'):
+        _user_changed(mapper, connection, target)
+
+event.listen(User, 'after_insert', _user_changed)
+event.listen(User, 'after_update', _user_updated)
+
+@app.cli.command('cache-clear')
+def cache_clear_command():
+    """Drop every cached dashboard and listing fragment."""
+    get_backend().clear()
+    click.echo('Cache cleared')
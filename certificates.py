@@ -0,0 +1,134 @@
+import glob
+import io
+import logging
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import cache
+
+from flask import current_app, render_template
+from sqlalchemy.orm import joinedload
+from werkzeug.utils import secure_filename
+
+from models import BonafideForm, PratinidhanForm
+
+CERTIFICATE_MODELS = {
+    'bonafide': BonafideForm,
+    'pratinidhan': PratinidhanForm
+}
+
+CERTIFICATE_TITLES = {
+    'bonafide': 'प्रतिनिधान प्रमाणपत्र (Bonafide Certificate)',
+    'pratinidhan': 'प्रतिनिधान प्रमाणपत्र (Pratinidhan Certificate)'
+}
+
+_pool = None
+
+@cache
+def pdf_renderer_available():
+    # Probed once per process: a failed import is not retried on every request
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError) as e:
+        # OSError: the Pango/HarfBuzz system libraries WeasyPrint shapes Devanagari with are missing
+        logging.warning("PDF certificates disabled: %s", e)
+        return False
+    return True
+
+def html_to_pdf(html, base_url):
+    # Runs inside the process pool, so it must stay a plain module-level function
+    from weasyprint import HTML
+    return HTML(string=html, base_url=base_url).write_pdf()
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=current_app.config['CERTIFICATE_WORKERS'])
+    return _pool
+
+def cache_path(form_type, form):
+    modified = form.updated_at or form.created_at
+    return os.path.join(current_app.config['CERTIFICATE_CACHE_FOLDER'],
+                        f"{form_type}_{form.id}_{modified.strftime('%Y%m%d%H%M%S%f')}.pdf")
+
+def render_certificate_html(form_type, form):
+    font_path = current_app.config.get('CERTIFICATE_FONT_PATH')
+    return render_template('certificate_pdf.html',
+                           certificate=form,
+                           student=form.student,
+                           title=CERTIFICATE_TITLES[form_type],
+                           font_url=f"file://{os.path.abspath(font_path)}" if font_path else None)
+
+def _store(form_type, form, pdf):
+    path = cache_path(form_type, form)
+    # Drop renders of older versions of this form before writing the new one
+    for stale in glob.glob(os.path.join(os.path.dirname(path), f"{form_type}_{form.id}_*.pdf")):
+        os.remove(stale)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as handle:
+        handle.write(pdf)
+    os.replace(tmp_path, path)
+    return path
+
+def render_certificates(form_type, forms):
+    # Returns cached PDF paths in the order of `forms`, rendering misses across the process pool
+    paths = {}
+    missing = []
+    for form in forms:
+        path = cache_path(form_type, form)
+        if os.path.exists(path):
+            paths[form.id] = path
+        else:
+            missing.append(form)
+
+    if missing:
+        base_url = current_app.root_path
+        htmls = [render_certificate_html(form_type, form) for form in missing]
+        if len(missing) == 1:
+            # Off the gevent hub: WeasyPrint takes hundreds of milliseconds of CPU per page
+            from auth import run_blocking
+            pdfs = [run_blocking(html_to_pdf, htmls[0], base_url)]
+        else:
+            pdfs = _get_pool().map(html_to_pdf, htmls, [base_url] * len(htmls))
+        for form, pdf in zip(missing, pdfs):
+            paths[form.id] = _store(form_type, form, pdf)
+
+    return [paths[form.id] for form in forms]
+
+# Query string keys that narrow a certificate bundle
+BUNDLE_FILTERS = ('class_standard', 'division', 'academic_year')
+
+def approved_forms(form_type, filters):
+    model = CERTIFICATE_MODELS[form_type]
+    query = model.query.options(joinedload(model.student)).filter(model.status == 'approved')
+    for field in BUNDLE_FILTERS:
+        if filters.get(field):
+            query = query.filter(getattr(model, field) == filters[field])
+    return query.order_by(model.student_name, model.id).all()
+
+def bundle_label(filters):
+    label = '_'.join(filters[field] for field in ('class_standard', 'division') if filters.get(field))
+    return secure_filename(label) or 'all'
+
+def zip_entries(form_type, forms, paths):
+    return [(f"{form_type}_{form.student.student_id or form.user_id}_{form.id}.pdf", path)
+            for form, path in zip(forms, paths)]
+
+def merge_pdfs(paths):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for path in paths:
+        writer.append(path)
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+def zip_pdfs(entries):
+    # `entries` are (archive name, cached path) pairs
+    output = io.BytesIO()
+    # PDFs are already compressed; storing avoids burning CPU for no gain
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as archive:
+        for name, path in entries:
+            archive.write(path, name)
+    return output.getvalue()
@@ -0,0 +1,98 @@
+import json
+import logging
+import zlib
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import select, delete
+from sqlalchemy.exc import IntegrityError
+
+from app import app, db
+from models import FormDraft
+import form_schema
+import jobs
+
+# Server-side autosave for the long forms. The browser PATCHes only the fields changed since
+# its last save ({"field": value, ...}; null clears one), so each save is a few hundred bytes
+# instead of the whole form. Drafts expire DRAFT_TTL_DAYS after their last change and are
+# deleted when the form is submitted.
+
+DRAFT_FORM_TYPES = ('admission', 'case_record')
+
+def encode(fields):
+    return zlib.compress(json.dumps(fields, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+def decode(data):
+    return json.loads(zlib.decompress(data).decode('utf-8'))
+
+def validate_patch(form_type, patch):
+    # Error messages for a patch; values are what the browser has in the field: text or a checkbox
+    field_names = form_schema.SCHEMAS[form_type].field_names
+    errors = [f"{name} is not a field of this form" for name in sorted(set(patch) - field_names)]
+    errors += [f"{name} must be a string, boolean or null" for name, value in sorted(patch.items())
+               if name in field_names and value is not None and not isinstance(value, (str, bool))]
+    return errors
+
+def load(user_id, form_type):
+    return db.session.scalar(select(FormDraft).where(
+        FormDraft.user_id == user_id, FormDraft.form_type == form_type,
+        FormDraft.expires_at > datetime.utcnow()))
+
+def fields(draft):
+    if draft is None:
+        return {}
+    try:
+        values = decode(draft.data)
+    except (zlib.error, ValueError):
+        values = None
+    if not isinstance(values, dict):
+        # Unreadable draft: start over rather than failing every GET and PATCH until it expires
+        logging.warning("Discarding unreadable %s draft of user %s", draft.form_type, draft.user_id)
+        return {}
+    return values
+
+def apply_patch(user_id, form_type, patch):
+    # Merges the patch into the stored draft and commits; raises ValueError when the result
+    # would exceed DRAFT_MAX_BYTES. Returns the draft
+    for attempt in range(2):
+        draft = db.session.scalar(select(FormDraft).where(
+            FormDraft.user_id == user_id, FormDraft.form_type == form_type).with_for_update())
+        values = fields(draft) if draft is not None and draft.expires_at > datetime.utcnow() else {}
+        for name, value in patch.items():
+            if value is None or value == '' or value is False:
+                values.pop(name, None)
+            else:
+                values[name] = value
+        if len(json.dumps(values, ensure_ascii=False).encode('utf-8')) > app.config['DRAFT_MAX_BYTES']:
+            db.session.rollback()
+            raise ValueError('Draft is too large')
+        now = datetime.utcnow()
+        if draft is None:
+            draft = FormDraft(user_id=user_id, form_type=form_type)
+            db.session.add(draft)
+        draft.data = encode(values)
+        draft.updated_at = now
+        draft.expires_at = now + timedelta(days=app.config['DRAFT_TTL_DAYS'])
+        try:
+            db.session.commit()
+            return draft
+        except IntegrityError:
+            # Another tab created the draft first: merge into that one
+            db.session.rollback()
+            if attempt:
+                raise
+
+def discard(user_id, form_type):
+    # Part of the caller's transaction, e.g. the one that stores the submitted form
+    db.session.execute(delete(FormDraft).where(
+        FormDraft.user_id == user_id, FormDraft.form_type == form_type))
+
+@jobs.maintenance
+def purge_expired():
+    with db.engine.begin() as connection:
+        return connection.execute(delete(FormDraft).where(FormDraft.expires_at <= datetime.utcnow())).rowcount
+
+@app.cli.command('drafts-purge')
+def drafts_purge_command():
+    """Delete form drafts not changed for DRAFT_TTL_DAYS."""
+    click.echo(f"Purged {purge_expired()} expired drafts")
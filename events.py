@@ -0,0 +1,178 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event, insert, select, func, literal, union_all, String
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session, object_session
+
+from app import app, db
+from models import FormEvent, FORM_MODELS
+import push
+
+FLUSH_INTERVAL = float(os.environ.get("EVENT_FLUSH_INTERVAL", "1.0"))
+BATCH_SIZE = 500
+MAX_RETRY_DELAY = 30  # seconds between attempts while the database is unreachable
+
+# Events waiting for the writer thread, which inserts them in batches on its own connection
+_queue = queue.Queue()
+_writer = None
+_writer_pid = None
+_writer_lock = threading.Lock()
+
+def make_event(form_type, form_id, name, actor_id=None, old_status=None, new_status=None, detail=None):
+    return {'form_type': form_type, 'form_id': form_id, 'event': name,
+            'old_status': old_status, 'new_status': new_status, 'actor_id': actor_id,
+            'detail': detail[:200] if detail else None, 'created_at': datetime.utcnow()}
+
+def _insert(batch):
+    with app.app_context(), db.engine.begin() as connection:
+        connection.execute(insert(FormEvent), batch)
+        push.publish(connection, batch)
+
+def _write(batch):
+    # Every committed change must keep its audit row: connection failures are retried until the
+    # database is back, and a batch it rejects outright is written row by row so that only the
+    # offending row is lost
+    delay = FLUSH_INTERVAL
+    while True:
+        try:
+            _insert(batch)
+            return
+        except DBAPIError as e:
+            if isinstance(e, OperationalError) or e.connection_invalidated:
+                logging.exception("Writing %d form events failed, retrying in %.0fs", len(batch), delay)
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+                continue
+            error = e
+        except Exception as e:
+            error = e
+        break
+    if len(batch) == 1:
+        logging.error("Dropped form event %r", batch[0], exc_info=error)
+        return
+    for row in batch:
+        _write([row])
+
+def _run_writer():
+    while True:
+        batch = [_queue.get()]
+        try:
+            while len(batch) < BATCH_SIZE:
+                batch.append(_queue.get(timeout=FLUSH_INTERVAL))
+        except queue.Empty:
+            pass
+        _write(batch)
+        for _ in batch:
+            _queue.task_done()
+
+def _ensure_writer():
+    global _writer, _writer_pid
+    # Threads do not survive fork(): start one per worker process on first use
+    if _writer_pid == os.getpid() and _writer.is_alive():
+        return
+    with _writer_lock:
+        if _writer_pid != os.getpid() or not _writer.is_alive():
+            _writer = threading.Thread(target=_run_writer, name='form-event-writer', daemon=True)
+            _writer.start()
+            _writer_pid = os.getpid()
+
+def log_events(rows):
+    # Queue rows for the background writer; the caller never waits on the INSERT
+    if not rows:
+        return
+    _ensure_writer()
+    for row in rows:
+        _queue.put(row)
+
+def log_event(form_type, form_id, name, **fields):
+    log_events([make_event(form_type, form_id, name, **fields)])
+
+def stage_events(session, rows):
+    # Events describing changes in `session` are queued only once it commits
+    session.info.setdefault('form_events', []).extend(rows)
+
+def flush():
+    # Block until every queued event is written (CLI commands, shutdown)
+    if _writer_pid == os.getpid():
+        _queue.join()
+
+atexit.register(flush)
+
+@event.listens_for(Session, 'after_commit')
+def _queue_staged_events(session):
+    log_events(session.info.pop('form_events', None))
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_staged_events(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('form_events', None)
+
+def _created_listener(form_type):
+    def listener(mapper, connection, target):
+        session = object_session(target)
+        if session is not None:
+            stage_events(session, [make_event(form_type, target.id, 'created',
+                                              actor_id=target.user_id, new_status=target.status)])
+    return listener
+
+for _form_type, _model in FORM_MODELS.items():
+    event.listen(_model, 'after_insert', _created_listener(_form_type))
+
+def _hours_between(start, end):
+    if db.engine.dialect.name == 'postgresql':
+        return func.extract('epoch', end - start) / 3600.0
+    return (func.julianday(end) - func.julianday(start)) * 24.0
+
+def turnaround_report(date_from=None, date_to=None):
+    # Per form type: forms submitted within [date_from, date_to), how many of them have been
+    # decided (first approval/rejection, whenever it happened) and the hours to that decision
+    def submitted(model):
+        stmt = select(model.id, model.created_at)
+        if date_from:
+            stmt = stmt.where(model.created_at >= date_from)
+        if date_to:
+            stmt = stmt.where(model.created_at < date_to)
+        return stmt
+
+    forms = union_all(*[
+        submitted(model).add_columns(literal(form_type, String).label('form_type'))
+        for form_type, model in FORM_MODELS.items()
+    ]).subquery()
+
+    decided = (select(FormEvent.form_type, FormEvent.form_id,
+                      func.min(FormEvent.created_at).label('decided_at'))
+               .where(FormEvent.event == 'status',
+                      FormEvent.new_status.in_(('approved', 'rejected')))
+               .group_by(FormEvent.form_type, FormEvent.form_id)
+               .subquery())
+
+    hours = _hours_between(forms.c.created_at, decided.c.decided_at)
+    columns = [forms.c.form_type, func.count().label('submitted'),
+               func.count(decided.c.decided_at).label('decided'),
+               func.avg(hours).label('avg_hours'), func.min(hours).label('min_hours'),
+               func.max(hours).label('max_hours')]
+    if db.engine.dialect.name == 'postgresql':
+        columns += [func.percentile_cont(0.5).within_group(hours).label('p50_hours'),
+                    func.percentile_cont(0.9).within_group(hours).label('p90_hours')]
+    stmt = (select(*columns)
+            .select_from(forms)
+            .outerjoin(decided, (decided.c.form_type == forms.c.form_type) & (decided.c.form_id == forms.c.id))
+            .group_by(forms.c.form_type))
+
+    report = {form_type: None for form_type in FORM_MODELS}
+    for row in db.session.execute(stmt):
+        report[row.form_type] = {'p50_hours': None, 'p90_hours': None, **row._asdict()}
+    return report
+
+def form_history(form_type, form_id):
+    return db.session.scalars(
+        select(FormEvent)
+        .where(FormEvent.form_type == form_type, FormEvent.form_id == form_id)
+        .order_by(FormEvent.created_at, FormEvent.id)
+    ).all()
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+import tempfile
+from datetime import date, datetime
+
+from sqlalchemy import select
+
+from app import db
+from models import User
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+USER_COLUMNS = ('student_id', 'full_name', 'email')
+
+YIELD_PER = 1000
+
+def export_statement(model, include_user=False):
+    columns = list(model.__table__.columns)
+    stmt = select(*columns)
+    if include_user:
+        stmt = (select(*columns, *(getattr(User, name).label(f'user_{name}') for name in USER_COLUMNS))
+                .join(User, User.id == model.user_id))
+    return stmt
+
+def stream_rows(stmt, model):
+    # Server-side cursor: rows arrive in batches of YIELD_PER and are never all held in memory
+    stmt = stmt.order_by(model.created_at, model.id).execution_options(yield_per=YIELD_PER)
+    result = db.session.execute(stmt)
+    yield list(result.keys())
+    for row in result:
+        yield row
+
+def _json_value(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+def generate_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so spreadsheet programs pick up the Marathi text as UTF-8
+    buffer.write('\ufeff')
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % YIELD_PER == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def generate_jsonl(rows):
+    rows = iter(rows)
+    header = next(rows)
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps({key: _json_value(value) for key, value in zip(header, row)},
+                                ensure_ascii=False))
+        if len(chunk) == YIELD_PER:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+def generate_xlsx(rows):
+    # openpyxl's write-only mode keeps memory flat; the zip container has to be
+    # finished on disk before it can be streamed back
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    for row in rows:
+        sheet.append(list(row))
+    with tempfile.TemporaryFile() as handle:
+        workbook.save(handle)
+        handle.seek(0)
+        while True:
+            data = handle.read(64 * 1024)
+            if not data:
+                break
+            yield data
+
+EXPORT_GENERATORS = {
+    'csv': generate_csv,
+    'jsonl': generate_jsonl,
+    'xlsx': generate_xlsx,
+}
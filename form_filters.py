@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from models import AdmissionForm, BonafideForm, PratinidhanForm
+from transitions import FORM_STATUSES
+
+# Query string keys understood by filter_forms_query
+FILTER_ARGS = ('status', 'class_standard', 'date_from', 'date_to')
+
+# Class column of the form types that record one, for the admin class filter
+CLASS_COLUMNS = {
+    AdmissionForm: AdmissionForm.admission_class,
+    BonafideForm: BonafideForm.class_standard,
+    PratinidhanForm: PratinidhanForm.class_standard
+}
+
+def parse_date_arg(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d') if value else None
+    except ValueError:
+        return None
+
+def listing_filters(args):
+    # The non-empty filter arguments, to carry over into links, redirects and job payloads
+    return {key: args[key] for key in FILTER_ARGS if args.get(key)}
+
+def validate_filters(model, args):
+    # Error messages for a filter selecting forms to change in bulk. filter_forms_query ignores
+    # what it does not understand, which here would widen the selection, so nothing may be ignored
+    errors = [f"{key} is not a filter" for key in sorted(set(args) - set(FILTER_ARGS))]
+    status = args.get('status')
+    if status is not None and status not in FORM_STATUSES:
+        errors.append(f"status must be one of {', '.join(FORM_STATUSES)}")
+    class_standard = args.get('class_standard')
+    if class_standard is not None and (model not in CLASS_COLUMNS or not isinstance(class_standard, str)):
+        errors.append("class_standard is not a filter of this form type")
+    for key in ('date_from', 'date_to'):
+        value = args.get(key)
+        if value is not None and (not isinstance(value, str) or parse_date_arg(value) is None):
+            errors.append(f"{key} must be a YYYY-MM-DD date")
+    if not errors and not any(args.get(key) for key in FILTER_ARGS):
+        errors.append(f"filter must restrict at least one of {', '.join(FILTER_ARGS)}")
+    return errors
+
+def filter_forms_query(query, model, args):
+    # Status, class and created_at date range filters shared by the admin listing views
+    status = args.get('status')
+    if status in FORM_STATUSES:
+        query = query.filter(model.status == status)
+    if model in CLASS_COLUMNS and args.get('class_standard'):
+        query = query.filter(CLASS_COLUMNS[model] == args['class_standard'])
+    date_from = parse_date_arg(args.get('date_from'))
+    if date_from:
+        query = query.filter(model.created_at >= date_from)
+    date_to = parse_date_arg(args.get('date_to'))
+    if date_to:
+        query = query.filter(model.created_at < date_to + timedelta(days=1))
+    return query
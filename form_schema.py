@@ -0,0 +1,96 @@
+from datetime import date, datetime
+
+from sqlalchemy import Boolean, Date, Integer
+
+from app import db
+from models import FORM_MODELS
+import stats
+
+# Set by the application, never bound from submitted data
+SYSTEM_COLUMNS = {'id', 'user_id', 'created_at', 'updated_at', 'status'}
+
+# Upload columns are filled from save_file() results, not from request values
+FILE_COLUMNS = {
+    'admission': ('student_photo', 'parent_photo'),
+    'hostel': ('parent_signature', 'student_signature', 'warden_signature'),
+}
+
+TRUE_VALUES = {'y', 'yes', 'on', 'true', '1'}
+
+def parse_text(value):
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+def parse_date(value):
+    if not value:
+        return None
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def parse_int(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return int(value) if value else None
+
+def parse_bool(value):
+    if value is None or isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+def parser_for(column):
+    if isinstance(column.type, Date):
+        return parse_date
+    if isinstance(column.type, Boolean):
+        return parse_bool
+    if isinstance(column.type, Integer):
+        return parse_int
+    return parse_text
+
+class FormSchema:
+    # Column -> parser table for one form model, built once at import time
+
+    def __init__(self, form_type, model):
+        self.form_type = form_type
+        self.model = model
+        skipped = SYSTEM_COLUMNS.union(FILE_COLUMNS.get(form_type, ()))
+        columns = [column for column in model.__table__.columns if column.name not in skipped]
+        self.fields = tuple((column.name, parser_for(column)) for column in columns)
+        self.field_names = frozenset(name for name, _ in self.fields)
+        self.required = tuple(column.name for column in columns if not column.nullable)
+        self.max_lengths = {column.name: column.type.length for column in columns
+                            if getattr(column.type, 'length', None)}
+
+    def bind(self, instance, source, **overrides):
+        # `source` is anything with .get(): request.form, a WTForms form.data dict or decoded JSON
+        get = source.get
+        for name, parser in self.fields:
+            setattr(instance, name, parser(get(name)))
+        for name, value in overrides.items():
+            setattr(instance, name, value)
+        return instance
+
+    def build(self, source, **overrides):
+        return self.bind(self.model(), source, **overrides)
+
+    def missing_fields(self, source):
+        return [name for name in self.required if source.get(name) in (None, '')]
+
+    def unknown_fields(self, source):
+        return sorted(set(source) - self.field_names)
+
+    def too_long_fields(self, source):
+        # Checked before binding: PostgreSQL rejects an oversized String(n) value with a DataError
+        # that would fail the whole transaction, SQLite would store it
+        return [name for name, length in self.max_lengths.items()
+                if source.get(name) is not None and len(parse_text(source.get(name))) > length]
+
+SCHEMAS = {form_type: FormSchema(form_type, model) for form_type, model in FORM_MODELS.items()}
+
+def create_form(form_type, source, **overrides):
+    # Builds and stages a submission; the caller commits
+    form = SCHEMAS[form_type].build(source, **overrides)
+    db.session.add(form)
+    stats.record_form_created(form_type, user_ids=[form.user_id])
+    return form
@@ -16,6 +16,10 @@ class RegistrationForm(FlaskForm):
     password2 = PasswordField('Confirm Password / पासवर्ड पुष्टी', validators=[DataRequired(), EqualTo('password')])
     submit = SubmitField('Register / नोंदणी')
 
+class ActionForm(FlaskForm):
+    # No fields of its own: the CSRF token for hand-written admin action forms
+    pass
+
 class AdmissionFormForm(FlaskForm):
     # School Information
     school_name = StringField('शाळेचे नाव', validators=[DataRequired()])
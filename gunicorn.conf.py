@@ -0,0 +1,89 @@
+# Gunicorn reads this file from the working directory; sizes come from server_config.py
+import os
+import signal
+import subprocess
+import sys
+
+import server_config
+
+worker_class = server_config.worker_class()
+if worker_class == 'gevent':
+    # Patch before the preloaded app imports threading, socket and psycopg2
+    from gevent import monkey
+    monkey.patch_all()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = server_config.workers()
+threads = server_config.threads()
+worker_connections = server_config.worker_connections()
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks cannot accumulate; jitter avoids simultaneous restarts
+max_requests = 5000
+max_requests_jitter = 500
+
+# Import the app once in the master: workers fork with modules and templates already loaded.
+# GUNICORN_PRELOAD=0 for --reload during development
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+# Schema setup runs once in on_starting below instead of in every worker's create_app()
+os.environ["INIT_STORAGE"] = "0"
+
+# The in-memory cache is per process; share one file between several workers
+os.environ.setdefault("CACHE_BACKEND", "sqlite" if workers > 1 else "memory")
+
+# Event streams hold a request each for minutes: size them to what this worker class can spare
+os.environ.setdefault("PUSH_MAX_CLIENTS", str(server_config.push_max_clients()))
+
+# Background jobs: gthread and sync workers each run JOB_WORKERS job threads (jobs.py). gevent workers
+# would run them as greenlets and CPU-heavy jobs (PDF bundles, XLSX exports) would stall requests,
+# so there one `flask jobs-worker` process beside the master runs them with real threads
+job_threads = int(os.environ.get("JOB_WORKERS", 1))
+job_process = None
+if worker_class == 'gevent':
+    os.environ["JOB_WORKERS"] = "0"
+
+def on_starting(server):
+    if worker_class != 'gevent':
+        server.log.warning("%s workers without gevent: at most %s dashboard event streams per worker, "
+                           "other dashboards poll /api/stats", worker_class, os.environ["PUSH_MAX_CLIENTS"])
+    from app import app, db, init_storage
+    init_storage()
+    with app.app_context():
+        db.engine.dispose()
+
+def when_ready(server):
+    global job_process
+    if worker_class == 'gevent' and job_threads > 0:
+        job_process = subprocess.Popen(
+            [sys.executable, '-m', 'flask', '--app', 'main', 'jobs-worker', '--threads', str(job_threads)],
+            env=dict(os.environ, INIT_STORAGE='0'))
+        server.log.info("Started job worker process %s", job_process.pid)
+
+def on_exit(server):
+    if job_process is not None and job_process.poll() is None:
+        # jobs-worker finishes its current jobs on SIGINT
+        job_process.send_signal(signal.SIGINT)
+        try:
+            job_process.wait(timeout=graceful_timeout)
+        except subprocess.TimeoutExpired:
+            job_process.kill()
+
+def post_fork(server, worker):
+    # Connections the master opened while preloading must not be shared across processes
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+def post_worker_init(worker):
+    # Job threads (gthread/sync workers) start at boot, not at this worker's first submit()
+    import jobs
+    jobs.ensure_workers()
+
+def worker_exit(server, worker):
+    # Jobs cut short by a max_requests restart or a deploy go back to the queue right away
+    from app import app
+    import jobs
+    with app.app_context():
+        jobs.release_claims()
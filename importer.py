@@ -0,0 +1,254 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import click
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+
+from app import app, db
+from models import User, Counter, FORM_MODELS, STUDENT_ID_LIMIT, allocate_student_numbers
+import cache
+import form_schema
+import search
+import stats
+
+CHUNK_SIZE = 1000
+
+STUDENT_COLUMNS = ('username', 'email', 'full_name', 'password')
+
+FORM_STATUSES = ('pending', 'approved', 'rejected')
+
+def hash_password(password, method):
+    # Module-level so the process pool can pickle it
+    return generate_password_hash(password, method)
+
+def _chunks(rows, size=CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _allocate_block(count):
+    # As many student numbers as are left, up to `count`, in one counter update
+    counter = db.session.get(Counter, 'student_id')
+    available = count if counter is None else min(count, STUDENT_ID_LIMIT - counter.value)
+    if available <= 0:
+        return []
+    try:
+        return allocate_student_numbers(available)
+    except ValueError:
+        return []
+
+def _numbered(stream):
+    # (line number, row) pairs; line 1 is the header
+    reader = csv.DictReader(stream)
+    for line, row in enumerate(reader, 2):
+        yield line, {key.strip(): (value or '').strip() for key, value in row.items() if key}
+
+def write_error_file(errors, handle):
+    writer = csv.writer(handle)
+    writer.writerow(['line', 'record', 'error'])
+    writer.writerows(errors)
+
+def _validate_student(row):
+    for column in STUDENT_COLUMNS:
+        if not row.get(column):
+            return f"{column} is required"
+    if len(row['username']) > 80 or len(row['email']) > 120 or len(row['full_name']) > 100:
+        return "username, email or full_name is too long"
+    if len(row['password']) < 6:
+        return "password must be at least 6 characters"
+    # Imported here: email_validator's DNS and IDNA machinery is a large share of app import time
+    from email_validator import validate_email, EmailNotValidError
+    try:
+        validate_email(row['email'], check_deliverability=False)
+    except EmailNotValidError as e:
+        return str(e)
+    return None
+
+def _user_values(row, password_hash, number, now):
+    return {'username': row['username'], 'email': row['email'], 'full_name': row['full_name'],
+            'password_hash': password_hash, 'student_id': f"STU{number:03d}",
+            'is_admin': False, 'created_at': now}
+
+def _insert_each(rows, hashes, now):
+    # A savepoint per row, each taking its own student number, so a row that collides is rolled
+    # back alone and leaves no gap. Returns (inserted count, errors); commits
+    inserted = 0
+    errors = []
+    for (line, row), password_hash in zip(rows, hashes):
+        try:
+            with db.session.begin_nested():
+                number, = allocate_student_numbers(1)
+                db.session.execute(insert(User), [_user_values(row, password_hash, number, now)])
+        except IntegrityError:
+            errors.append((line, row['username'], "username or email already exists"))
+        except ValueError as e:
+            errors.append((line, row['username'], str(e)))
+        else:
+            inserted += 1
+    if inserted:
+        cache.invalidate_on_commit(db.session, 'users', 'stats')
+        stats.bump_stats_version()
+    db.session.commit()
+    return inserted, errors
+
+def import_students(stream, workers=None):
+    # Returns (imported count, [(line, username, error), ...]); commits one transaction per chunk
+    imported = 0
+    errors = []
+    seen_usernames = set()
+    seen_emails = set()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for chunk in _chunks(_numbered(stream)):
+            valid = []
+            for line, row in chunk:
+                error = _validate_student(row)
+                if error is None and (row['username'] in seen_usernames or row['email'] in seen_emails):
+                    error = "duplicate username or email in file"
+                if error:
+                    errors.append((line, row.get('username', ''), error))
+                    continue
+                seen_usernames.add(row['username'])
+                seen_emails.add(row['email'])
+                valid.append((line, row))
+
+            existing = set()
+            if valid:
+                existing = set(db.session.execute(
+                    select(User.username, User.email).where(
+                        User.username.in_([row['username'] for _, row in valid]) |
+                        User.email.in_([row['email'] for _, row in valid])
+                    )).all())
+            existing_usernames = {username for username, _ in existing}
+            existing_emails = {email for _, email in existing}
+            rows = []
+            for line, row in valid:
+                if row['username'] in existing_usernames or row['email'] in existing_emails:
+                    errors.append((line, row['username'], "username or email already exists"))
+                else:
+                    rows.append((line, row))
+            if not rows:
+                continue
+
+            # Hash before taking student numbers: the counter UPDATE locks its row (and on SQLite
+            # the whole database) until the commit, which must not wait on the hashing
+            db.session.rollback()
+            hashes = list(pool.map(hash_password, [row['password'] for _, row in rows],
+                                   [app.config['PASSWORD_HASH_METHOD']] * len(rows),
+                                   chunksize=max(1, len(rows) // ((workers or os.cpu_count() or 1) * 4))))
+
+            numbers = _allocate_block(len(rows))
+            errors.extend((line, row['username'], f"Maximum student limit reached (STU{STUDENT_ID_LIMIT})")
+                          for line, row in rows[len(numbers):])
+            rows = rows[:len(numbers)]
+            hashes = hashes[:len(numbers)]
+            if not rows:
+                db.session.rollback()
+                continue
+
+            now = datetime.utcnow()
+            try:
+                db.session.execute(insert(User), [
+                    _user_values(row, password_hash, number, now)
+                    for (line, row), password_hash, number in zip(rows, hashes, numbers)
+                ])
+                # Bulk INSERTs skip the User mapper events that invalidate cached user data
+                cache.invalidate_on_commit(db.session, 'users', 'stats')
+                stats.bump_stats_version()
+                db.session.commit()
+            except IntegrityError:
+                # Someone registered one of these usernames/emails while the chunk was hashing:
+                # insert it again row by row so only the rows that collide are reported
+                db.session.rollback()
+                inserted, row_errors = _insert_each(rows, hashes, now)
+                imported += inserted
+                errors.extend(row_errors)
+                continue
+            imported += len(rows)
+    # Bulk INSERTs bypass the ORM events that maintain the search index
+    search.index_missing(db.session.connection())
+    db.session.commit()
+    return imported, errors
+
+def _parse_form_row(schema, row):
+    missing = [name for name in schema.required if not row.get(name)]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    values = {name: parser(row.get(name) or None) for name, parser in schema.fields}
+    status = row.get('status') or 'pending'
+    if status not in FORM_STATUSES:
+        raise ValueError(f"invalid status {status}")
+    values['status'] = status
+    values['created_at'] = datetime.fromisoformat(row['created_at']) if row.get('created_at') else datetime.utcnow()
+    return values
+
+def import_forms(form_type, stream):
+    # Historical forms keyed to students by their student_id column
+    schema = form_schema.SCHEMAS[form_type]
+    model = FORM_MODELS[form_type]
+    imported = 0
+    errors = []
+    for chunk in _chunks(_numbered(stream)):
+        student_ids = {row.get('student_id') for _, row in chunk if row.get('student_id')}
+        users = dict(db.session.execute(
+            select(User.student_id, User.id).where(User.student_id.in_(student_ids))).all()) if student_ids else {}
+
+        rows = []
+        for line, row in chunk:
+            user_id = users.get(row.get('student_id'))
+            if user_id is None:
+                errors.append((line, row.get('student_id', ''), "unknown student_id"))
+                continue
+            try:
+                values = _parse_form_row(schema, row)
+            except (TypeError, ValueError) as e:
+                errors.append((line, row.get('student_id', ''), str(e)))
+                continue
+            values['user_id'] = user_id
+            rows.append(values)
+        if not rows:
+            continue
+
+        db.session.execute(insert(model), rows)
+        for status in FORM_STATUSES:
+            owners = [values['user_id'] for values in rows if values['status'] == status]
+            if owners:
+                stats.record_form_created(form_type, status, len(owners), user_ids=set(owners))
+        db.session.commit()
+        imported += len(rows)
+    search.index_missing(db.session.connection())
+    db.session.commit()
+    return imported, errors
+
+def _report(imported, errors, errors_path):
+    click.echo(f"Imported {imported} rows, {len(errors)} errors")
+    if errors and errors_path:
+        with open(errors_path, 'w', newline='', encoding='utf-8') as handle:
+            write_error_file(errors, handle)
+        click.echo(f"Errors written to {errors_path}")
+
+@app.cli.command('import-students')
+@click.argument('path', type=click.Path(exists=True))
+@click.option('--errors', 'errors_path', default='import_errors.csv', help='Per-row error report')
+@click.option('--workers', type=int, default=None, help='Password hashing processes')
+def import_students_command(path, errors_path, workers):
+    """Bulk-create students from a CSV with username,email,full_name,password."""
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        _report(*import_students(handle, workers), errors_path)
+
+@app.cli.command('import-forms')
+@click.argument('form_type', type=click.Choice(list(FORM_MODELS)))
+@click.argument('path', type=click.Path(exists=True))
+@click.option('--errors', 'errors_path', default='import_errors.csv', help='Per-row error report')
+def import_forms_command(form_type, path, errors_path):
+    """Bulk-load historical forms from a CSV keyed by student_id."""
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        _report(*import_forms(form_type, handle), errors_path)
@@ -0,0 +1,263 @@
+import inspect
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import select, update, delete, func
+
+from app import app, db
+from models import Job
+
+POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "1.0"))
+RETRY_DELAY = 10  # seconds before the first retry, doubled on each further attempt
+MAINTENANCE_INTERVAL = 60
+
+# name -> (function, max_attempts, submittable through the JSON API)
+TASKS = {}
+
+# Housekeeping run by each worker every MAINTENANCE_INTERVAL besides the job table's own
+MAINTENANCE = []
+
+_workers = []
+_workers_pid = None
+_workers_lock = threading.Lock()
+
+def task(name, max_attempts=3, api=False):
+    # Registers fn(ctx, **payload) -> JSON-serializable result
+    def register(fn):
+        TASKS[name] = (fn, max_attempts, api)
+        return fn
+    return register
+
+def load_tasks():
+    # tasks.py pulls in exports, certificates and importer: loaded when jobs are first used,
+    # not at app import
+    import tasks  # noqa: F401
+
+def maintenance(fn):
+    MAINTENANCE.append(fn)
+    return fn
+
+def result_path(name):
+    return os.path.join(app.config['JOB_RESULT_FOLDER'], name)
+
+def submit(kind, payload=None, user_id=None, start_workers=True):
+    # Adds the job to the caller's session; it becomes visible to workers at commit
+    load_tasks()
+    if kind not in TASKS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    try:
+        inspect.signature(TASKS[kind][0]).bind(None, **(payload or {}))
+    except TypeError as e:
+        raise ValueError(f"Invalid payload for {kind}: {e}")
+    job = Job(kind=kind, payload=json.dumps(payload or {}, ensure_ascii=False),
+              max_attempts=TASKS[kind][1], created_by=user_id)
+    db.session.add(job)
+    if start_workers:
+        ensure_workers()
+    return job
+
+def describe(job):
+    return {
+        'id': job.id, 'kind': job.kind, 'status': job.status,
+        'progress': {'done': job.progress_done, 'total': job.progress_total,
+                     'message': job.progress_message},
+        'attempts': job.attempts, 'max_attempts': job.max_attempts,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error.strip().splitlines()[-1] if job.error else None,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+class JobContext:
+    def __init__(self, job_id, worker_id):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._last_update = 0.0
+
+    def progress(self, done, total=None, message=None, force=False):
+        # At most one UPDATE per second; it also serves as the worker's heartbeat
+        now = time.monotonic()
+        if not force and now - self._last_update < 1.0:
+            return
+        self._last_update = now
+        values = {'progress_done': done, 'locked_at': datetime.utcnow()}
+        if total is not None:
+            values['progress_total'] = total
+        if message is not None:
+            values['progress_message'] = message[:200]
+        with db.engine.begin() as connection:
+            connection.execute(update(Job).where(Job.id == self.job_id,
+                                                 Job.locked_by == self.worker_id).values(**values))
+
+def claim(worker_id):
+    # Oldest due job, locked so concurrent workers skip it instead of waiting on it.
+    # SQLite ignores FOR UPDATE, and its single writer makes the UPDATE atomic anyway
+    now = datetime.utcnow()
+    candidate = (select(Job.id)
+                 .where(Job.status == 'queued', Job.run_at <= now)
+                 .order_by(Job.run_at, Job.id)
+                 .limit(1)
+                 .with_for_update(skip_locked=True)
+                 .scalar_subquery())
+    with db.engine.begin() as connection:
+        row = connection.execute(
+            update(Job)
+            .where(Job.id == candidate, Job.status == 'queued')
+            .values(status='running', locked_by=worker_id, locked_at=now,
+                    started_at=now, attempts=Job.attempts + 1)
+            .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+        ).first()
+    return row
+
+def _finish(job_id, worker_id, **values):
+    with db.engine.begin() as connection:
+        connection.execute(update(Job).where(Job.id == job_id, Job.locked_by == worker_id)
+                           .values(locked_by=None, locked_at=None, **values))
+
+def execute(job, worker_id):
+    fn = TASKS.get(job.kind, (None,))[0]
+    try:
+        if fn is None:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        result = fn(JobContext(job.id, worker_id), **json.loads(job.payload))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        error = traceback.format_exc()[-4000:]
+        logging.exception("Job %s (%s) failed on attempt %s", job.id, job.kind, job.attempts)
+        if fn is not None and job.attempts < job.max_attempts:
+            retry_at = datetime.utcnow() + timedelta(seconds=RETRY_DELAY * 2 ** (job.attempts - 1))
+            _finish(job.id, worker_id, status='queued', run_at=retry_at, error=error)
+        else:
+            _finish(job.id, worker_id, status='failed', finished_at=datetime.utcnow(), error=error)
+        return False
+    finally:
+        db.session.remove()
+    _finish(job.id, worker_id, status='succeeded', finished_at=datetime.utcnow(), error=None,
+            progress_done=func.coalesce(Job.progress_total, Job.progress_done),
+            result=json.dumps(result, ensure_ascii=False, default=str))
+    return True
+
+def requeue_stale():
+    # Running jobs whose worker stopped sending heartbeats (crash, killed deploy)
+    cutoff = datetime.utcnow() - timedelta(seconds=app.config['JOB_TIMEOUT'])
+    with db.engine.begin() as connection:
+        return connection.execute(
+            update(Job).where(Job.status == 'running', Job.locked_at < cutoff)
+            .values(status='queued', locked_by=None, locked_at=None, run_at=datetime.utcnow())
+        ).rowcount
+
+def purge_finished():
+    # Drops finished jobs, and the files they produced, after JOB_RESULT_TTL_DAYS
+    cutoff = datetime.utcnow() - timedelta(days=app.config['JOB_RESULT_TTL_DAYS'])
+    with db.engine.begin() as connection:
+        expired = connection.execute(
+            delete(Job).where(Job.status.in_(('succeeded', 'failed')), Job.finished_at < cutoff)
+            .returning(Job.result)
+        ).scalars().all()
+    for result in expired:
+        name = (json.loads(result) or {}).get('file') if result else None
+        if name and os.path.exists(result_path(name)):
+            os.remove(result_path(name))
+    return len(expired)
+
+def release_claims():
+    # Requeues the jobs this process is running when it shuts down (gunicorn max_requests restarts,
+    # deploys) so they resume now rather than after JOB_TIMEOUT; the interrupted attempt is not counted
+    prefix = f"{socket.gethostname()}:{os.getpid()}:"
+    with db.engine.begin() as connection:
+        return connection.execute(
+            update(Job).where(Job.status == 'running', Job.locked_by.startswith(prefix, autoescape=True))
+            .values(status='queued', locked_by=None, locked_at=None, run_at=datetime.utcnow(),
+                    attempts=Job.attempts - 1)
+        ).rowcount
+
+def work(worker_id, stop=None, burst=False):
+    # Claims and runs jobs until `stop` is set; with burst, returns once the queue is empty
+    load_tasks()
+    stop = stop or threading.Event()
+    next_maintenance = 0.0
+    while not stop.is_set():
+        with app.app_context():
+            if time.monotonic() >= next_maintenance:
+                requeue_stale()
+                purge_finished()
+                for fn in MAINTENANCE:
+                    fn()
+                next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+            job = claim(worker_id)
+            if job is not None:
+                execute(job, worker_id)
+                continue
+        if burst:
+            return
+        stop.wait(POLL_INTERVAL)
+
+def _worker_id(index):
+    return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+def _run_thread(index):
+    while True:
+        try:
+            work(_worker_id(index))
+        except Exception:
+            # Keep the thread alive through database outages
+            logging.exception("Job worker crashed, restarting")
+            time.sleep(POLL_INTERVAL)
+
+def ensure_workers():
+    # In-process worker threads, started lazily once per process (threads do not survive fork())
+    global _workers, _workers_pid
+    count = app.config['JOB_WORKERS']
+    if count <= 0 or _workers_pid == os.getpid():
+        return
+    with _workers_lock:
+        if _workers_pid == os.getpid():
+            return
+        _workers = [threading.Thread(target=_run_thread, args=(index,),
+                                     name=f'job-worker-{index}', daemon=True)
+                    for index in range(count)]
+        for thread in _workers:
+            thread.start()
+        _workers_pid = os.getpid()
+
+@app.before_request
+def _start_workers():
+    # Queued jobs, retries and maintenance must not wait for this process's first submit();
+    # gunicorn starts them at worker boot, this covers other servers
+    ensure_workers()
+
+@app.cli.command('jobs-worker')
+@click.option('--threads', type=int, default=1, help='Jobs run concurrently by this process')
+@click.option('--burst', is_flag=True, help='Exit once the queue is empty')
+def jobs_worker_command(threads, burst):
+    """Run background jobs; start several processes to scale out."""
+    load_tasks()
+    import drafts  # noqa: F401  (purge_expired maintenance)
+    stop = threading.Event()
+    workers = [threading.Thread(target=work, args=(_worker_id(index), stop, burst))
+               for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    try:
+        for thread in workers:
+            while thread.is_alive():
+                thread.join(timeout=1.0)
+    except KeyboardInterrupt:
+        click.echo('Stopping after the current jobs')
+        stop.set()
+        for thread in workers:
+            thread.join()
+
+@app.cli.command('jobs-purge')
+def jobs_purge_command():
+    """Delete finished jobs older than JOB_RESULT_TTL_DAYS and requeue stale ones."""
+    click.echo(f"Requeued {requeue_stale()} stale jobs, purged {purge_finished()} finished jobs")
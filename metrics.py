@@ -0,0 +1,152 @@
+import bisect
+import os
+import random
+import threading
+import time
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import app
+
+# Latency histogram upper bounds in seconds (Prometheus defaults)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+SAMPLE_RATE = float(os.environ.get("METRICS_SAMPLE_RATE", "1.0"))
+
+# Per-thread (per-greenlet under gevent) state of the request being measured
+_current = threading.local()
+_lock = threading.Lock()
+_endpoints = {}
+
+class EndpointStats:
+    __slots__ = ('buckets', 'count', 'duration', 'queries', 'db_time', 'errors')
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.errors = 0
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th request, as Prometheus' histogram_quantile would
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, hits in zip(BUCKETS, self.buckets):
+            cumulative += hits
+            if cumulative >= target:
+                return bound
+        return BUCKETS[-1]
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_current, 'active', False):
+        _current.query_start = time.perf_counter()
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if getattr(_current, 'active', False):
+        _current.queries += 1
+        _current.db_time += time.perf_counter() - _current.query_start
+
+@app.before_request
+def _start_request_timer():
+    _current.active = SAMPLE_RATE >= 1.0 or random.random() < SAMPLE_RATE
+    if _current.active:
+        _current.start = time.perf_counter()
+        _current.queries = 0
+        _current.db_time = 0.0
+
+@app.after_request
+def _record_request(response):
+    if getattr(_current, 'active', False):
+        _current.active = False
+        record(request.endpoint or 'unmatched', time.perf_counter() - _current.start,
+               _current.queries, _current.db_time, response.status_code >= 500)
+    return response
+
+@app.teardown_request
+def _reset_request(exc):
+    if getattr(_current, 'active', False):
+        # after_request did not run: the view raised
+        _current.active = False
+        record(request.endpoint or 'unmatched', time.perf_counter() - _current.start,
+               _current.queries, _current.db_time, True)
+
+def record(endpoint, duration, queries, db_time, error=False):
+    index = bisect.bisect_left(BUCKETS, duration)
+    with _lock:
+        stats = _endpoints.get(endpoint)
+        if stats is None:
+            stats = _endpoints[endpoint] = EndpointStats()
+        stats.buckets[index] += 1
+        stats.count += 1
+        stats.duration += duration
+        stats.queries += queries
+        stats.db_time += db_time
+        stats.errors += error
+
+def snapshot():
+    with _lock:
+        copies = {}
+        for endpoint, stats in _endpoints.items():
+            copy = EndpointStats()
+            copy.buckets = list(stats.buckets)
+            for name in ('count', 'duration', 'queries', 'db_time', 'errors'):
+                setattr(copy, name, getattr(stats, name))
+            copies[endpoint] = copy
+        return copies
+
+def reset():
+    with _lock:
+        _endpoints.clear()
+
+def summary_rows():
+    rows = []
+    for endpoint, stats in sorted(snapshot().items()):
+        rows.append({
+            'endpoint': endpoint,
+            'count': stats.count,
+            'errors': stats.errors,
+            'avg_ms': stats.duration / stats.count * 1000 if stats.count else 0,
+            'p50_ms': stats.quantile(0.5) * 1000,
+            'p95_ms': stats.quantile(0.95) * 1000,
+            'p99_ms': stats.quantile(0.99) * 1000,
+            'avg_queries': stats.queries / stats.count if stats.count else 0,
+            'avg_db_ms': stats.db_time / stats.count * 1000 if stats.count else 0,
+        })
+    return rows
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def prometheus_text():
+    lines = [
+        '# HELP harmony_request_duration_seconds Request latency by Flask endpoint.',
+        '# TYPE harmony_request_duration_seconds histogram',
+    ]
+    stats_by_endpoint = sorted(snapshot().items())
+    for endpoint, stats in stats_by_endpoint:
+        label = _label(endpoint)
+        cumulative = 0
+        for bound, hits in zip(BUCKETS, stats.buckets):
+            cumulative += hits
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'harmony_request_duration_seconds_bucket{{endpoint="{label}",le="{le}"}} {cumulative}')
+        lines.append(f'harmony_request_duration_seconds_sum{{endpoint="{label}"}} {stats.duration:.6f}')
+        lines.append(f'harmony_request_duration_seconds_count{{endpoint="{label}"}} {stats.count}')
+    for name, attribute, help_text in (
+        ('harmony_request_queries_total', 'queries', 'SQL statements issued by requests.'),
+        ('harmony_request_db_seconds_total', 'db_time', 'Time spent executing SQL.'),
+        ('harmony_request_errors_total', 'errors', 'Requests that failed with a server error.'),
+    ):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for endpoint, stats in stats_by_endpoint:
+            lines.append(f'{name}{{endpoint="{_label(endpoint)}"}} {getattr(stats, attribute)}')
+    return '\n'.join(lines) + '\n'
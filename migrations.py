@@ -0,0 +1,100 @@
+from datetime import datetime
+
+import click
+from sqlalchemy import text
+
+from app import app, db
+
+# Ordered (version, description, function) entries; each function receives an open connection
+MIGRATIONS = []
+
+def migration(version, description):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return fn
+    return register
+
+class SchemaVersion(db.Model):
+    version = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(200))
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+def upgrade():
+    applied = []
+    with db.engine.begin() as connection:
+        if connection.dialect.name == 'postgresql':
+            # Serialize concurrent worker boots; released at commit
+            connection.execute(text("SELECT pg_advisory_xact_lock(5318008)"))
+        SchemaVersion.__table__.create(connection, checkfirst=True)
+        current = connection.execute(
+            db.select(db.func.max(SchemaVersion.version))
+        ).scalar() or 0
+        for version, description, fn in MIGRATIONS:
+            if version <= current:
+                continue
+            fn(connection)
+            connection.execute(SchemaVersion.__table__.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()))
+            applied.append(version)
+    return applied
+
+@migration(1, 'Indexes on form user_id/status/created_at')
+def add_form_indexes(connection):
+    from models import FORM_MODELS
+    for model in FORM_MODELS.values():
+        for index in model.__table__.indexes:
+            index.create(connection, checkfirst=True)
+
+@migration(2, 'Seed the student_id counter from existing users')
+def seed_student_id_counter(connection):
+    from models import Counter, last_student_number
+    Counter.__table__.create(connection, checkfirst=True)
+    exists = connection.execute(
+        db.select(Counter.name).where(Counter.name == 'student_id')
+    ).first()
+    if not exists:
+        connection.execute(Counter.__table__.insert().values(
+            name='student_id', value=last_student_number(connection)))
+
+@migration(3, 'updated_at on certificate forms')
+def add_certificate_updated_at(connection):
+    from sqlalchemy import inspect
+    inspector = inspect(connection)
+    for table in ('bonafide_form', 'pratinidhan_form'):
+        columns = {column['name'] for column in inspector.get_columns(table)}
+        if 'updated_at' not in columns:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN updated_at TIMESTAMP"))
+
+@migration(4, 'Search documents with FTS5 / pg_trgm indexes')
+def add_search_index(connection):
+    import search
+    from models import SearchDocument
+    SearchDocument.__table__.create(connection, checkfirst=True)
+    search.install_indexes(connection)
+    search.index_missing(connection)
+
+@migration(5, 'Form event log table')
+def add_form_events(connection):
+    from models import FormEvent
+    FormEvent.__table__.create(connection, checkfirst=True)
+
+@migration(6, 'Seed the stats_version counter')
+def seed_stats_version_counter(connection):
+    from models import Counter
+    exists = connection.execute(
+        db.select(Counter.name).where(Counter.name == 'stats_version')
+    ).first()
+    if not exists:
+        connection.execute(Counter.__table__.insert().values(name='stats_version', value=0))
+
+@migration(7, 'Form drafts table')
+def add_form_drafts(connection):
+    from models import FormDraft
+    FormDraft.__table__.create(connection, checkfirst=True)
+
+@app.cli.command('db-upgrade')
+def db_upgrade_command():
+    """Apply pending schema migrations."""
+    applied = upgrade()
+    click.echo(f"Applied migrations: {applied}" if applied else "Schema is up to date")
@@ -1,9 +1,19 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import select, update
 from app import db
 
+STUDENT_ID_LIMIT = 900
+
+def form_indexes(table):
+    # Per-student dashboards, status-filtered admin queues and the (created_at, id) keyset listing
+    return (
+        db.Index(f'ix_{table}_user_created', 'user_id', 'created_at'),
+        db.Index(f'ix_{table}_status_created', 'status', 'created_at'),
+        db.Index(f'ix_{table}_created_id', 'created_at', 'id'),
+    )
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -22,28 +32,54 @@ class User(UserMixin, db.Model):
     pratinidhan_forms = db.relationship('PratinidhanForm', backref='student', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        import auth
+        self.password_hash = auth.hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        # Also upgrades an outdated hash in place; commit to keep it
+        import auth
+        return auth.verify_password(self, password)
 
     def generate_student_id(self):
         if not self.student_id:
-            # Find the highest existing STU ID
-            from sqlalchemy import text
-            last_user = User.query.filter(text("student_id LIKE 'STU%'")).order_by(text("student_id DESC")).first()
-            if last_user and last_user.student_id:
-                last_num = int(last_user.student_id[3:])
-                new_num = last_num + 1
-            else:
-                new_num = 1
-            
-            if new_num <= 900:
-                self.student_id = f"STU{new_num:03d}"
-            else:
-                raise ValueError("Maximum student limit reached (STU900)")
+            self.student_id = f"STU{allocate_student_numbers()[0]:03d}"
+
+class Counter(db.Model):
+    # Named counters incremented atomically in the caller's transaction
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+def last_student_number(connection):
+    last_id = connection.execute(
+        select(User.student_id)
+        .where(User.student_id >= 'STU', User.student_id < 'STV')
+        .order_by(User.student_id.desc()).limit(1)
+    ).scalar()
+    return int(last_id[3:]) if last_id else 0
+
+def allocate_student_numbers(count=1):
+    # Reserve `count` consecutive student numbers with one atomic UPDATE on the counter row.
+    # The row stays locked until the caller commits, so parallel registrations never
+    # read the same value and no scan of the user table is needed.
+    stmt = (update(Counter)
+            .where(Counter.name == 'student_id', Counter.value + count <= STUDENT_ID_LIMIT)
+            .values(value=Counter.value + count)
+            .returning(Counter.value)
+            .execution_options(synchronize_session=False))
+    last = db.session.execute(stmt).scalar()
+    if last is None:
+        if db.session.get(Counter, 'student_id') is not None:
+            raise ValueError(f"Maximum student limit reached (STU{STUDENT_ID_LIMIT})")
+        db.session.add(Counter(name='student_id', value=last_student_number(db.session.connection())))
+        db.session.flush()
+        last = db.session.execute(stmt).scalar()
+        if last is None:
+            raise ValueError(f"Maximum student limit reached (STU{STUDENT_ID_LIMIT})")
+    return list(range(last - count + 1, last + 1))
 
 class AdmissionForm(db.Model):
+    __table_args__ = form_indexes('admission_form')
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
@@ -95,6 +131,8 @@ class AdmissionForm(db.Model):
     status = db.Column(db.String(20), default='pending')  # pending, approved, rejected
 
 class BonafideForm(db.Model):
+    __table_args__ = form_indexes('bonafide_form')
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
@@ -109,9 +147,12 @@ class BonafideForm(db.Model):
     school_place = db.Column(db.String(100), nullable=False)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     status = db.Column(db.String(20), default='pending')
 
 class HostelForm(db.Model):
+    __table_args__ = form_indexes('hostel_form')
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
@@ -157,6 +198,8 @@ class HostelForm(db.Model):
     status = db.Column(db.String(20), default='pending')
 
 class CaseRecord(db.Model):
+    __table_args__ = form_indexes('case_record')
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
@@ -215,6 +258,8 @@ class CaseRecord(db.Model):
     status = db.Column(db.String(20), default='pending')
 
 class PratinidhanForm(db.Model):
+    __table_args__ = form_indexes('pratinidhan_form')
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
@@ -229,4 +274,99 @@ class PratinidhanForm(db.Model):
     school_place = db.Column(db.String(100), nullable=False)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     status = db.Column(db.String(20), default='pending')
+
+class StoredFile(db.Model):
+    # Content-addressed upload (see uploads.py) and the number of form fields pointing at it
+    digest = db.Column(db.String(64), primary_key=True)
+    filename = db.Column(db.String(255), nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SearchDocument(db.Model):
+    # Normalized, denormalized text of one user or form, indexed by search.py
+    id = db.Column(db.Integer, primary_key=True)
+    doc_type = db.Column(db.String(20), nullable=False)  # 'user' or a FORM_MODELS key
+    ref_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.String(300))
+    student_id = db.Column(db.String(10))
+    body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime)
+    
+    __table_args__ = (db.UniqueConstraint('doc_type', 'ref_id'),)
+
+class FormEvent(db.Model):
+    # Append-only log of form lifecycle events written by events.py; never updated or deleted.
+    # Rows arrive in created_at order, so a BRIN index serves time-range scans on PostgreSQL
+    id = db.Column(db.Integer, primary_key=True)
+    form_type = db.Column(db.String(20), nullable=False)
+    form_id = db.Column(db.Integer)  # NULL for events covering many forms (exports)
+    event = db.Column(db.String(20), nullable=False)  # 'created', 'status', 'export', 'certificate'
+    old_status = db.Column(db.String(20))
+    new_status = db.Column(db.String(20))
+    actor_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    detail = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_form_event_form', 'form_type', 'form_id', 'created_at'),
+        db.Index('ix_form_event_created', 'created_at', postgresql_using='brin'),
+    )
+
+class Job(db.Model):
+    # Background task queued by jobs.py and claimed by in-process or standalone workers
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    payload = db.Column(db.Text, nullable=False, default='{}')  # JSON
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    progress_done = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer)
+    progress_message = db.Column(db.String(200))
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(100))
+    locked_at = db.Column(db.DateTime)  # heartbeat while running
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    __table_args__ = (db.Index('ix_job_status_run_at', 'status', 'run_at'),)
+
+class FormDraft(db.Model):
+    # Autosaved values of a form not yet submitted (drafts.py): one per user and form type,
+    # stored as zlib-compressed JSON of the fields filled so far
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    form_type = db.Column(db.String(20), nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'form_type'),
+        db.Index('ix_form_draft_expires_at', 'expires_at'),
+    )
+
+class FormStats(db.Model):
+    # Materialized per form type / status counters maintained by stats.py
+    id = db.Column(db.Integer, primary_key=True)
+    form_type = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    
+    __table_args__ = (db.UniqueConstraint('form_type', 'status'),)
+
+FORM_MODELS = {
+    'admission': AdmissionForm,
+    'bonafide': BonafideForm,
+    'hostel': HostelForm,
+    'case_record': CaseRecord,
+    'pratinidhan': PratinidhanForm
+}
@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+
+from sqlalchemy import func
+from sqlalchemy import select as sql_select
+
+from app import app, db
+
+CHANNEL = 'form_events'
+PUSHED_EVENTS = ('created', 'status')
+HEARTBEAT_INTERVAL = 15  # seconds between keep-alive comments on idle streams
+STREAM_LIFETIME = 600  # seconds before a stream ends and EventSource reconnects
+CLIENT_BUFFER = 100  # messages queued per client before it is considered stalled
+
+class Broker:
+    # In-process fan-out to connected SSE clients
+    def __init__(self):
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self):
+        with self.lock:
+            if len(self.subscribers) >= app.config['PUSH_MAX_CLIENTS']:
+                return None
+            subscriber = queue.Queue(maxsize=CLIENT_BUFFER)
+            self.subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, message):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # A stalled client misses messages rather than holding memory for them
+                pass
+
+broker = Broker()
+
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+def messages_for(rows):
+    # One message per created form; status changes are coalesced per (type, new status)
+    # so a bulk transition of thousands of forms is a single push
+    messages = []
+    transitions = {}
+    for row in rows:
+        if row['event'] == 'created':
+            messages.append({'event': 'created', 'form_type': row['form_type'],
+                             'form_id': row['form_id'], 'status': row['new_status']})
+        elif row['event'] == 'status':
+            key = (row['form_type'], row['new_status'])
+            entry = transitions.setdefault(key, {'event': 'status', 'form_type': key[0],
+                                                 'status': key[1], 'count': 0, 'form_ids': []})
+            entry['count'] += 1
+            if len(entry['form_ids']) < 50:
+                entry['form_ids'].append(row['form_id'])
+    return messages + list(transitions.values())
+
+def publish(connection, rows):
+    # Called by the event log writer inside the transaction that stores `rows`. On PostgreSQL
+    # NOTIFY reaches the listener of every worker process at commit; elsewhere there is only
+    # this process to tell
+    messages = messages_for([row for row in rows if row['event'] in PUSHED_EVENTS])
+    if not messages:
+        return
+    if connection.dialect.name == 'postgresql':
+        for message in messages:
+            connection.execute(sql_select(func.pg_notify(CHANNEL, json.dumps(message))))
+    else:
+        for message in messages:
+            broker.publish(message)
+
+def _listen():
+    while True:
+        try:
+            with app.app_context():
+                raw = db.engine.raw_connection()
+            try:
+                connection = raw.driver_connection
+                connection.autocommit = True
+                connection.cursor().execute(f"LISTEN {CHANNEL}")
+                while True:
+                    if select.select([connection], [], [], HEARTBEAT_INTERVAL) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notify = connection.notifies.pop(0)
+                        broker.publish(json.loads(notify.payload))
+            finally:
+                raw.invalidate()
+        except Exception:
+            logging.exception("Push listener lost its connection, reconnecting")
+            time.sleep(5)
+
+def ensure_listener():
+    # One LISTEN connection per worker process, started with the first subscriber
+    global _listener_pid
+    if _listener_pid == os.getpid():
+        return
+    with _listener_lock:
+        if _listener_pid == os.getpid():
+            return
+        if db.engine.dialect.name == 'postgresql':
+            threading.Thread(target=_listen, name='push-listener', daemon=True).start()
+        _listener_pid = os.getpid()
+
+def stream(subscriber):
+    # text/event-stream body; the comment lines keep proxies from closing idle streams
+    yield "retry: 5000\n\n"
+    deadline = time.monotonic() + STREAM_LIFETIME
+    try:
+        while time.monotonic() < deadline:
+            try:
+                message = subscriber.get(timeout=HEARTBEAT_INTERVAL)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: {message['event']}\ndata: {json.dumps(message)}\n\n"
+    finally:
+        broker.unsubscribe(subscriber)
@@ -1,13 +1,43 @@
 import os
-from datetime import datetime
-from flask import render_template, redirect, url_for, flash, request, current_app, send_from_directory
+import uuid
+import hmac
+import mimetypes
+from datetime import datetime, timedelta
+from flask import render_template, redirect, url_for, flash, request, current_app, send_from_directory, send_file, Response, stream_with_context, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.utils import secure_filename
-from sqlalchemy import func
+from markupsafe import Markup
+from werkzeug.security import safe_join
+from sqlalchemy import select, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only, joinedload
 
-from app import app, db
-from models import User, AdmissionForm, BonafideForm, HostelForm, CaseRecord, PratinidhanForm
-from forms import LoginForm, RegistrationForm, AdmissionFormForm, BonafideFormForm
+from app import app, db, GEVENT_PATCHED
+from models import User, BonafideForm, Job, FORM_MODELS
+from forms import LoginForm, RegistrationForm, AdmissionFormForm, BonafideFormForm, ActionForm
+import auth  # noqa: F401  its User listeners drop the cached login principal on change
+import stats
+import uploads
+import metrics
+import form_schema
+import search  # its mapper listeners index new users and forms
+import transitions
+import cache
+import events
+import jobs  # its before_request hook starts the job threads
+import push
+import drafts
+from form_filters import CLASS_COLUMNS, parse_date_arg, listing_filters, validate_filters, filter_forms_query
+
+# Columns rendered by admin_forms.html for each form type (besides the common ones)
+LISTING_COLUMNS = {
+    'admission': ('school_name', 'admission_class'),
+    'bonafide': ('class_standard', 'division'),
+    'hostel': ('hostel_name', 'parent_name'),
+    'case_record': ('age', 'gender'),
+    'pratinidhan': ('class_standard', 'academic_year')
+}
+
+ADMIN_PAGE_SIZE = 50
 
 def allowed_file(filename):
     return '.' in filename and \
@@ -15,15 +45,31 @@ def allowed_file(filename):
 
 def save_file(file):
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        # Add timestamp to avoid conflicts
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-        filename = timestamp + filename
-        file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
-        return filename
+        return uploads.store_upload(file)
     return None
 
+def encode_cursor(form):
+    return f"{form.created_at.isoformat()}_{form.id}"
+
+def decode_cursor(cursor):
+    try:
+        created_at, form_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(created_at), int(form_id)
+    except (AttributeError, ValueError):
+        return None
+
+def student_dashboard_data(user_id):
+    return cache.cached(
+        f'student_dashboard:{user_id}', (f'user:{user_id}',),
+        lambda: (stats.student_dashboard_stats(user_id),
+                 stats.recent_forms(limit=10, per_type_limit=5, user_id=user_id)))
+
+def admin_dashboard_data():
+    return cache.cached(
+        'admin_dashboard', ('stats', 'users'),
+        lambda: (stats.admin_dashboard_stats(),
+                 stats.recent_forms(limit=20, per_type_limit=10, with_student=True)))
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -37,6 +83,9 @@ def login():
     if form.validate_on_submit():
         user = User.query.filter_by(username=form.username.data).first()
         if user and user.check_password(form.password.data):
+            if db.session.is_modified(user):
+                # Rehashed under the current PASSWORD_HASH_METHOD
+                db.session.commit()
             login_user(user)
             next_page = request.args.get('next')
             if not next_page:
@@ -73,8 +122,14 @@ def register():
             flash(f'नोंदणी यशस्वी झाली! तुमचा विद्यार्थी ID: {user.student_id} / Registration successful! Your Student ID: {user.student_id}', 'success')
             return redirect(url_for('login'))
         except ValueError as e:
+            db.session.rollback()
             flash(str(e), 'danger')
             return render_template('register.html', form=form)
+        except IntegrityError:
+            # A parallel registration took the same username or email first
+            db.session.rollback()
+            flash('वापरकर्ता नाव किंवा ईमेल आधीपासून अस्तित्वात आहे / Username or email already exists', 'danger')
+            return render_template('register.html', form=form)
     
     return render_template('register.html', form=form)
 
@@ -91,31 +146,9 @@ def student_dashboard():
     if current_user.is_admin:
         return redirect(url_for('admin_dashboard'))
     
-    # Get statistics for current user
-    stats = {
-        'admission_forms': AdmissionForm.query.filter_by(user_id=current_user.id).count(),
-        'bonafide_forms': BonafideForm.query.filter_by(user_id=current_user.id).count(),
-        'hostel_forms': HostelForm.query.filter_by(user_id=current_user.id).count(),
-        'case_records': CaseRecord.query.filter_by(user_id=current_user.id).count(),
-        'pratinidhan_forms': PratinidhanForm.query.filter_by(user_id=current_user.id).count(),
-    }
-    
-    # Get recent forms
-    recent_forms = []
-    for form_class in [AdmissionForm, BonafideForm, HostelForm, CaseRecord, PratinidhanForm]:
-        forms = form_class.query.filter_by(user_id=current_user.id).order_by(form_class.created_at.desc()).limit(5).all()
-        for form in forms:
-            recent_forms.append({
-                'type': form_class.__name__,
-                'id': form.id,
-                'created_at': form.created_at,
-                'status': form.status
-            })
+    stats_data, recent_forms = student_dashboard_data(current_user.id)
     
-    recent_forms.sort(key=lambda x: x['created_at'], reverse=True)
-    recent_forms = recent_forms[:10]
-    
-    return render_template('student_dashboard.html', stats=stats, recent_forms=recent_forms)
+    return render_template('student_dashboard.html', stats=stats_data, recent_forms=recent_forms)
 
 @app.route('/admin_dashboard')
 @login_required
@@ -124,43 +157,50 @@ def admin_dashboard():
         flash('प्रवेश नाकारला / Access denied', 'danger')
         return redirect(url_for('student_dashboard'))
     
-    # Get overall statistics
-    stats = {
-        'total_students': User.query.filter_by(is_admin=False).count(),
-        'total_admission_forms': AdmissionForm.query.count(),
-        'total_bonafide_forms': BonafideForm.query.count(),
-        'total_hostel_forms': HostelForm.query.count(),
-        'total_case_records': CaseRecord.query.count(),
-        'total_pratinidhan_forms': PratinidhanForm.query.count(),
-        'pending_forms': (
-            AdmissionForm.query.filter_by(status='pending').count() +
-            BonafideForm.query.filter_by(status='pending').count() +
-            HostelForm.query.filter_by(status='pending').count() +
-            CaseRecord.query.filter_by(status='pending').count() +
-            PratinidhanForm.query.filter_by(status='pending').count()
-        )
-    }
+    stats_data, recent_forms = admin_dashboard_data()
     
-    # Get recent forms from all users
-    recent_forms = []
-    for form_class in [AdmissionForm, BonafideForm, HostelForm, CaseRecord, PratinidhanForm]:
-        forms = form_class.query.order_by(form_class.created_at.desc()).limit(10).all()
-        for form in forms:
-            user = User.query.get(form.user_id)
-            if user:
-                recent_forms.append({
-                    'type': form_class.__name__,
-                    'id': form.id,
-                    'created_at': form.created_at,
-                    'status': form.status,
-                    'student_name': user.full_name,
-                    'student_id': user.student_id
-                })
-    
-    recent_forms.sort(key=lambda x: x['created_at'], reverse=True)
-    recent_forms = recent_forms[:20]
-    
-    return render_template('admin_dashboard.html', stats=stats, recent_forms=recent_forms)
+    return render_template('admin_dashboard.html', stats=stats_data, recent_forms=recent_forms)
+
+@app.route('/api/stats')
+@login_required
+def api_stats():
+    # Dashboard counters for refreshDashboardStats in main.js. The ETag follows the
+    # stats_version counter, so an unchanged dashboard costs one indexed lookup and a 304
+    version = stats.stats_version()
+    etag = f"{version}-{'admin' if current_user.is_admin else current_user.id}"
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        if current_user.is_admin:
+            stats_data = admin_dashboard_data()[0]
+        else:
+            stats_data = dict(student_dashboard_data(current_user.id)[0])
+            stats_data['total_forms'] = sum(stats_data.values())
+        response = jsonify(version=version, stats=stats_data)
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/admin/events/stream')
+@login_required
+def admin_event_stream():
+    # Server-sent events for new submissions and status changes (push.py). Needs an async
+    # worker (gunicorn -k gevent) since each open stream holds its connection; elsewhere
+    # PUSH_MAX_CLIENTS defaults to 0 and every client gets the 503 that sends it to polling
+    if not current_user.is_admin:
+        return jsonify(error='Access denied'), 403
+    push.ensure_listener()
+    subscriber = push.broker.subscribe()
+    if subscriber is None:
+        response = jsonify(error='Too many open event streams')
+        response.status_code = 503
+        response.headers['Retry-After'] = '60'
+        return response
+    response = Response(push.stream(subscriber), mimetype='text/event-stream')
+    response.cache_control.no_cache = True
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @app.route('/admission_form', methods=['GET', 'POST'])
 @login_required
@@ -178,40 +218,11 @@ def admission_form():
         if form.parent_photo.data:
             parent_photo_filename = save_file(form.parent_photo.data)
         
-        admission_form = AdmissionForm()
-        admission_form.user_id = current_user.id
-        admission_form.school_name = form.school_name.data
-        admission_form.continuous_student_id = form.continuous_student_id.data
-        admission_form.udise_pen = form.udise_pen.data
-        admission_form.admission_class = form.admission_class.data
-        admission_form.birth_register_no = form.birth_register_no.data
-        admission_form.aadhaar_no = form.aadhaar_no.data
-        admission_form.birth_date = form.birth_date.data
-        admission_form.admission_date = form.admission_date.data
-        admission_form.gender = form.gender.data
-        admission_form.student_photo = student_photo_filename
-        admission_form.parent_photo = parent_photo_filename
-        admission_form.first_name_marathi = form.first_name_marathi.data
-        admission_form.last_name_marathi = form.last_name_marathi.data
-        admission_form.father_name = form.father_name.data
-        admission_form.mother_name = form.mother_name.data
-        admission_form.birth_date_words = form.birth_date_words.data
-        admission_form.religion = form.religion.data
-        admission_form.caste = form.caste.data
-        admission_form.sub_caste = form.sub_caste.data
-        admission_form.caste_certificate = form.caste_certificate.data
-        admission_form.is_minority = form.is_minority.data
-        admission_form.nationality = form.nationality.data
-        admission_form.mother_tongue = form.mother_tongue.data
-        admission_form.mobile_number = form.mobile_number.data
-        admission_form.bpl_status = form.bpl_status.data
-        admission_form.bpl_number = form.bpl_number.data
-        admission_form.disability_status = form.disability_status.data
-        admission_form.disability_type = form.disability_type.data
-        admission_form.parent_full_name = form.parent_full_name.data
-        admission_form.address = form.address.data
-        
-        db.session.add(admission_form)
+        admission_form = form_schema.create_form('admission', form.data,
+                                                 user_id=current_user.id,
+                                                 student_photo=student_photo_filename,
+                                                 parent_photo=parent_photo_filename)
+        drafts.discard(current_user.id, 'admission')
         db.session.commit()
         
         flash('प्रवेश अर्ज यशस्वीरित्या जमा झाला! / Admission form submitted successfully!', 'success')
@@ -225,19 +236,7 @@ def bonafide_form():
     form = BonafideFormForm()
     
     if form.validate_on_submit():
-        bonafide = BonafideForm()
-        bonafide.user_id = current_user.id
-        bonafide.student_name = form.student_name.data
-        bonafide.academic_year = form.academic_year.data
-        bonafide.class_standard = form.class_standard.data
-        bonafide.division = form.division.data
-        bonafide.conduct = form.conduct.data
-        bonafide.caste = form.caste.data
-        bonafide.birth_date = form.birth_date.data
-        bonafide.birth_place = form.birth_place.data
-        bonafide.school_place = form.school_place.data
-        
-        db.session.add(bonafide)
+        bonafide = form_schema.create_form('bonafide', form.data, user_id=current_user.id)
         db.session.commit()
         
         flash('बोनाफाइड अर्ज यशस्वीरित्या जमा झाला! / Bonafide form submitted successfully!', 'success')
@@ -257,6 +256,83 @@ def bonafide_certificate(form_id):
     
     return render_template('bonafide_certificate.html', bonafide=bonafide, student=bonafide.student)
 
+@app.route('/certificate/<form_type>/<int:form_id>.pdf')
+@login_required
+def certificate_pdf(form_type, form_id):
+    import certificates
+    if form_type not in certificates.CERTIFICATE_MODELS:
+        flash('अवैध फॉर्म प्रकार / Invalid form type', 'danger')
+        return redirect(url_for('student_dashboard'))
+    
+    certificate = certificates.CERTIFICATE_MODELS[form_type].query.get_or_404(form_id)
+    
+    # Check if user owns this form or is admin
+    if certificate.user_id != current_user.id and not current_user.is_admin:
+        flash('प्रवेश नाकारला / Access denied', 'danger')
+        return redirect(url_for('student_dashboard'))
+    
+    # Only approved forms get a certificate, as in the admin bundle
+    if certificate.status != 'approved':
+        flash('प्रमाणपत्र फक्त मंजूर अर्जांसाठी / Certificates are issued for approved forms only', 'warning')
+        return redirect(request.referrer or url_for('student_dashboard'))
+    
+    if not certificates.pdf_renderer_available():
+        flash('PDF निर्मिती उपलब्ध नाही / PDF rendering is not available on this server', 'danger')
+        return redirect(request.referrer or url_for('student_dashboard'))
+    
+    path = certificates.render_certificates(form_type, [certificate])[0]
+    events.log_event(form_type, certificate.id, 'certificate', actor_id=current_user.id, detail='pdf')
+    return send_file(os.path.abspath(path), mimetype='application/pdf',
+                     download_name=f"{form_type}_certificate_{certificate.id}.pdf")
+
+@app.route('/admin/certificates/<form_type>')
+@login_required
+def certificate_bundle(form_type):
+    import certificates
+    if not current_user.is_admin:
+        flash('प्रवेश नाकारला / Access denied', 'danger')
+        return redirect(url_for('student_dashboard'))
+    
+    if form_type not in certificates.CERTIFICATE_MODELS:
+        flash('अवैध फॉर्म प्रकार / Invalid form type', 'danger')
+        return redirect(url_for('admin_dashboard'))
+    
+    bundle_format = request.args.get('format', 'pdf')
+    if not certificates.pdf_renderer_available():
+        flash('PDF निर्मिती उपलब्ध नाही / PDF rendering is not available on this server', 'danger')
+        return redirect(url_for('admin_forms', form_type=form_type))
+    
+    # Under gevent a bundle is always a job: rendering and merging inline would stall every
+    # request on this worker, and the job process runs them on real threads
+    if request.args.get('background') == '1' or GEVENT_PATCHED:
+        filters = {key: request.args[key] for key in certificates.BUNDLE_FILTERS if request.args.get(key)}
+        return submit_admin_job('certificate_bundle', form_type=form_type, format=bundle_format,
+                                filters=filters, actor_id=current_user.id)
+    
+    approved = certificates.approved_forms(form_type, request.args)
+    
+    if not approved:
+        flash('मंजूर प्रमाणपत्रे आढळली नाहीत / No approved certificates found', 'warning')
+        return redirect(url_for('admin_forms', form_type=form_type))
+    
+    paths = certificates.render_certificates(form_type, approved)
+    events.log_events([events.make_event(form_type, form.id, 'certificate', actor_id=current_user.id,
+                                         detail=bundle_format) for form in approved])
+    label = certificates.bundle_label(request.args)
+    
+    if bundle_format == 'pdf':
+        try:
+            data = certificates.merge_pdfs(paths)
+        except ImportError:
+            flash('Merged PDF requires pypdf, download the ZIP instead / ZIP डाउनलोड करा', 'danger')
+            return redirect(url_for('admin_forms', form_type=form_type))
+        return Response(data, mimetype='application/pdf', headers={
+            'Content-Disposition': f'attachment; filename="{form_type}_certificates_{label}.pdf"'})
+    
+    entries = certificates.zip_entries(form_type, approved, paths)
+    return Response(certificates.zip_pdfs(entries), mimetype='application/zip', headers={
+        'Content-Disposition': f'attachment; filename="{form_type}_certificates_{label}.zip"'})
+
 @app.route('/hostel_form', methods=['GET', 'POST'])
 @login_required
 def hostel_form():
@@ -266,34 +342,11 @@ def hostel_form():
         student_signature = save_file(request.files.get('student_signature'))
         warden_signature = save_file(request.files.get('warden_signature'))
         
-        hostel = HostelForm()
-        hostel.user_id = current_user.id
-        hostel.hostel_name = request.form.get('hostel_name')
-        hostel.hostel_address = request.form.get('hostel_address')
-        hostel.parent_name = request.form.get('parent_name')
-        hostel.parent_address = request.form.get('parent_address')
-        hostel.student_name = request.form.get('student_name')
-        hostel.student_address = request.form.get('student_address')
-        hostel.phone = request.form.get('phone')
-        hostel.caste = request.form.get('caste')
-        hostel.birth_village = request.form.get('birth_village')
-        hostel.birth_taluka = request.form.get('birth_taluka')
-        hostel.birth_district = request.form.get('birth_district')
-        hostel.birth_date = datetime.strptime(request.form.get('birth_date'), '%Y-%m-%d').date() if request.form.get('birth_date') else None
-        hostel.age_years = int(request.form.get('age_years')) if request.form.get('age_years') else None
-        hostel.age_months = int(request.form.get('age_months')) if request.form.get('age_months') else None
-        hostel.education = request.form.get('education')
-        hostel.previous_school = request.form.get('previous_school')
-        hostel.annual_income = request.form.get('annual_income')
-        hostel.exam_results = request.form.get('exam_results')
-        hostel.guardian_name = request.form.get('guardian_name')
-        hostel.register_number = request.form.get('register_number')
-        hostel.received_date = datetime.strptime(request.form.get('received_date'), '%Y-%m-%d').date() if request.form.get('received_date') else None
-        hostel.parent_signature = parent_signature
-        hostel.student_signature = student_signature
-        hostel.warden_signature = warden_signature
-        
-        db.session.add(hostel)
+        hostel = form_schema.create_form('hostel', request.form,
+                                         user_id=current_user.id,
+                                         parent_signature=parent_signature,
+                                         student_signature=student_signature,
+                                         warden_signature=warden_signature)
         db.session.commit()
         
         flash('वसतिगृह अर्ज यशस्वीरित्या जमा झाला! / Hostel form submitted successfully!', 'success')
@@ -305,45 +358,8 @@ def hostel_form():
 @login_required
 def case_record_form():
     if request.method == 'POST':
-        case_record = CaseRecord()
-        case_record.user_id = current_user.id
-        case_record.name = request.form.get('name')
-        case_record.birth_date = datetime.strptime(request.form.get('birth_date'), '%Y-%m-%d').date() if request.form.get('birth_date') else None
-        case_record.age = int(request.form.get('age')) if request.form.get('age') else None
-        case_record.gender = request.form.get('gender')
-        case_record.education = request.form.get('education')
-        case_record.father_name = request.form.get('father_name')
-        case_record.father_education = request.form.get('father_education')
-        case_record.father_occupation = request.form.get('father_occupation')
-        case_record.father_income = request.form.get('father_income')
-        case_record.mother_name = request.form.get('mother_name')
-        case_record.mother_education = request.form.get('mother_education')
-        case_record.mother_occupation = request.form.get('mother_occupation')
-        case_record.mother_income = request.form.get('mother_income')
-        case_record.guardian_name = request.form.get('guardian_name')
-        case_record.guardian_education = request.form.get('guardian_education')
-        case_record.guardian_occupation = request.form.get('guardian_occupation')
-        case_record.guardian_income = request.form.get('guardian_income')
-        case_record.guardian_address = request.form.get('guardian_address')
-        case_record.guardian_mobile = request.form.get('guardian_mobile')
-        case_record.relatives_address = request.form.get('relatives_address')
-        case_record.permanent_address = request.form.get('permanent_address')
-        case_record.economic_status = request.form.get('economic_status')
-        case_record.area_type = request.form.get('area_type')
-        case_record.religion = request.form.get('religion')
-        case_record.caste = request.form.get('caste')
-        case_record.mother_tongue = request.form.get('mother_tongue')
-        case_record.info_relation_personal = request.form.get('info_relation_personal')
-        case_record.contact_duration = request.form.get('contact_duration')
-        case_record.info_trustworthiness = request.form.get('info_trustworthiness')
-        case_record.info_completeness = request.form.get('info_completeness')
-        case_record.complaint_details = request.form.get('complaint_details')
-        case_record.past_treatment_medications = request.form.get('past_treatment_medications')
-        case_record.past_treatment_professional = request.form.get('past_treatment_professional')
-        case_record.past_treatment_physical = request.form.get('past_treatment_physical')
-        case_record.past_treatment_other = request.form.get('past_treatment_other')
-        
-        db.session.add(case_record)
+        case_record = form_schema.create_form('case_record', request.form, user_id=current_user.id)
+        drafts.discard(current_user.id, 'case_record')
         db.session.commit()
         
         flash('केस रेकॉर्ड यशस्वीरित्या जमा झाला! / Case record submitted successfully!', 'success')
@@ -355,19 +371,7 @@ def case_record_form():
 @login_required
 def pratinidhan_form():
     if request.method == 'POST':
-        pratinidhan = PratinidhanForm()
-        pratinidhan.user_id = current_user.id
-        pratinidhan.student_name = request.form.get('student_name')
-        pratinidhan.academic_year = request.form.get('academic_year')
-        pratinidhan.class_standard = request.form.get('class_standard')
-        pratinidhan.division = request.form.get('division')
-        pratinidhan.conduct = request.form.get('conduct')
-        pratinidhan.caste = request.form.get('caste')
-        pratinidhan.birth_date = datetime.strptime(request.form.get('birth_date'), '%Y-%m-%d').date() if request.form.get('birth_date') else None
-        pratinidhan.birth_place = request.form.get('birth_place')
-        pratinidhan.school_place = request.form.get('school_place')
-        
-        db.session.add(pratinidhan)
+        pratinidhan = form_schema.create_form('pratinidhan', request.form, user_id=current_user.id)
         db.session.commit()
         
         flash('प्रतिनिधान अर्ज यशस्वीरित्या जमा झाला! / Pratinidhan form submitted successfully!', 'success')
@@ -375,6 +379,87 @@ def pratinidhan_form():
     
     return render_template('pratinidhan_form.html')
 
+@app.route('/api/forms/<form_type>', methods=['POST'])
+@login_required
+def api_submit_forms(form_type):
+    # Accepts one JSON object or a list of them; admins may submit on behalf of a student via user_id
+    if form_type not in form_schema.SCHEMAS:
+        return jsonify(error='Invalid form type'), 404
+    
+    payload = request.get_json(silent=True)
+    items = [payload] if isinstance(payload, dict) else payload
+    if not isinstance(items, list) or not items:
+        return jsonify(error='Expected a JSON object or a non-empty list of objects'), 400
+    
+    schema = form_schema.SCHEMAS[form_type]
+    results = []
+    created = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({'index': index, 'errors': ['Expected a JSON object']})
+            continue
+        
+        item = dict(item)
+        user_id = current_user.id
+        if 'user_id' in item:
+            requested = item.pop('user_id')
+            if requested != current_user.id and not current_user.is_admin:
+                results.append({'index': index, 'errors': ['user_id is only accepted from admins']})
+                continue
+            if not isinstance(requested, int) or db.session.get(User, requested) is None:
+                results.append({'index': index, 'errors': ['Unknown user_id']})
+                continue
+            user_id = requested
+        
+        errors = [f"{name} is required" for name in schema.missing_fields(item)]
+        errors += [f"{name} is not a field of this form" for name in schema.unknown_fields(item)]
+        errors += [f"{name} is longer than {schema.max_lengths[name]} characters"
+                   for name in schema.too_long_fields(item)]
+        if not errors:
+            try:
+                created.append((index, form_schema.create_form(form_type, item, user_id=user_id)))
+                continue
+            except (TypeError, ValueError) as e:
+                errors.append(str(e))
+        results.append({'index': index, 'errors': errors})
+    
+    db.session.commit()
+    results += [{'index': index, 'id': form.id} for index, form in created]
+    results.sort(key=lambda result: result['index'])
+    return jsonify(created=len(created), results=results), 201 if created else 400
+
+@app.route('/api/drafts/<form_type>', methods=['GET', 'PATCH', 'DELETE'])
+@login_required
+def api_draft(form_type):
+    # Autosave for the long forms: GET the saved fields, PATCH {"field": value} with only the
+    # fields changed since the last save (null clears one), DELETE to discard
+    if form_type not in drafts.DRAFT_FORM_TYPES:
+        return jsonify(error='Invalid form type'), 404
+    
+    if request.method == 'GET':
+        draft = drafts.load(current_user.id, form_type)
+        response = jsonify(fields=drafts.fields(draft),
+                           updated_at=draft.updated_at.isoformat() if draft else None)
+        response.cache_control.no_store = True
+        return response
+    
+    if request.method == 'DELETE':
+        drafts.discard(current_user.id, form_type)
+        db.session.commit()
+        return '', 204
+    
+    patch = request.get_json(silent=True)
+    if not isinstance(patch, dict):
+        return jsonify(error='Expected a JSON object of changed fields'), 400
+    errors = drafts.validate_patch(form_type, patch)
+    if errors:
+        return jsonify(errors=errors), 400
+    try:
+        drafts.apply_patch(current_user.id, form_type, patch)
+    except ValueError as e:
+        return jsonify(error=str(e)), 413
+    return '', 204
+
 @app.route('/form_success/<form_type>/<int:form_id>')
 @login_required
 def form_success(form_type, form_id):
@@ -391,10 +476,42 @@ def form_success(form_type, form_id):
                          form_id=form_id, 
                          form_name=form_names.get(form_type, 'Form'))
 
-@app.route('/uploads/<filename>')
+@app.route('/uploads/<path:filename>')
 @login_required
 def uploaded_file(filename):
-    return send_from_directory(current_app.config['UPLOAD_FOLDER'], filename)
+    folder = current_app.config['UPLOAD_FOLDER']
+    if request.args.get('thumb') == '1':
+        thumbnail = safe_join(folder, uploads.thumbnail_name(filename))
+        if not (thumbnail and os.path.exists(thumbnail)):
+            # Legacy upload or thumbnail still being generated: serve the original uncached
+            return send_from_directory(folder, filename)
+        filename = uploads.thumbnail_name(filename)
+    
+    etag = uploads.etag_for(filename)
+    if etag is None:
+        # Legacy timestamp-named upload: default mtime/size validators, no long-lived caching
+        return send_from_directory(folder, filename)
+    
+    accel_prefix = current_app.config.get('UPLOAD_ACCEL_REDIRECT')
+    if accel_prefix and safe_join(folder, filename):
+        response = Response(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        response.set_etag(etag)
+        # Revalidations end here; nginx only streams the body (and Range) for real fetches.
+        # nginx follows the header whatever the status, so a 304 must not carry it
+        response = response.make_conditional(request)
+        if response.status_code == 200:
+            response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + filename
+    else:
+        # Answers If-None-Match, If-Range and Range itself, or emits X-Sendfile when enabled
+        response = send_from_directory(folder, filename, etag=etag, max_age=31536000)
+    
+    # Content-addressed bytes never change; the files are per-student, so keep them out of shared caches
+    response.cache_control.no_cache = None
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
 
 # Admin routes for managing forms
 @app.route('/admin/forms/<form_type>')
@@ -404,25 +521,177 @@ def admin_forms(form_type):
         flash('प्रवेश नाकारला / Access denied', 'danger')
         return redirect(url_for('student_dashboard'))
     
-    form_models = {
-        'admission': AdmissionForm,
-        'bonafide': BonafideForm,
-        'hostel': HostelForm,
-        'case_record': CaseRecord,
-        'pratinidhan': PratinidhanForm
-    }
+    if form_type not in FORM_MODELS:
+        flash('अवैध फॉर्म प्रकार / Invalid form type', 'danger')
+        return redirect(url_for('admin_dashboard'))
     
-    if form_type not in form_models:
+    model = FORM_MODELS[form_type]
+    filters = listing_filters(request.args)
+    cursor = decode_cursor(request.args.get('after'))
+    
+    def render_table():
+        columns = [getattr(model, name) for name in
+                   ('id', 'user_id', 'created_at', 'status') + LISTING_COLUMNS[form_type]]
+        query = model.query.options(
+            load_only(*columns),
+            joinedload(model.student).load_only(User.full_name, User.email, User.student_id)
+        )
+        query = filter_forms_query(query, model, request.args)
+        
+        # Keyset pagination on (created_at, id), newest first
+        if cursor:
+            created_at, form_id = cursor
+            query = query.filter(or_(model.created_at < created_at,
+                                     and_(model.created_at == created_at, model.id < form_id)))
+        
+        forms = query.order_by(model.created_at.desc(), model.id.desc()).limit(ADMIN_PAGE_SIZE + 1).all()
+        next_cursor = None
+        if len(forms) > ADMIN_PAGE_SIZE:
+            forms = forms[:ADMIN_PAGE_SIZE]
+            next_cursor = encode_cursor(forms[-1])
+        return render_template('admin_forms_table.html', forms=forms, form_type=form_type,
+                               filters=filters, next_cursor=next_cursor,
+                               is_first_page=cursor is None)
+    
+    # The rendered table is shared by all admins until a form of this type or a user changes
+    key = f"admin_forms:{form_type}:{sorted(filters.items())}:{request.args.get('after') if cursor else ''}"
+    table_html = cache.cached(key, (f'forms:{form_type}', 'users'), render_table)
+    return render_template('admin_forms.html', table_html=Markup(table_html), form_type=form_type,
+                           filters=filters, has_class_filter=model in CLASS_COLUMNS,
+                           action_form=ActionForm())
+
+@app.route('/admin/forms/<form_type>/export')
+@login_required
+def export_forms(form_type):
+    import exports
+    if not current_user.is_admin:
+        flash('प्रवेश नाकारला / Access denied', 'danger')
+        return redirect(url_for('student_dashboard'))
+    
+    export_format = request.args.get('format', 'csv')
+    if form_type not in FORM_MODELS or export_format not in exports.EXPORT_GENERATORS:
         flash('अवैध फॉर्म प्रकार / Invalid form type', 'danger')
         return redirect(url_for('admin_dashboard'))
     
-    forms = form_models[form_type].query.order_by(form_models[form_type].created_at.desc()).all()
+    if export_format == 'xlsx':
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            flash('XLSX export requires openpyxl / openpyxl आवश्यक आहे', 'danger')
+            return redirect(url_for('admin_forms', form_type=form_type))
+    
+    filters = listing_filters(request.args)
+    include_user = request.args.get('include_user') == '1'
+    if request.args.get('background') == '1':
+        return submit_admin_job('export_forms', form_type=form_type, format=export_format,
+                                include_user=include_user, filters=filters, actor_id=current_user.id)
+    
+    model = FORM_MODELS[form_type]
+    stmt = exports.export_statement(model, include_user=include_user)
+    stmt = filter_forms_query(stmt, model, request.args)
+    body = exports.EXPORT_GENERATORS[export_format](exports.stream_rows(stmt, model))
+    events.log_event(form_type, None, 'export', actor_id=current_user.id,
+                     detail=' '.join([export_format] + [f"{key}={value}" for key, value in filters.items()]))
+    
+    filename = f"{form_type}_forms_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    return Response(stream_with_context(body),
+                    mimetype=exports.EXPORT_MIMETYPES[export_format],
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
+
+@app.route('/admin/search')
+@login_required
+def admin_search():
+    if not current_user.is_admin:
+        flash('प्रवेश नाकारला / Access denied', 'danger')
+        return redirect(url_for('student_dashboard'))
+    
+    query = request.args.get('q', '').strip()
+    doc_type = request.args.get('type')
+    doc_types = [doc_type] if doc_type in search.SEARCH_FIELDS else None
+    results = search.search(query, limit=100, doc_types=doc_types) if query else []
+    return render_template('admin_search.html', query=query, doc_type=doc_type or '',
+                           doc_types=list(search.SEARCH_FIELDS), results=results)
+
+@app.route('/admin/import', methods=['GET', 'POST'])
+@login_required
+def admin_import():
+    import importer
+    if not current_user.is_admin:
+        flash('प्रवेश नाकारला / Access denied', 'danger')
+        return redirect(url_for('student_dashboard'))
     
-    # Add student information to each form
-    for form in forms:
-        form.student = User.query.get(form.user_id)
+    form = ActionForm()
+    if request.method == 'POST':
+        if not form.validate():
+            flash('सत्र कालबाह्य, पुन्हा प्रयत्न करा / Session expired, please try again', 'danger')
+            return redirect(url_for('admin_import'))
+        kind = request.form.get('kind')
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('कृपया CSV फाइल निवडा / Please choose a CSV file', 'danger')
+            return redirect(url_for('admin_import'))
+        
+        if kind != 'students' and kind not in FORM_MODELS:
+            flash('अवैध फॉर्म प्रकार / Invalid form type', 'danger')
+            return redirect(url_for('admin_import'))
+        
+        # Always a job: password hashing for a large file would hold this worker for minutes
+        path = jobs.result_path(f"upload_{uuid.uuid4().hex}.csv")
+        upload.save(path)
+        return submit_admin_job('import_csv', kind=kind, path=path)
+    
+    return render_template('admin_import.html', form=form, form_types=list(FORM_MODELS),
+                           student_columns=importer.STUDENT_COLUMNS)
+
+@app.route('/admin/metrics')
+@login_required
+def admin_metrics():
+    if not current_user.is_admin:
+        flash('प्रवेश नाकारला / Access denied', 'danger')
+        return redirect(url_for('student_dashboard'))
+    
+    return render_template('admin_metrics.html', rows=metrics.summary_rows(),
+                           sample_rate=metrics.SAMPLE_RATE, pid=os.getpid())
+
+@app.route('/admin/reports/turnaround')
+@login_required
+def turnaround_report():
+    if not current_user.is_admin:
+        flash('प्रवेश नाकारला / Access denied', 'danger')
+        return redirect(url_for('student_dashboard'))
+    
+    date_from = parse_date_arg(request.args.get('date_from'))
+    date_to = parse_date_arg(request.args.get('date_to'))
+    report = events.turnaround_report(date_from, date_to + timedelta(days=1) if date_to else None)
+    filters = {key: request.args[key] for key in ('date_from', 'date_to') if request.args.get(key)}
+    return render_template('admin_turnaround.html', report=report, filters=filters)
+
+@app.route('/admin/form/<form_type>/<int:form_id>/history')
+@login_required
+def form_history(form_type, form_id):
+    if not current_user.is_admin:
+        return jsonify(error='Access denied'), 403
+    if form_type not in FORM_MODELS:
+        return jsonify(error='Invalid form type'), 404
     
-    return render_template('admin_forms.html', forms=forms, form_type=form_type)
+    history = events.form_history(form_type, form_id)
+    actors = dict(db.session.execute(
+        select(User.id, User.full_name).where(User.id.in_({e.actor_id for e in history if e.actor_id}))).all())
+    return jsonify(events=[{
+        'event': e.event, 'old_status': e.old_status, 'new_status': e.new_status,
+        'actor': actors.get(e.actor_id), 'detail': e.detail, 'at': e.created_at.isoformat()
+    } for e in history])
+
+@app.route('/metrics')
+def prometheus_metrics():
+    token = current_app.config.get('METRICS_TOKEN')
+    # Compared as bytes: compare_digest rejects str with non-ASCII characters
+    authorization = request.headers.get('Authorization', '').encode('utf-8')
+    authorized = (current_user.is_authenticated and current_user.is_admin) or \
+                 (token and hmac.compare_digest(authorization, f'Bearer {token}'.encode('utf-8')))
+    if not authorized:
+        return Response('Forbidden\n', status=403, mimetype='text/plain')
+    return Response(metrics.prometheus_text(), mimetype='text/plain; version=0.0.4')
 
 @app.route('/admin/form/<form_type>/<int:form_id>/update_status', methods=['POST'])
 @login_required
@@ -431,26 +700,172 @@ def update_form_status(form_type, form_id):
         flash('प्रवेश नाकारला / Access denied', 'danger')
         return redirect(url_for('student_dashboard'))
     
-    form_models = {
-        'admission': AdmissionForm,
-        'bonafide': BonafideForm,
-        'hostel': HostelForm,
-        'case_record': CaseRecord,
-        'pratinidhan': PratinidhanForm
-    }
-    
-    if form_type not in form_models:
+    if form_type not in FORM_MODELS:
         flash('अवैध फॉर्म प्रकार / Invalid form type', 'danger')
         return redirect(url_for('admin_dashboard'))
     
-    form = form_models[form_type].query.get_or_404(form_id)
+    form = FORM_MODELS[form_type].query.get_or_404(form_id)
     new_status = request.form.get('status')
     
-    if new_status in ['pending', 'approved', 'rejected']:
+    if new_status in transitions.FORM_STATUSES:
+        old_status = form.status
         form.status = new_status
+        if old_status != new_status:
+            stats.record_status_change(form_type, old_status, new_status, user_ids=[form.user_id])
+            transitions.record_status_events(form_type, [form.id], old_status, new_status, current_user.id)
         db.session.commit()
         flash('स्थिती अद्यतनित केली गेली / Status updated', 'success')
     else:
         flash('अवैध स्थिती / Invalid status', 'danger')
     
     return redirect(url_for('admin_forms', form_type=form_type))
+
+@app.route('/admin/forms/<form_type>/bulk_status', methods=['POST'])
+@login_required
+def bulk_update_status(form_type):
+    # Form posts from admin_forms.html redirect back with a summary; JSON clients get per-id results:
+    # {"status": "approved", "ids": [..]} or {"status": "approved", "filter": {"status": "pending", ...}},
+    # optionally with "expected_status" to only move forms still in that status
+    # JSON needs no CSRF token: a cross-site page cannot send application/json without a CORS
+    # preflight, which this app never grants
+    wants_json = request.is_json
+    if not current_user.is_admin:
+        if wants_json:
+            return jsonify(error='Access denied'), 403
+        flash('प्रवेश नाकारला / Access denied', 'danger')
+        return redirect(url_for('student_dashboard'))
+    
+    if form_type not in FORM_MODELS:
+        if wants_json:
+            return jsonify(error='Invalid form type'), 404
+        flash('अवैध फॉर्म प्रकार / Invalid form type', 'danger')
+        return redirect(url_for('admin_dashboard'))
+    
+    model = FORM_MODELS[form_type]
+    if wants_json:
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return jsonify(error='Expected a JSON object'), 400
+        new_status = payload.get('status')
+        expected_status = payload.get('expected_status')
+        ids = payload.get('ids')
+        filters = payload.get('filter')
+        if ids is not None and (not isinstance(ids, list) or not all(isinstance(i, int) for i in ids)):
+            return jsonify(error='ids must be a list of integers'), 400
+        if filters is not None and not isinstance(filters, dict):
+            return jsonify(error='filter must be an object'), 400
+    else:
+        if not ActionForm().validate():
+            # Missing or stale CSRF token: a cross-site post must not move any forms
+            flash('सत्र कालबाह्य, पुन्हा प्रयत्न करा / Session expired, please try again', 'danger')
+            return redirect(url_for('admin_forms', form_type=form_type))
+        new_status = request.form.get('new_status')
+        ids = request.form.getlist('ids', type=int) if request.form.get('scope') != 'filter' else None
+        filters = listing_filters(request.form)
+        # Forms picked from a status-filtered queue must still be in that status
+        expected_status = filters.get('status')
+    
+    if ids is None:
+        # Never transition a whole table by omission: the filter must apply every key it has
+        errors = validate_filters(model, filters or {})
+        if errors:
+            if wants_json:
+                return jsonify(error='Either ids or a valid, non-empty filter is required',
+                               errors=errors), 400
+            flash('कोणतेही अर्ज निवडले नाहीत / No forms selected', 'warning')
+            return redirect(url_for('admin_forms', form_type=form_type))
+        ids = db.session.scalars(filter_forms_query(select(model.id), model, filters)
+                                 .order_by(model.id)).all()
+    
+    try:
+        results = transitions.bulk_update_status(form_type, ids, new_status,
+                                                 expected_status=expected_status,
+                                                 actor_id=current_user.id)
+    except ValueError as e:
+        if wants_json:
+            return jsonify(error=str(e)), 400
+        flash('अवैध स्थिती / Invalid status', 'danger')
+        return redirect(url_for('admin_forms', form_type=form_type))
+    db.session.commit()
+    
+    summary = {outcome: 0 for outcome in ('updated', 'unchanged', 'conflict', 'not_found')}
+    for outcome in results.values():
+        summary[outcome] += 1
+    if wants_json:
+        return jsonify(summary=summary,
+                       results=[{'id': form_id, 'result': outcome} for form_id, outcome in results.items()])
+    
+    flash(f"{summary['updated']} अर्ज अद्यतनित / {summary['updated']} forms updated"
+          + (f", {summary['conflict']} conflicts" if summary['conflict'] else ''),
+          'success' if summary['updated'] else 'warning')
+    return redirect(url_for('admin_forms', form_type=form_type, **filters))
+
+def submit_admin_job(task_name, **payload):
+    job = jobs.submit(task_name, payload, user_id=current_user.id)
+    db.session.commit()
+    flash(f'काम रांगेत जोडले / Job #{job.id} queued', 'info')
+    return redirect(url_for('admin_jobs'))
+
+@app.route('/admin/jobs', methods=['GET', 'POST'])
+@login_required
+def admin_jobs():
+    import certificates
+    # GET lists recent jobs; POST {"kind": ..., "payload": {...}} queues one and answers 202
+    if not current_user.is_admin:
+        if request.method == 'POST':
+            return jsonify(error='Access denied'), 403
+        flash('प्रवेश नाकारला / Access denied', 'danger')
+        return redirect(url_for('student_dashboard'))
+    
+    if request.method == 'POST':
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or not isinstance(body.get('payload', {}), dict):
+            return jsonify(error='Expected {"kind": ..., "payload": {...}}'), 400
+        kind = body.get('kind')
+        jobs.load_tasks()
+        if kind not in jobs.TASKS or not jobs.TASKS[kind][2]:
+            return jsonify(error='Unknown job kind'), 400
+        payload = dict(body.get('payload', {}))
+        form_type = payload.get('form_type')
+        if kind == 'export_forms' and form_type not in FORM_MODELS:
+            return jsonify(error='Invalid form type'), 400
+        if kind == 'certificate_bundle' and form_type not in certificates.CERTIFICATE_MODELS:
+            return jsonify(error='Invalid form type'), 400
+        if kind != 'reindex_search':
+            payload['actor_id'] = current_user.id
+        try:
+            job = jobs.submit(kind, payload, user_id=current_user.id)
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        db.session.commit()
+        response = jsonify(jobs.describe(job))
+        response.status_code = 202
+        response.headers['Location'] = url_for('job_status', job_id=job.id)
+        return response
+    
+    recent = Job.query.order_by(Job.id.desc()).limit(50).all()
+    return render_template('admin_jobs.html', jobs=[jobs.describe(job) for job in recent])
+
+@app.route('/admin/jobs/<int:job_id>')
+@login_required
+def job_status(job_id):
+    if not current_user.is_admin:
+        return jsonify(error='Access denied'), 403
+    job = db.session.get(Job, job_id)
+    if job is None:
+        return jsonify(error='Not found'), 404
+    return jsonify(jobs.describe(job))
+
+@app.route('/admin/jobs/<int:job_id>/download')
+@login_required
+def job_download(job_id):
+    if not current_user.is_admin:
+        flash('प्रवेश नाकारला / Access denied', 'danger')
+        return redirect(url_for('student_dashboard'))
+    job = db.session.get(Job, job_id)
+    result = jobs.describe(job)['result'] if job is not None else None
+    if not result or not result.get('file') or not os.path.exists(jobs.result_path(result['file'])):
+        flash('फाइल उपलब्ध नाही / File not available', 'warning')
+        return redirect(url_for('admin_jobs'))
+    return send_file(os.path.abspath(jobs.result_path(result['file'])), mimetype=result.get('mimetype'),
+                     as_attachment=True, download_name=result['file'])
@@ -0,0 +1,228 @@
+import logging
+import re
+import unicodedata
+
+import click
+from sqlalchemy import event, inspect, select, insert, delete, text, bindparam
+
+from app import app, db
+from models import User, SearchDocument, FORM_MODELS
+
+# Fields that feed each document; the first one is shown as the result title
+SEARCH_FIELDS = {
+    'user': ('full_name', 'student_id', 'email', 'username'),
+    'admission': ('first_name_marathi', 'last_name_marathi', 'father_name', 'mother_name',
+                  'parent_full_name', 'address', 'school_name'),
+    'bonafide': ('student_name', 'birth_place', 'school_place'),
+    'hostel': ('student_name', 'parent_name', 'guardian_name', 'student_address',
+               'parent_address', 'hostel_name'),
+    'case_record': ('name', 'father_name', 'mother_name', 'guardian_name', 'permanent_address',
+                    'guardian_address', 'relatives_address'),
+    'pratinidhan': ('student_name', 'birth_place', 'school_place'),
+}
+
+INDEX_BATCH = 1000
+
+_DEVANAGARI_DIGITS = {0x0966 + digit: str(digit) for digit in range(10)}
+_ZERO_WIDTH = dict.fromkeys([0x200B, 0x200C, 0x200D, 0xFEFF])
+_NUKTA = '\u093c'
+# Long and short i/u vowel signs are used interchangeably in names (पाटील / पाटिल)
+_VOWEL_LENGTH = {0x0940: '\u093f', 0x0942: '\u0941', 0x0908: '\u0907', 0x090A: '\u0909'}
+_CHANDRABINDU = '\u0901'
+_ANUSVARA = '\u0902'
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_text(value):
+    # Canonical form for indexing and querying Marathi and English text alike:
+    # drop joiners and nukta, fold vowel length and chandrabindu, ASCII digits, casefold
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFD', str(value)).replace(_NUKTA, '')
+    value = unicodedata.normalize('NFC', value)
+    value = value.translate(_ZERO_WIDTH).translate(_DEVANAGARI_DIGITS).translate(_VOWEL_LENGTH)
+    value = value.replace(_CHANDRABINDU, _ANUSVARA)
+    return _WHITESPACE.sub(' ', value.casefold()).strip()
+
+def _document(doc_type, row, owner):
+    fields = SEARCH_FIELDS[doc_type]
+    parts = [getattr(row, name) for name in fields]
+    if doc_type != 'user' and owner is not None:
+        # Let a student's ID or account name find their forms too
+        parts += [owner.student_id, owner.full_name]
+    return {
+        'doc_type': doc_type,
+        'ref_id': row.id,
+        'user_id': row.id if doc_type == 'user' else row.user_id,
+        'title': getattr(row, fields[0]),
+        'student_id': owner.student_id if owner is not None else None,
+        'body': normalize_text(' '.join(str(part) for part in parts if part)),
+        'created_at': row.created_at,
+    }
+
+def _owners(connection, user_ids):
+    if not user_ids:
+        return {}
+    rows = connection.execute(select(User.id, User.student_id, User.full_name)
+                              .where(User.id.in_(user_ids)))
+    return {row.id: row for row in rows}
+
+def index_rows(connection, doc_type, rows):
+    rows = list(rows)
+    if not rows:
+        return
+    if doc_type == 'user':
+        documents = [_document('user', row, row) for row in rows]
+    else:
+        owners = _owners(connection, {row.user_id for row in rows})
+        documents = [_document(doc_type, row, owners.get(row.user_id)) for row in rows]
+    connection.execute(delete(SearchDocument).where(
+        SearchDocument.doc_type == doc_type,
+        SearchDocument.ref_id.in_([document['ref_id'] for document in documents])))
+    connection.execute(insert(SearchDocument), documents)
+
+def _source_columns(doc_type, model):
+    columns = [model.id, model.created_at] + [getattr(model, name) for name in SEARCH_FIELDS[doc_type]]
+    if doc_type != 'user':
+        columns.append(model.user_id)
+    return columns
+
+def index_missing(connection):
+    # Set-based catch-up for rows written without ORM events (bulk imports, old databases)
+    total = 0
+    sources = [('user', User)] + list(FORM_MODELS.items())
+    for doc_type, model in sources:
+        stmt = (select(*_source_columns(doc_type, model))
+                .outerjoin(SearchDocument, (SearchDocument.doc_type == doc_type) &
+                           (SearchDocument.ref_id == model.id))
+                .where(SearchDocument.id.is_(None))
+                .order_by(model.id))
+        while True:
+            batch = connection.execute(stmt.limit(INDEX_BATCH)).all()
+            if not batch:
+                break
+            index_rows(connection, doc_type, batch)
+            total += len(batch)
+    return total
+
+def rebuild_index(connection):
+    connection.execute(delete(SearchDocument))
+    total = index_missing(connection)
+    if connection.dialect.name == 'sqlite' and _has_fts(connection):
+        # Re-derive the FTS5 shadow tables from search_document in case they drifted
+        connection.execute(text("INSERT INTO search_fts(search_fts) VALUES ('rebuild')"))
+    return total
+
+def reindex_owner(connection, user_id):
+    # Form documents carry their owner's student ID and name, so they follow a rename
+    for doc_type, model in FORM_MODELS.items():
+        rows = connection.execute(select(*_source_columns(doc_type, model))
+                                  .where(model.user_id == user_id)).all()
+        index_rows(connection, doc_type, rows)
+
+def _after_insert(doc_type):
+    def listener(mapper, connection, target):
+        index_rows(connection, doc_type, [target])
+    return listener
+
+def _user_updated(mapper, connection, target):
+    index_rows(connection, 'user', [target])
+    state = inspect(target)
+    if state.attrs.full_name.history.has_changes() or state.attrs.student_id.history.has_changes():
+        reindex_owner(connection, target.id)
+
+for _doc_type, _model in FORM_MODELS.items():
+    event.listen(_model, 'after_insert', _after_insert(_doc_type))
+event.listen(User, 'after_insert', _after_insert('user'))
+event.listen(User, 'after_update', _user_updated)
+
+# Backend-specific indexes (installed by migration 4)
+
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+    "body, content='search_document', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS search_document_ai AFTER INSERT ON search_document BEGIN "
+    "INSERT INTO search_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_document_ad AFTER DELETE ON search_document BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_document_au AFTER UPDATE ON search_document BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO search_fts(rowid, body) VALUES (new.id, new.body); END",
+)
+
+POSTGRES_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_search_document_body_trgm ON search_document "
+    "USING gin (body gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_search_document_body_fts ON search_document "
+    "USING gin (to_tsvector('simple', body))",
+)
+
+def install_indexes(connection):
+    ddl = {'sqlite': SQLITE_DDL, 'postgresql': POSTGRES_DDL}.get(connection.dialect.name, ())
+    for statement in ddl:
+        try:
+            with connection.begin_nested():
+                connection.execute(text(statement))
+        except Exception:
+            # e.g. SQLite built without FTS5, or no privilege to create pg_trgm
+            logging.warning("Search index DDL failed, falling back to LIKE search: %s", statement)
+            return
+
+_capabilities = {}
+
+def _has_fts(connection):
+    key = str(connection.engine.url)
+    if key not in _capabilities:
+        _capabilities[key] = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE name = 'search_fts'")).first() is not None
+    return _capabilities[key]
+
+def _has_trgm(connection):
+    key = str(connection.engine.url)
+    if key not in _capabilities:
+        _capabilities[key] = connection.execute(text(
+            "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+    return _capabilities[key]
+
+RESULT_COLUMNS = "d.doc_type, d.ref_id, d.user_id, d.title, d.student_id, d.created_at"
+
+def search(query, limit=50, doc_types=None):
+    # Ranked matches across users and all form types in a single statement
+    normalized = normalize_text(query)
+    if not normalized:
+        return []
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    type_filter = "AND d.doc_type IN :doc_types" if doc_types else ""
+    params = {'q': normalized, 'limit': limit}
+    # Trigram MATCH needs terms of at least three characters; shorter ones fall back to LIKE
+    terms = [term for term in normalized.split(' ') if len(term) >= 3]
+
+    if dialect == 'sqlite' and terms and _has_fts(connection):
+        params['match'] = ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+        sql = (f"SELECT {RESULT_COLUMNS} FROM search_fts JOIN search_document d ON d.id = search_fts.rowid "
+               f"WHERE search_fts MATCH :match {type_filter} ORDER BY bm25(search_fts) LIMIT :limit")
+    elif dialect == 'postgresql' and _has_trgm(connection):
+        sql = (f"SELECT {RESULT_COLUMNS} FROM search_document d "
+               f"WHERE (:q <% d.body OR to_tsvector('simple', d.body) @@ plainto_tsquery('simple', :q)) "
+               f"{type_filter} "
+               f"ORDER BY ts_rank(to_tsvector('simple', d.body), plainto_tsquery('simple', :q)) "
+               f"+ word_similarity(:q, d.body) DESC LIMIT :limit")
+    else:
+        params['pattern'] = '%' + normalized.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        sql = (f"SELECT {RESULT_COLUMNS} FROM search_document d WHERE d.body LIKE :pattern ESCAPE '\\' "
+               f"{type_filter} ORDER BY d.created_at DESC LIMIT :limit")
+
+    stmt = text(sql)
+    if doc_types:
+        stmt = stmt.bindparams(bindparam('doc_types', expanding=True))
+        params['doc_types'] = list(doc_types)
+    stmt = stmt.columns(created_at=db.DateTime)
+    return [dict(row._mapping) for row in connection.execute(stmt, params)]
+
+@app.cli.command('reindex-search')
+def reindex_search_command():
+    """Rebuild the search index from users and all form tables."""
+    with db.engine.begin() as connection:
+        total = rebuild_index(connection)
+    click.echo(f"Indexed {total} documents")
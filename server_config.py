@@ -0,0 +1,74 @@
+import importlib.util
+import os
+
+# Worker model and database pool sizing, read by gunicorn.conf.py (workers, threads) and
+# app.py (engine pool) so both derive from the same environment. No Flask imports here:
+# gunicorn loads this before the app.
+
+WORKER_CLASSES = ('gevent', 'gthread', 'sync')
+
+def cpu_count():
+    return os.cpu_count() or 1
+
+def _int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+def gevent_available():
+    return importlib.util.find_spec('gevent') is not None
+
+def worker_class():
+    # gevent holds the dashboard event streams without a thread each; gthread is the
+    # fallback where gevent is unavailable
+    value = os.environ.get("GUNICORN_WORKER_CLASS") or ('gevent' if gevent_available() else 'gthread')
+    if value not in WORKER_CLASSES:
+        raise ValueError(f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}")
+    if value == 'gevent' and not gevent_available():
+        raise ValueError("GUNICORN_WORKER_CLASS=gevent needs the gevent package; use gthread or install it")
+    return value
+
+def workers():
+    # WEB_CONCURRENCY is also what gunicorn itself and most PaaS dashboards use
+    if worker_class() == 'gevent':
+        default = cpu_count()  # one event loop per core
+    else:
+        default = cpu_count() * 2 + 1  # the rest wait on I/O
+    return max(1, _int("WEB_CONCURRENCY", default))
+
+def threads():
+    return max(1, _int("GUNICORN_THREADS", 4)) if worker_class() == 'gthread' else 1
+
+def worker_connections():
+    # Concurrent clients per gevent worker, open event streams included
+    return _int("GUNICORN_WORKER_CONNECTIONS", 1000)
+
+def push_max_clients():
+    # Dashboard event streams per worker; each holds its request for minutes. gevent keeps half its
+    # connections for them, gthread a quarter of its threads, sync none (dashboards poll instead)
+    if worker_class() == 'gevent':
+        return worker_connections() // 2
+    if worker_class() == 'gthread':
+        return threads() // 4
+    return 0
+
+def background_connections():
+    # Held per process outside requests: event log writer, in-process job workers, push LISTEN
+    return 2 + _int("JOB_WORKERS", 1)
+
+def pool_options(worker_count=None):
+    # Split DB_MAX_CONNECTIONS (this service's share of PostgreSQL max_connections, less
+    # DB_RESERVED_CONNECTIONS for CLI commands and `flask jobs-worker`) over the worker processes
+    worker_count = worker_count or workers()
+    budget = _int("DB_MAX_CONNECTIONS", 20) - _int("DB_RESERVED_CONNECTIONS", 3)
+    per_process = max(2, budget // worker_count)
+    if worker_class() == 'gevent':
+        # Greenlets are not bounded by a thread count: the pool is the limit
+        pool_size = per_process
+    else:
+        pool_size = min(per_process, threads() + background_connections())
+    return {
+        'pool_size': _int("DB_POOL_SIZE", pool_size),
+        'max_overflow': _int("DB_MAX_OVERFLOW", per_process - pool_size),
+        # Fail a request quickly instead of queueing it behind an exhausted pool
+        'pool_timeout': _int("DB_POOL_TIMEOUT", 10),
+    }
@@ -10,6 +10,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initializeDashboard();
     initializeDateInputs();
     initializeConfirmActions();
+    initializeDrafts();
     
     console.log('Harmony Hands ERP - JavaScript initialized');
 });
@@ -180,30 +181,93 @@ function initializeDashboard() {
         card.classList.add('fade-in');
     });
     
-    // Auto-refresh dashboard data every 5 minutes
-    if (window.location.pathname.includes('dashboard')) {
+    // Auto-refresh dashboard counters every minute; unchanged stats cost a 304
+    if (document.querySelector('[data-stat]')) {
         setInterval(function() {
             // Only refresh if the page is visible
             if (!document.hidden) {
                 refreshDashboardStats();
             }
-        }, 300000); // 5 minutes
+        }, 60000); // 1 minute
+    }
+    
+    const streamHost = document.querySelector('[data-event-stream]');
+    if (streamHost && window.EventSource) {
+        initializeEventStream(streamHost.dataset.eventStream);
     }
 }
 
-// Refresh dashboard statistics
-function refreshDashboardStats() {
-    const statCards = document.querySelectorAll('.dashboard-stat-card .stat-number');
+// Live notifications of new submissions and status changes (admin dashboard)
+const FORM_TYPE_LABELS = {
+    admission: 'प्रवेश / Admission',
+    bonafide: 'बोनाफाईड / Bonafide',
+    hostel: 'वसतिगृह / Hostel',
+    case_record: 'केस रेकॉर्ड / Case Record',
+    pratinidhan: 'प्रतिनिधान / Pratinidhan'
+};
+
+function initializeEventStream(url) {
+    const source = new EventSource(url);
+    let refreshTimer = null;
+    
+    // A burst of events triggers a single counter refresh
+    function scheduleRefresh() {
+        clearTimeout(refreshTimer);
+        refreshTimer = setTimeout(refreshDashboardStats, 1000);
+    }
     
-    // Add loading animation
-    statCards.forEach(function(stat) {
-        stat.innerHTML = '<i class="fas fa-spinner fa-spin"></i>';
+    source.addEventListener('created', function(event) {
+        const data = JSON.parse(event.data);
+        showAlert(`<i class="fas fa-file-alt me-2"></i>नवीन अर्ज / New ${FORM_TYPE_LABELS[data.form_type] || data.form_type} form #${data.form_id}`, 'info');
+        scheduleRefresh();
     });
     
-    // In a real implementation, this would make an AJAX call
-    setTimeout(function() {
-        window.location.reload();
-    }, 1000);
+    source.addEventListener('status', function(event) {
+        const data = JSON.parse(event.data);
+        const label = FORM_TYPE_LABELS[data.form_type] || data.form_type;
+        showAlert(`<i class="fas fa-sync-alt me-2"></i>${data.count} ${label} form(s) marked ${data.status}`, 'secondary');
+        scheduleRefresh();
+    });
+    
+    // 503 (too many streams) closes the source; the minute poll above keeps working
+    source.onerror = function() {
+        if (source.readyState === EventSource.CLOSED) {
+            console.log('Event stream closed, falling back to polling');
+        }
+    };
+}
+
+// Refresh dashboard statistics in place from /api/stats
+let dashboardStatsETag = null;
+
+function refreshDashboardStats() {
+    const headers = {'Accept': 'application/json'};
+    if (dashboardStatsETag) {
+        headers['If-None-Match'] = dashboardStatsETag;
+    }
+    
+    return fetch('/api/stats', {headers: headers, cache: 'no-store', credentials: 'same-origin'})
+        .then(function(response) {
+            if (response.status === 304 || !response.ok) {
+                return null;
+            }
+            dashboardStatsETag = response.headers.get('ETag');
+            return response.json();
+        })
+        .then(function(data) {
+            if (!data) {
+                return;
+            }
+            document.querySelectorAll('[data-stat]').forEach(function(element) {
+                const value = data.stats[element.dataset.stat];
+                if (value !== undefined && element.textContent !== String(value)) {
+                    element.textContent = value;
+                }
+            });
+        })
+        .catch(function(error) {
+            console.log('Dashboard stats refresh failed', error);
+        });
 }
 
 // Date input enhancements
@@ -346,6 +410,133 @@ function initializeAutoSave() {
     });
 }
 
+// Server-side drafts for long forms: <form data-draft="/api/drafts/<type>">. Only fields
+// changed since the last save are sent, a couple of seconds after typing stops
+const DRAFT_SAVE_DELAY = 2000;
+
+function draftFields(form) {
+    return Array.from(form.elements).filter(function(field) {
+        return field.name && field.name !== 'csrf_token' &&
+            !['file', 'password', 'hidden', 'submit', 'button', 'reset'].includes(field.type);
+    });
+}
+
+function draftValue(form, name) {
+    const field = form.elements[name];
+    if (field instanceof RadioNodeList) {
+        return field.value || null;
+    }
+    if (field.type === 'checkbox') {
+        return field.checked;
+    }
+    return field.value;
+}
+
+function restoreDraft(form, values) {
+    let restored = 0;
+    draftFields(form).forEach(function(field) {
+        if (!(field.name in values)) {
+            return;
+        }
+        const value = values[field.name];
+        // Values the server rendered (e.g. after a failed validation) win over the draft
+        if (field.type === 'checkbox') {
+            if (!field.checked && value === true) {
+                field.checked = true;
+                restored += 1;
+            }
+        } else if (field.type === 'radio') {
+            if (!form.elements[field.name].value && field.value === value) {
+                field.checked = true;
+                restored += 1;
+            }
+        } else if (!field.value || (field.tagName === 'SELECT' && field.selectedIndex <= 0)) {
+            field.value = value;
+            restored += 1;
+        }
+    });
+    return restored;
+}
+
+function initializeDrafts() {
+    document.querySelectorAll('form[data-draft]').forEach(function(form) {
+        const url = form.dataset.draft;
+        const dirty = new Set();
+        let timer = null;
+        let stopped = false;
+        
+        function requeue(patch) {
+            Object.keys(patch).forEach(function(name) { dirty.add(name); });
+        }
+        
+        function save(keepalive) {
+            clearTimeout(timer);
+            if (stopped || !dirty.size) {
+                return;
+            }
+            const patch = {};
+            dirty.forEach(function(name) {
+                patch[name] = draftValue(form, name);
+            });
+            dirty.clear();
+            fetch(url, {
+                method: 'PATCH',
+                headers: {'Content-Type': 'application/json'},
+                body: JSON.stringify(patch),
+                keepalive: keepalive === true
+            }).then(function(response) {
+                if (response.redirected) {
+                    // Session expired: what was saved so far is restored after logging in again
+                    stopped = true;
+                    showAlert('सत्र संपले, कृपया पुन्हा प्रवेश करा; मसुदा जतन आहे / Session expired, please log in again; your draft is saved', 'warning');
+                } else if (response.status >= 500) {
+                    requeue(patch);
+                } else if (!response.ok) {
+                    console.error('Draft not saved:', response.status);
+                }
+            }).catch(function() {
+                // Offline: retried with the next change
+                requeue(patch);
+            });
+        }
+        
+        function markDirty(event) {
+            if (!draftFields(form).includes(event.target)) {
+                return;
+            }
+            dirty.add(event.target.name);
+            clearTimeout(timer);
+            timer = setTimeout(save, DRAFT_SAVE_DELAY);
+        }
+        
+        fetch(url, {headers: {'Accept': 'application/json'}})
+            .then(function(response) {
+                return response.ok && !response.redirected ? response.json() : null;
+            })
+            .then(function(draft) {
+                if (draft && draft.updated_at && restoreDraft(form, draft.fields)) {
+                    showAlert('<i class="fas fa-history me-2"></i>जतन केलेला मसुदा भरला / Restored your saved draft', 'info');
+                }
+            })
+            .catch(function() {});
+        
+        form.addEventListener('input', markDirty);
+        form.addEventListener('change', markDirty);
+        document.addEventListener('visibilitychange', function() {
+            if (document.hidden) {
+                save(true);
+            }
+        });
+        // The server deletes the draft along with storing the submission
+        form.addEventListener('submit', function(event) {
+            if (!event.defaultPrevented) {
+                stopped = true;
+                clearTimeout(timer);
+            }
+        });
+    });
+}
+
 // Print functionality
 function printElement(elementId) {
     const element = document.getElementById(elementId);
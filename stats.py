@@ -0,0 +1,159 @@
+import click
+from sqlalchemy import event, select, update, delete, func, literal, union_all, String
+
+from app import app, db
+from models import User, Counter, FormStats, FORM_MODELS
+import cache
+
+STATS_VERSION = 'stats_version'
+
+# Keys used by the dashboard templates for each form type
+STAT_NAMES = {
+    'admission': 'admission_forms',
+    'bonafide': 'bonafide_forms',
+    'hostel': 'hostel_forms',
+    'case_record': 'case_records',
+    'pratinidhan': 'pratinidhan_forms'
+}
+
+def form_status_counts(user_id=None, include_students=False):
+    # One UNION ALL of per-table GROUP BY status aggregates
+    selects = []
+    for form_type, model in FORM_MODELS.items():
+        stmt = (select(literal(form_type, String).label('form_type'),
+                       model.status.label('status'),
+                       func.count().label('total'))
+                .group_by(model.status))
+        if user_id is not None:
+            stmt = stmt.where(model.user_id == user_id)
+        selects.append(stmt)
+    if include_students:
+        selects.append(select(literal('student', String), literal('registered', String), func.count())
+                       .select_from(User).where(User.is_admin == False))  # noqa: E712
+
+    counts = {form_type: {} for form_type in FORM_MODELS}
+    for form_type, status, total in db.session.execute(union_all(*selects)):
+        counts.setdefault(form_type, {})[status] = total
+    return counts
+
+def materialized_counts():
+    # O(1) read of the FormStats counters plus the student count in one round trip
+    stmt = union_all(
+        select(FormStats.form_type, FormStats.status, FormStats.count),
+        select(literal('student', String), literal('registered', String), func.count())
+        .select_from(User).where(User.is_admin == False)  # noqa: E712
+    )
+    counts = {form_type: {} for form_type in FORM_MODELS}
+    for form_type, status, total in db.session.execute(stmt):
+        counts.setdefault(form_type, {})[status] = total
+    if not any(counts[form_type] for form_type in FORM_MODELS) and FormStats.query.first() is None:
+        # Counters were never built for this database
+        rebuild_form_stats()
+        db.session.commit()
+        return form_status_counts(include_students=True)
+    return counts
+
+def rebuild_form_stats():
+    db.session.execute(delete(FormStats))
+    for form_type, statuses in form_status_counts().items():
+        for status, total in statuses.items():
+            if status is not None:
+                db.session.add(FormStats(form_type=form_type, status=status, count=total))
+    db.session.flush()
+
+def _bump(form_type, status, delta):
+    result = db.session.execute(
+        update(FormStats)
+        .where(FormStats.form_type == form_type, FormStats.status == status)
+        .values(count=FormStats.count + delta)
+    )
+    if result.rowcount == 0:
+        # First form with this type/status: seed the counter from the table itself, which
+        # already includes the pending change after autoflush. An upsert, since a concurrent
+        # first submission may create the row first; it then gets the delta instead
+        if db.session.get_bind().dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        model = FORM_MODELS[form_type]
+        total = select(func.count()).select_from(model).where(model.status == status).scalar_subquery()
+        stmt = insert(FormStats).values(form_type=form_type, status=status, count=total)
+        stmt = stmt.on_conflict_do_update(index_elements=[FormStats.form_type, FormStats.status],
+                                          set_={'count': FormStats.count + delta})
+        db.session.execute(stmt)
+
+def bump_stats_version(connection=None):
+    # Change counter behind the /api/stats ETag; seeded by migration 6
+    (connection or db.session).execute(
+        update(Counter).where(Counter.name == STATS_VERSION).values(value=Counter.value + 1))
+
+def stats_version():
+    return db.session.scalar(select(Counter.value).where(Counter.name == STATS_VERSION)) or 0
+
+@event.listens_for(User, 'after_insert')
+def _student_registered(mapper, connection, target):
+    if not target.is_admin:
+        bump_stats_version(connection)
+
+# Call these after the change is added to the session and before it is committed;
+# user_ids are the owners of the affected forms, whose cached dashboards go stale
+def record_form_created(form_type, status='pending', amount=1, user_ids=()):
+    _bump(form_type, status, amount)
+    bump_stats_version()
+    cache.invalidate_on_commit(db.session, *cache.form_namespaces(form_type, user_ids))
+
+def record_status_change(form_type, old_status, new_status, amount=1, user_ids=()):
+    if old_status == new_status:
+        return
+    if old_status is not None:
+        _bump(form_type, old_status, -amount)
+    _bump(form_type, new_status, amount)
+    bump_stats_version()
+    cache.invalidate_on_commit(db.session, *cache.form_namespaces(form_type, user_ids))
+
+@app.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Recompute the FormStats counters from the form tables."""
+    rebuild_form_stats()
+    db.session.commit()
+    click.echo('Form statistics rebuilt')
+
+def admin_dashboard_stats():
+    counts = materialized_counts()
+    result = {'total_students': counts.get('student', {}).get('registered', 0)}
+    for form_type, name in STAT_NAMES.items():
+        result['total_' + name] = sum(counts[form_type].values())
+    result['pending_forms'] = sum(counts[form_type].get('pending', 0) for form_type in FORM_MODELS)
+    return result
+
+def student_dashboard_stats(user_id):
+    counts = form_status_counts(user_id=user_id)
+    return {name: sum(counts[form_type].values()) for form_type, name in STAT_NAMES.items()}
+
+def recent_forms(limit, per_type_limit, user_id=None, with_student=False):
+    # Newest forms of each type, unioned and cut to `limit` overall in one query
+    branches = []
+    for model in FORM_MODELS.values():
+        stmt = select(literal(model.__name__, String).label('type'), model.id, model.user_id,
+                      model.created_at, model.status)
+        if user_id is not None:
+            stmt = stmt.where(model.user_id == user_id)
+        branch = stmt.order_by(model.created_at.desc(), model.id.desc()).limit(per_type_limit).subquery()
+        branches.append(select(branch))
+    feed = union_all(*branches).subquery()
+
+    columns = [feed.c.type, feed.c.id, feed.c.created_at, feed.c.status]
+    stmt = select(*columns)
+    if with_student:
+        stmt = (select(*columns, User.full_name, User.student_id)
+                .join(User, User.id == feed.c.user_id))
+    stmt = stmt.order_by(feed.c.created_at.desc(), feed.c.id.desc()).limit(limit)
+
+    forms = []
+    for row in db.session.execute(stmt):
+        form = {'type': row.type, 'id': row.id, 'created_at': row.created_at, 'status': row.status}
+        if with_student:
+            form['student_name'] = row.full_name
+            form['student_id'] = row.student_id
+        forms.append(form)
+    return forms
@@ -0,0 +1,92 @@
+import os
+from datetime import datetime
+
+from sqlalchemy import select, func
+
+from app import db
+from models import FORM_MODELS
+from form_filters import filter_forms_query
+import certificates
+import events
+import exports
+import importer
+import jobs
+import search
+
+@jobs.task('export_forms', api=True)
+def export_forms(ctx, form_type, format='csv', include_user=False, filters=None, actor_id=None):
+    model = FORM_MODELS[form_type]
+    if format not in exports.EXPORT_GENERATORS:
+        raise ValueError(f"Unknown export format: {format}")
+    filters = filters or {}
+    total = db.session.scalar(filter_forms_query(select(func.count()).select_from(model), model, filters))
+    ctx.progress(0, total, 'Exporting', force=True)
+
+    def counted(rows):
+        for done, row in enumerate(rows):
+            if done % exports.YIELD_PER == 0:
+                ctx.progress(done, total)
+            yield row
+
+    stmt = filter_forms_query(exports.export_statement(model, include_user=include_user), model, filters)
+    body = exports.EXPORT_GENERATORS[format](counted(exports.stream_rows(stmt, model)))
+    name = f"{form_type}_forms_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{ctx.job_id}.{format}"
+    with open(jobs.result_path(name), 'wb') as handle:
+        for chunk in body:
+            handle.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+
+    events.log_event(form_type, None, 'export', actor_id=actor_id,
+                     detail=' '.join([format] + [f"{key}={value}" for key, value in filters.items()]))
+    return {'file': name, 'rows': total, 'mimetype': exports.EXPORT_MIMETYPES[format]}
+
+@jobs.task('certificate_bundle', api=True)
+def certificate_bundle(ctx, form_type, format='pdf', filters=None, actor_id=None):
+    filters = filters or {}
+    approved = certificates.approved_forms(form_type, filters)
+    total = len(approved)
+    paths = []
+    # Render in slices so progress moves; each slice still fans out over the process pool
+    for start in range(0, total, 50):
+        ctx.progress(start, total, 'Rendering certificates', force=True)
+        paths += certificates.render_certificates(form_type, approved[start:start + 50])
+    ctx.progress(total, total, 'Packaging', force=True)
+
+    label = certificates.bundle_label(filters)
+    name = f"{form_type}_certificates_{label}_{ctx.job_id}.{format}"
+    if format == 'pdf':
+        data = certificates.merge_pdfs(paths) if paths else b''
+        mimetype = 'application/pdf'
+    else:
+        data = certificates.zip_pdfs(certificates.zip_entries(form_type, approved, paths))
+        mimetype = 'application/zip'
+    with open(jobs.result_path(name), 'wb') as handle:
+        handle.write(data)
+
+    events.log_events([events.make_event(form_type, form.id, 'certificate', actor_id=actor_id,
+                                         detail=format) for form in approved])
+    return {'file': name, 'certificates': total, 'mimetype': mimetype}
+
+@jobs.task('import_csv', max_attempts=1)
+def import_csv(ctx, kind, path):
+    # Not retried: a partial import followed by a rerun would report every imported row as a duplicate
+    ctx.progress(0, None, 'Importing', force=True)
+    try:
+        with open(path, newline='', encoding='utf-8-sig') as handle:
+            if kind == 'students':
+                imported, errors = importer.import_students(handle)
+            else:
+                imported, errors = importer.import_forms(kind, handle)
+    finally:
+        os.remove(path)
+
+    result = {'imported': imported, 'errors': len(errors)}
+    if errors:
+        name = f"import_errors_{ctx.job_id}.csv"
+        with open(jobs.result_path(name), 'w', newline='', encoding='utf-8') as handle:
+            importer.write_error_file(errors, handle)
+        result.update(file=name, mimetype='text/csv; charset=utf-8')
+    return result
+
+@jobs.task('reindex_search', api=True)
+def reindex_search(ctx):
+    return {'documents': search.rebuild_index(db.session.connection())}
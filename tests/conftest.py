@@ -0,0 +1,103 @@
+import os
+import sys
+import tempfile
+from datetime import date
+
+import pytest
+
+# The app is configured from the environment at import: a throwaway SQLite database and working
+# directory (uploads, caches), no shared cache and cheap password hashes
+_workdir = tempfile.mkdtemp(prefix='harmony-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ['CACHE_BACKEND'] = 'none'
+os.environ['JOB_WORKERS'] = '0'
+os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Boolean, Date, Integer, delete, update, event  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from models import User, Counter, FORM_MODELS  # noqa: E402
+import events  # noqa: E402
+import form_schema  # noqa: E402
+import migrations  # noqa: E402
+
+PASSWORD = 'secret1'
+
+@pytest.fixture(scope='session')
+def app():
+    # Upload, certificate and job folders are relative to the working directory
+    os.chdir(_workdir)
+    return create_app({'TESTING': True, 'WTF_CSRF_ENABLED': False})
+
+@pytest.fixture(autouse=True)
+def clean_db(app):
+    # Every test starts from empty tables with the counters at zero
+    yield
+    events.flush()
+    with app.app_context():
+        db.session.remove()
+        for table in reversed(db.metadata.sorted_tables):
+            if table.name not in (migrations.SchemaVersion.__tablename__, Counter.__tablename__):
+                db.session.execute(delete(table))
+        db.session.execute(update(Counter).values(value=0))
+        db.session.commit()
+
+@pytest.fixture
+def app_context(app):
+    with app.app_context():
+        yield
+        db.session.remove()
+
+def make_user(username, is_admin=False, student_id=None):
+    user = User(username=username, email=f'{username}@example.com', full_name=username.title(),
+                is_admin=is_admin, student_id=student_id)
+    user.set_password(PASSWORD)
+    db.session.add(user)
+    return user
+
+def _sample_value(column, index):
+    if isinstance(column.type, Date):
+        return date(2024, 6, 1)
+    if isinstance(column.type, Boolean):
+        return False
+    if isinstance(column.type, Integer):
+        return index % 12 + 1
+    return f'{column.name} {index}'[:column.type.length or 100]
+
+def make_forms(form_type, user, count):
+    # `count` forms with every required column filled in
+    model = FORM_MODELS[form_type]
+    schema = form_schema.SCHEMAS[form_type]
+    columns = [model.__table__.c[name] for name in schema.required]
+    forms = []
+    for index in range(count):
+        values = {column.name: _sample_value(column, index) for column in columns}
+        forms.append(form_schema.create_form(form_type, values, user_id=user.id))
+    return forms
+
+def login(client, username):
+    return client.post('/login', data={'username': username, 'password': PASSWORD})
+
+class StatementCounter:
+    # Statements sent to the database while active, from any thread
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.executions = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.executions.append((statement, parameters))
+
+    def __enter__(self):
+        event.listen(self.engine, 'after_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'after_cursor_execute', self._record)
+
+    @property
+    def count(self):
+        return len(self.statements)
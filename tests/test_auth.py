@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import select
+
+from app import db
+from models import User
+import auth
+import cache
+from conftest import PASSWORD, StatementCounter, login, make_user
+
+@pytest.fixture
+def student(app):
+    with app.app_context():
+        make_user('student', student_id='STU001')
+        db.session.commit()
+
+def password_hash(app):
+    with app.app_context():
+        return db.session.scalar(select(User.password_hash))
+
+def user_selects(counter):
+    return [statement for statement in counter.statements
+            if statement.lstrip().startswith('SELECT') and 'FROM user' in statement]
+
+def test_needs_rehash_compares_the_configured_method(app, app_context, monkeypatch):
+    current = auth.hash_password('x')
+    assert current.startswith('pbkdf2:sha256:1000$')
+    assert not auth.needs_rehash(current)
+
+    monkeypatch.setitem(app.config, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha256:2000')
+    assert auth.needs_rehash(current)
+    assert not auth.needs_rehash(auth.hash_password('x'))
+
+def test_login_rehashes_under_a_new_method(app, student, monkeypatch):
+    monkeypatch.setitem(app.config, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha256:2000')
+    client = app.test_client()
+
+    client.post('/login', data={'username': 'student', 'password': 'wrong'})
+    assert password_hash(app).startswith('pbkdf2:sha256:1000$')
+
+    assert login(client, 'student').status_code == 302
+    assert password_hash(app).startswith('pbkdf2:sha256:2000$')
+    client.get('/logout')
+    assert login(app.test_client(), 'student').headers['Location'].endswith('/student_dashboard')
+
+def test_session_principal_comes_from_the_cache_until_the_user_changes(app, student, monkeypatch):
+    monkeypatch.setattr(cache, '_backend', cache.MemoryBackend(100))
+    client = app.test_client()
+    login(client, 'student')
+    client.get('/student_dashboard')
+    with app.app_context():
+        engine = db.engine
+
+    with StatementCounter(engine) as counter:
+        response = client.get('/student_dashboard')
+    assert response.status_code == 200
+    assert user_selects(counter) == []
+
+    with app.app_context():
+        db.session.scalar(select(User)).full_name = 'आरव पाटील'
+        db.session.commit()
+    with StatementCounter(engine) as counter:
+        response = client.get('/student_dashboard')
+    assert len(user_selects(counter)) == 1
+    assert 'आरव पाटील' in response.get_data(as_text=True)
+
+def test_unknown_or_malformed_user_ids_load_nothing(app_context):
+    assert auth.load_user('not-a-number') is None
+    assert auth.load_user('12345') is None
@@ -0,0 +1,91 @@
+import re
+
+import pytest
+
+from app import db
+from models import BonafideForm
+from conftest import login, make_forms, make_user
+
+@pytest.fixture
+def admin_client(app):
+    # Five bonafide forms: ids[0:3] pending, ids[3:5] approved
+    with app.app_context():
+        make_user('admin', is_admin=True)
+        student = make_user('student', student_id='STU001')
+        db.session.flush()
+        forms = make_forms('bonafide', student, 5)
+        for form in forms[3:]:
+            form.status = 'approved'
+        db.session.commit()
+        ids = [form.id for form in forms]
+    client = app.test_client()
+    login(client, 'admin')
+    return client, ids
+
+def statuses(app):
+    with app.app_context():
+        return dict(db.session.execute(db.select(BonafideForm.id, BonafideForm.status)).all())
+
+def test_ids_are_moved_and_reported(app, admin_client):
+    client, ids = admin_client
+    response = client.post('/admin/forms/bonafide/bulk_status',
+                           json={'status': 'approved', 'ids': [ids[0], ids[3], 999999]})
+
+    assert response.status_code == 200
+    assert response.json['summary'] == {'updated': 1, 'unchanged': 1, 'conflict': 0, 'not_found': 1}
+    assert [result['result'] for result in response.json['results']] == ['updated', 'unchanged', 'not_found']
+    assert statuses(app)[ids[0]] == 'approved'
+
+def test_expected_status_reports_conflicts(app, admin_client):
+    client, ids = admin_client
+    response = client.post('/admin/forms/bonafide/bulk_status',
+                           json={'status': 'rejected', 'expected_status': 'pending', 'ids': ids})
+
+    assert response.json['summary'] == {'updated': 3, 'unchanged': 0, 'conflict': 2, 'not_found': 0}
+    assert sorted(statuses(app).values()) == ['approved', 'approved', 'rejected', 'rejected', 'rejected']
+
+def test_filter_selects_only_matching_forms(app, admin_client):
+    client, ids = admin_client
+    response = client.post('/admin/forms/bonafide/bulk_status',
+                           json={'status': 'rejected', 'filter': {'status': 'pending'}})
+
+    assert response.json['summary']['updated'] == 3
+    assert [statuses(app)[form_id] for form_id in ids] == ['rejected'] * 3 + ['approved'] * 2
+
+@pytest.mark.parametrize('selection', [
+    {},
+    {'filter': {}},
+    {'filter': {'status': 'Pending'}},
+    {'filter': {'state': 'pending'}},
+    {'filter': {'date_from': 20240101}},
+    {'filter': {'date_from': '01/01/2024'}},
+    {'filter': {'class_standard': ''}},
+])
+def test_invalid_filter_changes_nothing(app, admin_client, selection):
+    client, ids = admin_client
+    before = statuses(app)
+    response = client.post('/admin/forms/bonafide/bulk_status', json={'status': 'rejected', **selection})
+
+    assert response.status_code == 400
+    assert statuses(app) == before
+
+def test_form_post_with_filter_scope(app, admin_client):
+    client, ids = admin_client
+    response = client.post('/admin/forms/bonafide/bulk_status',
+                           data={'new_status': 'approved', 'scope': 'filter', 'status': 'pending'})
+
+    assert response.status_code == 302
+    assert set(statuses(app).values()) == {'approved'}
+
+def test_form_post_needs_the_csrf_token(app, admin_client, monkeypatch):
+    client, ids = admin_client
+    monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', True)
+    data = {'new_status': 'approved', 'scope': 'filter', 'status': 'pending'}
+
+    client.post('/admin/forms/bonafide/bulk_status', data=data)
+    assert sorted(statuses(app).values()) == ['approved', 'approved', 'pending', 'pending', 'pending']
+
+    page = client.get('/admin/forms/bonafide?status=pending').get_data(as_text=True)
+    token = re.search(r'name="csrf_token"[^>]*value="([^"]+)"', page).group(1)
+    client.post('/admin/forms/bonafide/bulk_status', data={**data, 'csrf_token': token})
+    assert set(statuses(app).values()) == {'approved'}
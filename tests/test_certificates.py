@@ -0,0 +1,65 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app import db
+from models import Job
+import auth
+import certificates
+import routes
+from conftest import login, make_forms, make_user
+
+def test_pdf_is_refused_until_the_form_is_approved(app, monkeypatch):
+    rendered = []
+    monkeypatch.setattr(certificates, 'render_certificates',
+                        lambda form_type, forms: rendered.append(forms) or [])
+    with app.app_context():
+        student = make_user('student', student_id='STU001')
+        db.session.flush()
+        form = make_forms('bonafide', student, 1)[0]
+        db.session.commit()
+        form_id = form.id
+    client = app.test_client()
+    login(client, 'student')
+
+    response = client.get(f'/certificate/bonafide/{form_id}.pdf')
+
+    assert response.status_code == 302
+    assert rendered == []
+
+def test_renderer_probe_is_cached():
+    assert certificates.pdf_renderer_available() is certificates.pdf_renderer_available()
+    assert certificates.pdf_renderer_available.cache_info().hits >= 1
+
+def test_single_render_runs_off_the_request(app_context, monkeypatch):
+    student = make_user('student', student_id='STU001')
+    db.session.flush()
+    form = make_forms('bonafide', student, 1)[0]
+    db.session.commit()
+    blocking = []
+    monkeypatch.setattr(certificates, 'html_to_pdf', lambda html, base_url: b'%PDF-1.7')
+    monkeypatch.setattr(auth, 'run_blocking', lambda fn, *args: blocking.append(fn) or fn(*args))
+
+    path, = certificates.render_certificates('bonafide', [form])
+
+    assert blocking == [certificates.html_to_pdf]
+    with open(path, 'rb') as handle:
+        assert handle.read() == b'%PDF-1.7'
+
+def test_bundles_are_always_jobs_under_gevent(app, monkeypatch):
+    monkeypatch.setattr(routes, 'GEVENT_PATCHED', True)
+    monkeypatch.setattr(certificates, 'pdf_renderer_available', lambda: True)
+    monkeypatch.setattr(certificates, 'render_certificates', lambda form_type, forms: pytest.fail('rendered inline'))
+    with app.app_context():
+        make_user('admin', is_admin=True)
+        db.session.commit()
+    client = app.test_client()
+    login(client, 'admin')
+
+    response = client.get('/admin/certificates/bonafide?format=zip')
+
+    assert response.status_code == 302
+    with app.app_context():
+        job = db.session.scalar(select(Job))
+        assert (job.kind, json.loads(job.payload)['format']) == ('certificate_bundle', 'zip')
@@ -0,0 +1,90 @@
+import zlib
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app import db
+from models import FormDraft
+import drafts
+from conftest import login, make_user
+
+@pytest.fixture
+def student(app_context):
+    user = make_user('student', student_id='STU001')
+    db.session.commit()
+    return user
+
+@pytest.fixture
+def client(app):
+    with app.app_context():
+        make_user('student', student_id='STU001')
+        db.session.commit()
+    client = app.test_client()
+    login(client, 'student')
+    return client
+
+def test_encode_round_trips_unicode_fields():
+    values = {'first_name_marathi': 'आरव पाटील', 'address': 'पुणे, महाराष्ट्र', 'bpl_status': True}
+    data = drafts.encode(values)
+
+    assert drafts.decode(data) == values
+    assert 'आरव'.encode('utf-8') not in data
+
+def test_patch_merges_into_the_stored_draft(student):
+    drafts.apply_patch(student.id, 'admission', {'first_name_marathi': 'Aarav', 'caste': 'Maratha', 'address': 'Pune'})
+    # A second tab still showing the first save only sends what it changed
+    drafts.apply_patch(student.id, 'admission', {'address': 'Nashik', 'caste': None, 'father_name': ''})
+
+    assert drafts.fields(drafts.load(student.id, 'admission')) == {'first_name_marathi': 'Aarav', 'address': 'Nashik'}
+    assert db.session.scalar(select(db.func.count()).select_from(FormDraft)) == 1
+
+def test_expired_draft_is_not_a_base_for_the_next_patch(student):
+    drafts.apply_patch(student.id, 'admission', {'first_name_marathi': 'Aarav'})
+    db.session.execute(update(FormDraft).values(expires_at=datetime.utcnow() - timedelta(days=1)))
+    db.session.commit()
+
+    assert drafts.load(student.id, 'admission') is None
+    drafts.apply_patch(student.id, 'admission', {'address': 'Pune'})
+    assert drafts.fields(drafts.load(student.id, 'admission')) == {'address': 'Pune'}
+
+def test_validate_patch_rejects_unknown_fields_and_values():
+    assert drafts.validate_patch('admission', {'first_name_marathi': 'Aarav', 'bpl_status': False, 'caste': None}) == []
+    assert drafts.validate_patch('admission', {'password': 'x', 'birth_date': 2010}) == [
+        'password is not a field of this form', 'birth_date must be a string, boolean or null']
+
+def test_oversized_draft_is_refused_and_the_old_one_kept(app, student, monkeypatch):
+    monkeypatch.setitem(app.config, 'DRAFT_MAX_BYTES', 100)
+    drafts.apply_patch(student.id, 'admission', {'first_name_marathi': 'Aarav'})
+
+    with pytest.raises(ValueError):
+        drafts.apply_patch(student.id, 'admission', {'address': 'x' * 100})
+    assert drafts.fields(drafts.load(student.id, 'admission')) == {'first_name_marathi': 'Aarav'}
+
+@pytest.mark.parametrize('data', [b'not zlib', drafts.encode(['a list']), zlib.compress(b'{"cut')])
+def test_corrupt_draft_reads_as_empty_and_is_replaced(student, data):
+    drafts.apply_patch(student.id, 'admission', {'first_name_marathi': 'Aarav'})
+    db.session.execute(update(FormDraft).values(data=data))
+    db.session.commit()
+
+    assert drafts.fields(drafts.load(student.id, 'admission')) == {}
+    drafts.apply_patch(student.id, 'admission', {'address': 'Pune'})
+    assert drafts.fields(drafts.load(student.id, 'admission')) == {'address': 'Pune'}
+
+def test_api_saves_patches_and_reports_errors(app, client, monkeypatch):
+    assert client.get('/api/drafts/admission').json == {'fields': {}, 'updated_at': None}
+    assert client.patch('/api/drafts/admission', json={'first_name_marathi': 'आरव'}).status_code == 204
+    assert client.patch('/api/drafts/admission', json={'address': 'Pune'}).status_code == 204
+
+    response = client.get('/api/drafts/admission')
+    assert response.json['fields'] == {'first_name_marathi': 'आरव', 'address': 'Pune'}
+    assert 'no-store' in response.headers['Cache-Control']
+
+    assert client.patch('/api/drafts/admission', json=['first_name_marathi']).status_code == 400
+    assert client.patch('/api/drafts/admission', json={'password': 'x'}).status_code == 400
+    assert client.patch('/api/drafts/bonafide', json={'first_name_marathi': 'x'}).status_code == 404
+    monkeypatch.setitem(app.config, 'DRAFT_MAX_BYTES', 100)
+    assert client.patch('/api/drafts/admission', json={'address': 'x' * 100}).status_code == 413
+
+    assert client.delete('/api/drafts/admission').status_code == 204
+    assert client.get('/api/drafts/admission').json['fields'] == {}
@@ -0,0 +1,59 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from models import FormEvent
+import events
+from conftest import make_user, make_forms
+
+def _decide(form, form_type, at):
+    db.session.execute(insert(FormEvent).values(form_type=form_type, form_id=form.id, event='status',
+                                                old_status='pending', new_status='approved', created_at=at))
+
+def test_turnaround_window_applies_to_submission_time(app_context):
+    student = make_user('student', student_id='STU001')
+    db.session.flush()
+    inside, before, undecided = make_forms('bonafide', student, 3)
+    inside.created_at = datetime(2024, 1, 10)
+    before.created_at = datetime(2023, 12, 20)
+    undecided.created_at = datetime(2024, 1, 15)
+    db.session.commit()
+    events.flush()
+    # Decided after the window, and a decision inside the window for a form submitted before it
+    _decide(inside, 'bonafide', datetime(2024, 2, 5))
+    _decide(before, 'bonafide', datetime(2024, 1, 5))
+    db.session.commit()
+
+    report = events.turnaround_report(datetime(2024, 1, 1), datetime(2024, 2, 1))
+
+    row = report['bonafide']
+    assert (row['submitted'], row['decided']) == (2, 1)
+    assert row['avg_hours'] == row['max_hours'] == pytest.approx(26 * 24)
+    assert report['hostel'] is None
+
+def test_writer_retries_through_connection_errors(app_context, monkeypatch):
+    insert_batch = events._insert
+    attempts = []
+
+    def flaky_insert(batch):
+        attempts.append(len(batch))
+        if len(attempts) == 1:
+            raise OperationalError('INSERT', {}, Exception('server closed the connection'))
+        insert_batch(batch)
+
+    monkeypatch.setattr(events, '_insert', flaky_insert)
+    monkeypatch.setattr(events.time, 'sleep', lambda seconds: None)
+    events._write([events.make_event('bonafide', 1, 'certificate'), events.make_event('bonafide', 2, 'certificate')])
+
+    assert attempts == [2, 2]
+    assert db.session.scalars(select(FormEvent.form_id).order_by(FormEvent.form_id)).all() == [1, 2]
+
+def test_writer_drops_only_the_rejected_row(app_context):
+    good = events.make_event('bonafide', 1, 'certificate')
+    bad = {**events.make_event('bonafide', 2, 'certificate'), 'event': None}
+    events._write([good, bad])
+
+    assert db.session.scalars(select(FormEvent.form_id)).all() == [1]
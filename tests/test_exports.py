@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app import db
+from models import BonafideForm, FormEvent
+import events
+import exports
+from conftest import login, make_forms, make_user
+
+@pytest.fixture
+def admin_client(app):
+    # Four bonafide forms by one student, the last two approved
+    with app.app_context():
+        make_user('admin', is_admin=True)
+        student = make_user('student', student_id='STU001')
+        student.full_name = 'आरव पाटील'
+        db.session.flush()
+        forms = make_forms('bonafide', student, 4)
+        for form in forms[2:]:
+            form.status = 'approved'
+        db.session.commit()
+        ids = [form.id for form in forms]
+    client = app.test_client()
+    login(client, 'admin')
+    return client, ids
+
+def test_csv_export_applies_filters_and_joins_the_student(app, admin_client):
+    client, ids = admin_client
+    response = client.get('/admin/forms/bonafide/export?format=csv&status=approved&include_user=1')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'].startswith('attachment; filename="bonafide_forms_')
+    text = response.get_data(as_text=True)
+    assert text.startswith('﻿')
+    rows = list(csv.DictReader(io.StringIO(text[1:])))
+    assert [int(row['id']) for row in rows] == ids[2:]
+    assert {(row['status'], row['user_student_id'], row['user_full_name']) for row in rows} == {
+        ('approved', 'STU001', 'आरव पाटील')}
+    events.flush()
+    with app.app_context():
+        assert db.session.scalar(select(FormEvent.detail).where(FormEvent.event == 'export')) == 'csv status=approved'
+
+def test_jsonl_export_has_one_object_per_form(admin_client):
+    client, ids = admin_client
+    response = client.get('/admin/forms/bonafide/export?format=jsonl')
+
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [record['id'] for record in records] == ids
+    assert set(records[0]) == {column.name for column in BonafideForm.__table__.columns}
+    assert 'user_email' not in records[0]
+
+def test_generators_emit_one_chunk_per_batch(monkeypatch):
+    monkeypatch.setattr(exports, 'YIELD_PER', 2)
+    header = ['id', 'created_at']
+    rows = [header] + [(index, None) for index in range(5)]
+
+    assert len(list(exports.generate_csv(rows))) == 3
+    assert len(list(exports.generate_jsonl(rows))) == 3
+
+def test_students_cannot_export(app, admin_client):
+    client, ids = admin_client
+    client.get('/logout')
+    login(client, 'student')
+
+    response = client.get('/admin/forms/bonafide/export')
+    assert response.status_code == 302
+    assert response.mimetype != 'text/csv'
@@ -0,0 +1,53 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app import db
+from models import FORM_MODELS
+import form_schema
+from conftest import login, make_user
+
+# Marathi text, surrounding spaces and a value at the column's full length must all be stored as sent
+SUBMISSION = {
+    'student_name': ' सुमित्रा पाटील ', 'academic_year': '2024-25', 'class_standard': '८वी',
+    'division': 'अ' * 10, 'conduct': 'चांगले', 'caste': 'मराठा', 'birth_date': '2011-03-04',
+    'birth_place': 'पुणे', 'school_place': 'हडपसर, पुणे',
+}
+
+def stored_values(form_type, form_id):
+    schema = form_schema.SCHEMAS[form_type]
+    form = db.session.get(FORM_MODELS[form_type], form_id)
+    return {name: getattr(form, name) for name in schema.field_names}
+
+@pytest.fixture
+def student_client(app):
+    with app.app_context():
+        make_user('student', student_id='STU001')
+        db.session.commit()
+    client = app.test_client()
+    login(client, 'student')
+    return client
+
+@pytest.mark.parametrize('form_type, path', [('bonafide', '/bonafide_form'), ('pratinidhan', '/pratinidhan_form')])
+def test_api_stores_what_the_html_form_stores(app, student_client, form_type, path):
+    student_client.post(path, data=SUBMISSION)
+    response = student_client.post(f'/api/forms/{form_type}', json=SUBMISSION)
+    assert response.status_code == 201
+
+    with app.app_context():
+        model = FORM_MODELS[form_type]
+        html_id, api_id = db.session.scalars(select(model.id).order_by(model.id)).all()
+        html_values, api_values = stored_values(form_type, html_id), stored_values(form_type, api_id)
+    assert api_values == html_values
+    assert api_values['birth_date'] == date(2011, 3, 4)
+    assert api_values['student_name'] == SUBMISSION['student_name']
+
+def test_oversized_fields_are_reported_per_item(app, student_client):
+    response = student_client.post('/api/forms/bonafide', json=[
+        SUBMISSION, {**SUBMISSION, 'division': 'अ' * 11, 'conduct': 12345678901 * 10 ** 40}])
+
+    assert response.status_code == 201
+    assert response.json['created'] == 1
+    assert response.json['results'][1] == {'index': 1, 'errors': [
+        'division is longer than 10 characters', 'conduct is longer than 50 characters']}
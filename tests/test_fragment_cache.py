@@ -0,0 +1,80 @@
+import io
+import re
+
+import pytest
+
+from app import db
+import cache
+import form_schema
+import importer
+from conftest import login, make_forms, make_user
+
+LISTING = '/admin/forms/bonafide'
+
+@pytest.fixture
+def admin_client(app, monkeypatch):
+    # A real per-process cache instead of the suite's 'none' backend
+    monkeypatch.setattr(cache, '_backend', cache.MemoryBackend(100))
+    with app.app_context():
+        make_user('admin', is_admin=True)
+        student = make_user('student', student_id='STU500')
+        db.session.flush()
+        ids = [form.id for form in make_forms('bonafide', student, 3)]
+        db.session.commit()
+    client = app.test_client()
+    login(client, 'admin')
+    return client, ids
+
+def listing(client):
+    # (rows shown, approved badges) as rendered in the cached table fragment
+    page = client.get(LISTING).get_data(as_text=True)
+    rows = int(re.search(r'Bonafide Forms \((\d+)\)', page).group(1))
+    return rows, page.count('badge bg-success')
+
+def assert_fragment_is_cached(client, app):
+    # Served from the cache: a write behind the app's back does not show up
+    with app.app_context():
+        db.session.execute(db.text("UPDATE bonafide_form SET status = 'rejected'"))
+        db.session.commit()
+    assert listing(client) == (3, 0)
+    with app.app_context():
+        db.session.execute(db.text("UPDATE bonafide_form SET status = 'pending'"))
+        db.session.commit()
+
+def test_status_change_invalidates_the_listing(app, admin_client):
+    client, ids = admin_client
+    assert listing(client) == (3, 0)
+    assert_fragment_is_cached(client, app)
+
+    client.post(f'/admin/form/bonafide/{ids[0]}/update_status', data={'status': 'approved'})
+    assert listing(client) == (3, 1)
+
+def test_bulk_update_invalidates_the_listing(app, admin_client):
+    client, ids = admin_client
+    assert listing(client) == (3, 0)
+    assert_fragment_is_cached(client, app)
+
+    client.post('/admin/forms/bonafide/bulk_status', json={'status': 'approved', 'ids': ids[:2]})
+    assert listing(client) == (3, 2)
+
+def test_form_import_invalidates_the_listing(app, admin_client):
+    client, ids = admin_client
+    assert listing(client) == (3, 0)
+    assert_fragment_is_cached(client, app)
+
+    with app.app_context():
+        names = sorted(form_schema.SCHEMAS['bonafide'].required)
+        stream = io.StringIO(','.join(['student_id', 'status'] + names) + '\n' +
+                             ','.join(['STU500', 'approved'] + ['2024-06-01' if name == 'birth_date' else 'x'
+                                                                for name in names]) + '\n')
+        assert importer.import_forms('bonafide', stream) == (1, [])
+    assert listing(client) == (4, 1)
+
+def test_student_import_invalidates_user_data(app, admin_client):
+    client, ids = admin_client
+    with app.app_context():
+        before = cache.get_backend().get_generations(['users', 'stats'])
+        stream = io.StringIO('username,email,full_name,password\nalice,alice@example.com,Alice,secret1\n')
+        assert importer.import_students(stream, workers=1) == (1, [])
+        after = cache.get_backend().get_generations(['users', 'stats'])
+    assert all(new > old for old, new in zip(before, after))
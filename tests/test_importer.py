@@ -0,0 +1,88 @@
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, insert, select
+
+from app import db
+from models import Job, User
+import importer
+import jobs
+from conftest import login, make_user
+
+def _csv(*rows):
+    return io.StringIO('username,email,full_name,password\n' + ''.join(
+        f'{username},{username}@example.com,{username.title()},secret1\n' for username in rows))
+
+def _upload(*rows):
+    return io.BytesIO(_csv(*rows).getvalue().encode('utf-8')), 'students.csv'
+
+def test_race_in_a_chunk_reports_only_the_colliding_row(app_context, monkeypatch):
+    allocate_block = importer._allocate_block
+
+    def register_bob_meanwhile(count):
+        # Another registration commits after the existence check, before the chunk's INSERT
+        with db.engine.begin() as connection:
+            connection.execute(insert(User).values(username='bob', email='bob@example.com',
+                                                   full_name='Bob', password_hash='x', is_admin=False))
+        return allocate_block(count)
+
+    monkeypatch.setattr(importer, '_allocate_block', register_bob_meanwhile)
+    imported, errors = importer.import_students(_csv('alice', 'bob', 'carol'), workers=1)
+
+    assert imported == 2
+    assert errors == [(3, 'bob', 'username or email already exists')]
+    student_ids = dict(db.session.execute(select(User.username, User.student_id)).all())
+    assert student_ids == {'alice': 'STU001', 'bob': None, 'carol': 'STU002'}
+
+def test_overlong_email_is_a_row_error(app_context):
+    stream = io.StringIO('username,email,full_name,password\n'
+                         f'alice,{"a" * 110}@example.com,Alice,secret1\n')
+    imported, errors = importer.import_students(stream, workers=1)
+
+    assert imported == 0
+    assert errors == [(2, 'alice', 'username, email or full_name is too long')]
+
+def test_passwords_are_hashed_before_student_numbers_are_taken(app_context, monkeypatch):
+    calls = []
+    allocate_block = importer._allocate_block
+
+    class RecordingPool(ThreadPoolExecutor):
+        def map(self, *args, **kwargs):
+            calls.append('hash')
+            return super().map(*args, **kwargs)
+
+    def recording_allocate(count):
+        calls.append('allocate')
+        return allocate_block(count)
+
+    monkeypatch.setattr(importer, 'ProcessPoolExecutor', RecordingPool)
+    monkeypatch.setattr(importer, '_allocate_block', recording_allocate)
+    imported, errors = importer.import_students(_csv('alice', 'bob'), workers=1)
+
+    assert (imported, errors) == (2, [])
+    assert calls == ['hash', 'allocate']
+
+def test_admin_upload_is_queued_as_a_job(app, monkeypatch):
+    with app.app_context():
+        make_user('admin', is_admin=True)
+        db.session.commit()
+    client = app.test_client()
+    login(client, 'admin')
+    monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', True)
+
+    client.post('/admin/import', data={'kind': 'students', 'file': _upload('alice', 'bob')})
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(Job)) == 0
+
+    page = client.get('/admin/import').get_data(as_text=True)
+    token = re.search(r'name="csrf_token"[^>]*value="([^"]+)"', page).group(1)
+    response = client.post('/admin/import', data={'kind': 'students', 'file': _upload('alice', 'bob'),
+                                                  'csrf_token': token})
+    assert response.status_code == 302
+
+    jobs.work('test-worker', burst=True)
+    with app.app_context():
+        job = db.session.scalar(select(Job))
+        assert (job.kind, job.status) == ('import_csv', 'succeeded')
+        assert set(db.session.scalars(select(User.username).where(User.is_admin == False))) == {'alice', 'bob'}  # noqa: E712
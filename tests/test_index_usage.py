@@ -0,0 +1,103 @@
+import re
+from datetime import datetime
+
+import pytest
+from app import db
+from models import FORM_MODELS, last_student_number
+from conftest import StatementCounter, login, make_forms, make_user
+
+FORM_TABLES = {model.__tablename__: form_type for form_type, model in FORM_MODELS.items()}
+
+def query_plans(app, client, path):
+    # (statement, EXPLAIN QUERY PLAN details) for each SELECT that reads a form table
+    with app.app_context():
+        engine = db.engine
+    with StatementCounter(engine) as counter:
+        response = client.get(path)
+    assert response.status_code == 200
+    plans = []
+    with engine.connect() as connection:
+        for statement, parameters in counter.executions:
+            if not statement.lstrip().upper().startswith('SELECT'):
+                continue
+            if not any(re.search(rf'\b{table}\b', statement) for table in FORM_TABLES):
+                continue
+            rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', tuple(parameters)).all()
+            plans.append((statement, [row[-1] for row in rows]))
+    assert plans, f'{path} read no form table'
+    return plans
+
+def form_table_steps(plans):
+    for statement, details in plans:
+        for detail in details:
+            if any(re.search(rf'\b(SCAN|SEARCH) {table}\b', detail) for table in FORM_TABLES):
+                yield statement, detail
+
+@pytest.fixture
+def seeded(app):
+    with app.app_context():
+        make_user('admin', is_admin=True)
+        student = make_user('student', student_id='STU001')
+        db.session.flush()
+        for form_type in FORM_MODELS:
+            make_forms(form_type, student, 30)
+        db.session.commit()
+    return app
+
+def index_steps(plans, table):
+    return [detail for _, detail in form_table_steps(plans) if re.search(rf'\b{table}\b', detail)]
+
+def test_student_dashboard_uses_user_index(seeded):
+    client = seeded.test_client()
+    login(client, 'student')
+    plans = query_plans(seeded, client, '/student_dashboard')
+    for table in FORM_TABLES:
+        steps = index_steps(plans, table)
+        assert steps and all(f'USING INDEX ix_{table}_user_created (user_id=?)' in step for step in steps), steps
+
+def test_admin_dashboard_recent_forms_use_created_index(seeded):
+    client = seeded.test_client()
+    login(client, 'admin')
+    plans = query_plans(seeded, client, '/admin_dashboard')
+    for table in FORM_TABLES:
+        steps = index_steps(plans, table)
+        assert steps and all(f'USING INDEX ix_{table}_created_id' in step for step in steps), steps
+
+def test_status_filtered_listing_uses_status_index(seeded):
+    client = seeded.test_client()
+    login(client, 'admin')
+    for table, form_type in FORM_TABLES.items():
+        plans = query_plans(seeded, client, f'/admin/forms/{form_type}?status=pending')
+        steps = index_steps(plans, table)
+        assert steps and all(f'USING INDEX ix_{table}_status_created (status=?)' in step for step in steps), steps
+
+@pytest.mark.parametrize('query', ['', f'?after={datetime(2030, 1, 1).isoformat()}_5'])
+def test_listing_pages_walk_the_created_index_in_order(seeded, query):
+    client = seeded.test_client()
+    login(client, 'admin')
+    for table, form_type in FORM_TABLES.items():
+        plans = query_plans(seeded, client, f'/admin/forms/{form_type}{query}')
+        steps = index_steps(plans, table)
+        assert steps and all(f'USING INDEX ix_{table}_created_id' in step for step in steps), steps
+        # The index supplies the newest-first order: no sort of the whole table
+        assert not any('TEMP B-TREE FOR ORDER BY' in detail for _, details in plans for detail in details)
+
+def test_no_form_table_is_read_without_an_index(seeded):
+    client = seeded.test_client()
+    login(client, 'admin')
+    paths = ['/admin_dashboard', '/api/stats'] + [f'/admin/forms/{form_type}' for form_type in FORM_MODELS]
+    for path in paths:
+        for statement, detail in form_table_steps(query_plans(seeded, client, path)):
+            assert 'INDEX' in detail or 'PRIMARY KEY' in detail, (path, detail)
+
+def test_last_student_number_uses_student_id_index(seeded):
+    with seeded.app_context():
+        with db.engine.connect() as connection:
+            assert last_student_number(connection) == 1
+            with StatementCounter(db.engine) as counter:
+                last_student_number(connection)
+            statement, parameters = counter.executions[0]
+            details = [row[-1] for row in connection.exec_driver_sql(
+                f'EXPLAIN QUERY PLAN {statement}', tuple(parameters)).all()]
+    assert any(re.search(r'SEARCH user USING (COVERING )?INDEX \S+ \(student_id>\? AND student_id<\?\)', detail)
+               for detail in details), details
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app import db
+from models import Job
+import jobs
+
+@pytest.fixture
+def queue(app_context, monkeypatch):
+    calls = []
+
+    def collect(ctx, rows):
+        ctx.progress(len(rows), len(rows), force=True)
+        calls.append(rows)
+        return {'rows': len(rows)}
+
+    def broken(ctx):
+        calls.append('broken')
+        raise RuntimeError('disk full')
+
+    jobs.load_tasks()
+    monkeypatch.setitem(jobs.TASKS, 'collect', (collect, 3, False))
+    monkeypatch.setitem(jobs.TASKS, 'broken', (broken, 2, False))
+    return calls
+
+def submit(kind, **payload):
+    job = jobs.submit(kind, payload, start_workers=False)
+    db.session.commit()
+    return job.id
+
+def job(job_id):
+    db.session.expire_all()
+    return jobs.describe(db.session.get(Job, job_id))
+
+def test_submit_checks_the_kind_and_payload(queue):
+    with pytest.raises(ValueError, match='Unknown job kind'):
+        jobs.submit('nope', start_workers=False)
+    with pytest.raises(ValueError, match='Invalid payload for collect'):
+        jobs.submit('collect', {'rows': [], 'extra': 1}, start_workers=False)
+
+def test_worker_runs_jobs_in_order_and_stores_the_result(queue):
+    first, second = submit('collect', rows=[1, 2]), submit('collect', rows=[3])
+    jobs.work('test-worker', burst=True)
+
+    assert queue == [[1, 2], [3]]
+    assert job(first)['status'] == 'succeeded'
+    assert job(first)['result'] == {'rows': 2}
+    assert job(first)['progress'] == {'done': 2, 'total': 2, 'message': None}
+    assert (job(second)['attempts'], job(second)['error']) == (1, None)
+
+def test_failed_job_is_retried_with_backoff_then_marked_failed(queue):
+    job_id = submit('broken')
+    jobs.work('test-worker', burst=True)
+
+    described = job(job_id)
+    assert (described['status'], described['attempts'], described['error']) == ('queued', 1, 'RuntimeError: disk full')
+    assert db.session.get(Job, job_id).run_at > datetime.utcnow() + timedelta(seconds=jobs.RETRY_DELAY - 5)
+
+    # Not due yet: a burst leaves it alone
+    jobs.work('test-worker', burst=True)
+    assert queue == ['broken']
+
+    db.session.execute(update(Job).values(run_at=datetime.utcnow()))
+    db.session.commit()
+    jobs.work('test-worker', burst=True)
+    assert queue == ['broken', 'broken']
+    assert (job(job_id)['status'], job(job_id)['attempts']) == ('failed', 2)
+
+def test_release_claims_requeues_only_this_process_jobs(queue):
+    mine, other = submit('collect', rows=[]), submit('collect', rows=[])
+    assert jobs.claim(jobs._worker_id(0)).id == mine
+    assert jobs.claim('elsewhere:1:0').id == other
+
+    assert jobs.release_claims() == 1
+    assert (job(mine)['status'], job(mine)['attempts']) == ('queued', 0)
+    assert (job(other)['status'], job(other)['attempts']) == ('running', 1)
+
+def test_stale_running_jobs_are_requeued(app, queue):
+    job_id = submit('collect', rows=[1])
+    jobs.claim('crashed:1:0')
+    db.session.execute(update(Job).values(
+        locked_at=datetime.utcnow() - timedelta(seconds=app.config['JOB_TIMEOUT'] + 1)))
+    db.session.commit()
+
+    jobs.work('test-worker', burst=True)
+    assert (job(job_id)['status'], job(job_id)['attempts']) == ('succeeded', 2)
+    assert db.session.scalar(select(Job.locked_by)) is None
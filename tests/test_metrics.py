@@ -0,0 +1,16 @@
+import pytest
+
+@pytest.fixture
+def metrics_token(app):
+    app.config['METRICS_TOKEN'] = 'scrape-token'
+    yield 'scrape-token'
+    app.config['METRICS_TOKEN'] = None
+
+def test_metrics_accepts_the_bearer_token(app, metrics_token):
+    response = app.test_client().get('/metrics', headers={'Authorization': f'Bearer {metrics_token}'})
+    assert response.status_code == 200
+
+@pytest.mark.parametrize('authorization', ['Bearer wrong', 'Bearer jeton-secrét', ''])
+def test_metrics_rejects_other_authorization(app, metrics_token, authorization):
+    response = app.test_client().get('/metrics', headers={'Authorization': authorization})
+    assert response.status_code == 403
@@ -0,0 +1,28 @@
+from app import db
+import push
+from conftest import login, make_user
+
+def admin_client(app):
+    with app.app_context():
+        make_user('admin', is_admin=True)
+        db.session.commit()
+    client = app.test_client()
+    login(client, 'admin')
+    return client
+
+def test_streams_are_refused_without_gevent(app):
+    # The test process is not gevent-patched, so threads would be held for every stream
+    assert app.config['PUSH_MAX_CLIENTS'] == 0
+    response = admin_client(app).get('/admin/events/stream')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '60'
+
+def test_broker_refuses_clients_over_the_limit(app_context, app, monkeypatch):
+    monkeypatch.setitem(app.config, 'PUSH_MAX_CLIENTS', 1)
+    first = push.broker.subscribe()
+    try:
+        assert first is not None
+        assert push.broker.subscribe() is None
+    finally:
+        push.broker.unsubscribe(first)
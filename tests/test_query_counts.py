@@ -0,0 +1,46 @@
+import pytest
+
+from app import db
+from models import User, FORM_MODELS
+import events
+from conftest import StatementCounter, login, make_forms, make_user
+
+ADMIN_PAGES = ['/admin_dashboard'] + [f'/admin/forms/{form_type}' for form_type in FORM_MODELS]
+
+def seed_forms(app, total):
+    # Tops every form type up to `total` forms, each from a different student so that
+    # per-row lookups of the owner would show up as extra statements
+    with app.app_context():
+        students = User.query.filter_by(is_admin=False).order_by(User.id).all()
+        for index in range(len(students), total):
+            students.append(make_user(f'student{index}', student_id=f'STU{index + 1:03d}'))
+        db.session.flush()
+        for form_type, model in FORM_MODELS.items():
+            for index in range(model.query.count(), total):
+                make_forms(form_type, students[index], 1)
+        db.session.commit()
+    events.flush()
+
+def statements_for(app, client, path):
+    client.get(path)  # template compilation and other first-request work
+    with app.app_context():
+        engine = db.engine
+    with StatementCounter(engine) as counter:
+        response = client.get(path)
+    assert response.status_code == 200
+    return counter.count
+
+@pytest.mark.parametrize('path', ADMIN_PAGES)
+def test_admin_page_statements_do_not_grow_with_forms(app, path):
+    with app.app_context():
+        make_user('admin', is_admin=True)
+        db.session.commit()
+    client = app.test_client()
+    login(client, 'admin')
+
+    seed_forms(app, 10)
+    with_10 = statements_for(app, client, path)
+    seed_forms(app, 100)
+    with_100 = statements_for(app, client, path)
+
+    assert with_100 == with_10
@@ -0,0 +1,71 @@
+from sqlalchemy import select, text
+
+from app import db
+from models import SearchDocument
+import search
+from conftest import make_forms, make_user
+
+def add_student(username, full_name, student_id):
+    student = make_user(username, student_id=student_id)
+    student.full_name = full_name
+    db.session.flush()
+    return student
+
+def found(query, doc_types=None):
+    return {(result['doc_type'], result['ref_id']) for result in search.search(query, doc_types=doc_types)}
+
+def test_normalization_folds_spelling_variants():
+    assert search.normalize_text('पाटील') == search.normalize_text('पाटिल')
+    assert search.normalize_text('फ़ातिमा  ZAHIR') == 'फातिमा zahir'
+    assert search.normalize_text('STU०४२') == 'stu042'
+
+def test_trigram_match_finds_partial_marathi_names(app_context):
+    assert db.session.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'search_fts'")).first()
+    sumitra = add_student('sumitra', 'सुमित्रा पाटील', 'STU001')
+    add_student('rahul', 'राहुल देशमुख', 'STU002')
+    db.session.commit()
+
+    assert found('मित्रा') == {('user', sumitra.id)}
+    assert found('पाटिल') == {('user', sumitra.id)}
+    assert found('stu001') == {('user', sumitra.id)}
+
+def test_short_terms_fall_back_to_like(app_context):
+    sumitra = add_student('sumitra', 'सुमित्रा पाटील', 'STU001')
+    db.session.commit()
+    assert found('सु') == {('user', sumitra.id)}
+
+def test_forms_are_found_by_their_owner(app_context):
+    student = add_student('sumitra', 'सुमित्रा पाटील', 'STU001')
+    form = make_forms('hostel', student, 1)[0]
+    db.session.commit()
+
+    assert found('सुमित्रा', doc_types=['hostel']) == {('hostel', form.id)}
+
+def test_renaming_a_student_reindexes_their_forms(app_context):
+    student = add_student('sumitra', 'सुमित्रा पाटील', 'STU001')
+    forms = make_forms('bonafide', student, 2) + make_forms('hostel', student, 1)
+    db.session.commit()
+
+    student.full_name = 'सुमित्रा जाधव'
+    student.student_id = 'STU077'
+    db.session.commit()
+
+    form_docs = {('bonafide', forms[0].id), ('bonafide', forms[1].id), ('hostel', forms[2].id)}
+    assert found('पाटील') == set()
+    assert found('जाधव') == {('user', student.id)} | form_docs
+    assert found('stu077', doc_types=['bonafide', 'hostel']) == form_docs
+    assert set(db.session.scalars(select(SearchDocument.student_id))) == {'STU077'}
+
+def test_rebuild_matches_incremental_index(app_context):
+    student = add_student('sumitra', 'सुमित्रा पाटील', 'STU001')
+    make_forms('case_record', student, 2)
+    db.session.commit()
+    before = db.session.execute(select(SearchDocument.doc_type, SearchDocument.ref_id, SearchDocument.body)
+                                .order_by(SearchDocument.doc_type, SearchDocument.ref_id)).all()
+
+    assert search.rebuild_index(db.session.connection()) == len(before)
+    db.session.commit()
+    after = db.session.execute(select(SearchDocument.doc_type, SearchDocument.ref_id, SearchDocument.body)
+                               .order_by(SearchDocument.doc_type, SearchDocument.ref_id)).all()
+    assert after == before
+    assert found('पाटील') == {(doc_type, ref_id) for doc_type, ref_id, _ in before}
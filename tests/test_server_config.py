@@ -0,0 +1,21 @@
+import pytest
+
+import server_config
+
+@pytest.mark.parametrize('worker_class, expected', [('gthread', 2), ('sync', 0)])
+def test_event_streams_stay_below_the_thread_count(monkeypatch, worker_class, expected):
+    monkeypatch.setenv('GUNICORN_WORKER_CLASS', worker_class)
+    monkeypatch.setenv('GUNICORN_THREADS', '8')
+    assert server_config.push_max_clients() == expected
+
+def test_gevent_streams_use_the_connection_budget(monkeypatch):
+    monkeypatch.setattr(server_config, 'gevent_available', lambda: True)
+    monkeypatch.setenv('GUNICORN_WORKER_CLASS', 'gevent')
+    monkeypatch.setenv('GUNICORN_WORKER_CONNECTIONS', '1000')
+    assert server_config.push_max_clients() == 500
+
+def test_gevent_without_the_package_is_refused(monkeypatch):
+    monkeypatch.setattr(server_config, 'gevent_available', lambda: False)
+    monkeypatch.setenv('GUNICORN_WORKER_CLASS', 'gevent')
+    with pytest.raises(ValueError):
+        server_config.worker_class()
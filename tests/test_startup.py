@@ -0,0 +1,35 @@
+import os
+import re
+import subprocess
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use (views, jobs, the flask CLI), never by `import main`
+DEFERRED_MODULES = {
+    'benchmark', 'certificates', 'exports', 'importer', 'tasks',
+    'email_validator', 'gevent', 'openpyxl', 'weasyprint', 'pypdf', 'PIL',
+}
+
+# Generous ceiling for `import main` in a fresh interpreter; catches an accidental heavy
+# import at module level rather than measuring (`flask bench-startup` does that)
+IMPORT_BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', 3000))
+
+def import_main(tmp_path):
+    env = dict(os.environ, INIT_STORAGE='0', DATABASE_URL=f"sqlite:///{tmp_path / 'startup.db'}")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'],
+                            cwd=PROJECT_DIR, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-2000:]
+    modules = {}
+    for match in re.finditer(r'^import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)$', result.stderr, re.MULTILINE):
+        modules[match.group(3)] = int(match.group(2)) / 1000
+    return modules
+
+def test_import_main_skips_optional_modules(tmp_path):
+    modules = import_main(tmp_path)
+    assert 'routes' in modules
+    loaded = {name for name in modules if name.split('.')[0] in DEFERRED_MODULES}
+    assert loaded == set()
+
+def test_import_main_stays_within_budget(tmp_path):
+    assert import_main(tmp_path)['main'] < IMPORT_BUDGET_MS
@@ -0,0 +1,31 @@
+from sqlalchemy import delete, false, select, update
+
+from app import db
+from models import FormStats
+import stats
+from conftest import make_user, make_forms
+
+def _count(form_type, status):
+    return db.session.scalar(select(FormStats.count).where(FormStats.form_type == form_type,
+                                                           FormStats.status == status))
+
+def test_missing_counter_is_seeded_from_the_table(app_context):
+    student = make_user('student', student_id='STU001')
+    db.session.flush()
+    make_forms('hostel', student, 3)
+    db.session.execute(delete(FormStats))
+
+    stats.record_form_created('hostel')
+    assert _count('hostel', 'pending') == 3
+
+def test_counter_created_concurrently_gets_the_delta(app_context, monkeypatch):
+    # The UPDATE finds no row, but another first submission inserts it before ours
+    student = make_user('student', student_id='STU001')
+    db.session.flush()
+    make_forms('hostel', student, 2)
+    db.session.commit()
+    assert _count('hostel', 'pending') == 2
+    monkeypatch.setattr(stats, 'update', lambda table: update(table).where(false()))
+
+    stats.record_form_created('hostel')
+    assert _count('hostel', 'pending') == 3
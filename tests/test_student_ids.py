@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+from sqlalchemy import delete, update
+
+from app import db
+from models import Counter, STUDENT_ID_LIMIT, allocate_student_numbers
+from conftest import make_user
+
+def test_concurrent_allocation_is_unique_and_gap_free(app):
+    workers, per_worker = 8, 5
+    allocated = []
+    errors = []
+    lock = threading.Lock()
+    start = threading.Barrier(workers)
+
+    def allocate():
+        try:
+            start.wait()
+            for _ in range(per_worker):
+                with app.app_context():
+                    numbers = allocate_student_numbers()
+                    db.session.commit()
+                with lock:
+                    allocated.extend(numbers)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=allocate) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sorted(allocated) == list(range(1, workers * per_worker + 1))
+
+def test_block_allocation_is_consecutive(app_context):
+    assert allocate_student_numbers(3) == [1, 2, 3]
+    assert allocate_student_numbers(2) == [4, 5]
+
+def test_allocation_stops_at_the_limit(app_context):
+    db.session.execute(update(Counter).where(Counter.name == 'student_id').values(value=STUDENT_ID_LIMIT - 1))
+    db.session.commit()
+
+    with pytest.raises(ValueError):
+        allocate_student_numbers(2)
+    db.session.rollback()
+    assert allocate_student_numbers() == [STUDENT_ID_LIMIT]
+    db.session.commit()
+    with pytest.raises(ValueError):
+        allocate_student_numbers()
+
+def test_generate_student_id_at_the_ceiling(app_context):
+    db.session.execute(update(Counter).where(Counter.name == 'student_id').values(value=STUDENT_ID_LIMIT - 1))
+    user = make_user('last')
+    user.generate_student_id()
+    assert user.student_id == f'STU{STUDENT_ID_LIMIT}'
+    db.session.commit()
+
+    with pytest.raises(ValueError):
+        make_user('one_too_many').generate_student_id()
+
+def test_counter_is_seeded_from_existing_students(app_context):
+    make_user('old_a', student_id='STU004')
+    make_user('old_b', student_id='STU007')
+    make_user('admin', is_admin=True)
+    db.session.execute(delete(Counter).where(Counter.name == 'student_id'))
+    db.session.commit()
+
+    assert allocate_student_numbers() == [8]
+    db.session.commit()
+    assert db.session.get(Counter, 'student_id').value == 8
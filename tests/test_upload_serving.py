@@ -0,0 +1,110 @@
+import hashlib
+import os
+
+import pytest
+
+from app import db
+import uploads
+from conftest import login, make_user
+
+BODY = b'0123456789' * 100
+
+@pytest.fixture
+def client(app):
+    with app.app_context():
+        make_user('student', student_id='STU001')
+        db.session.commit()
+    client = app.test_client()
+    login(client, 'student')
+    return client
+
+def store(app, name, data):
+    path = os.path.join(app.config['UPLOAD_FOLDER'], name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as handle:
+        handle.write(data)
+    return name
+
+@pytest.fixture
+def upload(app, tmp_path, monkeypatch):
+    # send_from_directory resolves relative folders against the app root, not the test workdir
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    digest = hashlib.sha256(BODY).hexdigest()
+    return digest, store(app, uploads.content_name(digest, 'jpg'), BODY)
+
+def test_content_addressed_upload_is_immutable(client, upload):
+    digest, name = upload
+    response = client.get(f'/uploads/{name}')
+
+    assert response.status_code == 200
+    assert response.data == BODY
+    assert response.headers['ETag'] == f'"{digest}"'
+    cache_control = response.headers['Cache-Control']
+    assert {'private', 'immutable', 'max-age=31536000'} <= set(cache_control.replace(' ', '').split(','))
+    assert 'no-cache' not in cache_control and 'public' not in cache_control
+
+def test_matching_etag_revalidates_with_304(client, upload):
+    digest, name = upload
+    response = client.get(f'/uploads/{name}', headers={'If-None-Match': f'"{digest}"'})
+
+    assert response.status_code == 304
+    assert response.data == b''
+    assert 'immutable' in response.headers['Cache-Control']
+
+def test_range_requests_get_partial_content(client, upload):
+    digest, name = upload
+    response = client.get(f'/uploads/{name}', headers={'Range': 'bytes=10-19'})
+
+    assert response.status_code == 206
+    assert response.data == BODY[10:20]
+    assert response.headers['Content-Range'] == f'bytes 10-19/{len(BODY)}'
+
+def test_if_range_with_a_stale_etag_sends_the_whole_file(client, upload):
+    digest, name = upload
+    response = client.get(f'/uploads/{name}', headers={'Range': 'bytes=10-19', 'If-Range': '"stale"'})
+    assert (response.status_code, response.data) == (200, BODY)
+
+    response = client.get(f'/uploads/{name}', headers={'Range': 'bytes=10-19', 'If-Range': f'"{digest}"'})
+    assert (response.status_code, response.data) == (206, BODY[10:20])
+
+def test_thumbnail_has_its_own_etag(app, client, upload):
+    digest, name = upload
+    response = client.get(f'/uploads/{name}?thumb=1')
+    # Not generated yet: the original, without long-lived caching
+    assert response.data == BODY
+    assert 'immutable' not in response.headers.get('Cache-Control', '')
+
+    store(app, uploads.thumbnail_name(name), b'thumbnail')
+    response = client.get(f'/uploads/{name}?thumb=1')
+    assert response.data == b'thumbnail'
+    assert response.headers['ETag'] == f'"{digest}.thumb"'
+    assert 'immutable' in response.headers['Cache-Control']
+
+def test_accel_redirect_hands_the_body_to_nginx(app, client, upload, monkeypatch):
+    digest, name = upload
+    monkeypatch.setitem(app.config, 'UPLOAD_ACCEL_REDIRECT', '/protected-uploads/')
+    response = client.get(f'/uploads/{name}')
+
+    assert response.status_code == 200
+    assert response.headers['X-Accel-Redirect'] == f'/protected-uploads/{name}'
+    assert response.mimetype == 'image/jpeg'
+    assert response.data == b''
+    assert response.headers['ETag'] == f'"{digest}"'
+    assert 'immutable' in response.headers['Cache-Control']
+
+    response = client.get(f'/uploads/{name}', headers={'If-None-Match': f'"{digest}"'})
+    assert response.status_code == 304
+    assert 'X-Accel-Redirect' not in response.headers
+
+def test_legacy_uploads_are_not_cached_long(app, client, upload):
+    name = store(app, '20240101_120000_photo.jpg', BODY)
+    response = client.get(f'/uploads/{name}')
+
+    assert (response.status_code, response.data) == (200, BODY)
+    assert 'immutable' not in response.headers.get('Cache-Control', '')
+    assert response.headers['ETag'] != f'"{uploads.digest_from_name(name)}"'
+
+def test_uploads_need_a_login(app, upload):
+    digest, name = upload
+    response = app.test_client().get(f'/uploads/{name}')
+    assert response.status_code == 302
@@ -0,0 +1,62 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+from sqlalchemy import select
+from werkzeug.datastructures import FileStorage
+
+from app import db
+from models import StoredFile
+import uploads
+
+@pytest.fixture
+def folder(app, app_context, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    # Thumbnails inline, so the test sees them without waiting on the pool
+    monkeypatch.setattr(uploads, '_in_background', lambda fn, *args: fn(*args))
+    return tmp_path
+
+def image_upload(filename, size, color='red'):
+    data = io.BytesIO()
+    Image.new('RGB', size, color).save(data, 'PNG' if filename.endswith('.png') else 'JPEG')
+    return FileStorage(io.BytesIO(data.getvalue()), filename=filename)
+
+def test_identical_uploads_share_one_file(folder):
+    first = uploads.store_upload(image_upload('photo.jpg', (40, 30)))
+    second = uploads.store_upload(image_upload('IMG_0001.JPEG', (40, 30)))
+    other = uploads.store_upload(image_upload('other.jpg', (40, 30), color='blue'))
+
+    assert first == second != other
+    assert first == uploads.content_name(uploads.digest_from_name(first), 'jpg')
+    assert dict(db.session.execute(select(StoredFile.filename, StoredFile.ref_count)).all()) == {first: 2, other: 1}
+    assert sorted(path.name for path in folder.rglob('*.jpg') if '.thumb' not in path.name) == sorted(
+        os.path.basename(name) for name in (first, other))
+
+def test_large_images_are_downscaled_and_thumbnailed(app, folder, monkeypatch):
+    monkeypatch.setitem(app.config, 'UPLOAD_MAX_DIMENSION', 200)
+    monkeypatch.setitem(app.config, 'UPLOAD_THUMBNAIL_SIZE', 50)
+    name = uploads.store_upload(image_upload('scan.png', (800, 400)))
+
+    with Image.open(folder / name) as image:
+        assert (image.format, image.size) == ('PNG', (200, 100))
+    with Image.open(folder / uploads.thumbnail_name(name)) as thumbnail:
+        assert (thumbnail.format, thumbnail.size) == ('JPEG', (50, 25))
+    assert db.session.get(StoredFile, uploads.digest_from_name(name)).size == os.path.getsize(folder / name)
+
+def test_non_images_are_stored_as_sent(folder):
+    name = uploads.store_upload(FileStorage(io.BytesIO(b'%PDF-1.4 not an image'), filename='marks.pdf'))
+
+    assert name.endswith('.pdf')
+    assert (folder / name).read_bytes() == b'%PDF-1.4 not an image'
+    assert not (folder / uploads.thumbnail_name(name)).exists()
+
+def test_gc_removes_only_unreferenced_uploads(app, folder):
+    name = uploads.store_upload(image_upload('photo.jpg', (40, 30)))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['gc-uploads'])
+
+    assert 'Removed 1 unreferenced uploads' in result.output
+    assert not (folder / name).exists() and not (folder / uploads.thumbnail_name(name)).exists()
+    assert db.session.scalar(select(StoredFile)) is None
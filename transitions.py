@@ -0,0 +1,71 @@
+from sqlalchemy import select, update
+
+from app import db
+from models import FORM_MODELS
+import events
+import stats
+
+FORM_STATUSES = ('pending', 'approved', 'rejected')
+
+# Ids per UPDATE ... WHERE id IN (...), below SQLite's bound-parameter limit
+BULK_CHUNK_SIZE = 500
+
+def record_status_events(form_type, form_ids, old_status, new_status, actor_id=None):
+    # One event row per form, handed to the event log writer once the transaction commits
+    events.stage_events(db.session, [
+        events.make_event(form_type, form_id, 'status', actor_id=actor_id,
+                          old_status=old_status, new_status=new_status)
+        for form_id in form_ids
+    ])
+
+def _chunks(ids):
+    for start in range(0, len(ids), BULK_CHUNK_SIZE):
+        yield ids[start:start + BULK_CHUNK_SIZE]
+
+def bulk_update_status(form_type, form_ids, new_status, expected_status=None, actor_id=None):
+    # Moves many forms to new_status with set-based UPDATEs. Each UPDATE only matches
+    # rows still in the status it was issued for, so a form changed concurrently is
+    # reported as a conflict instead of being overwritten. Returns {id: outcome} with
+    # outcome one of 'updated', 'unchanged', 'conflict' or 'not_found'.
+    if new_status not in FORM_STATUSES:
+        raise ValueError(f"Invalid status: {new_status}")
+    if expected_status is not None and expected_status not in FORM_STATUSES:
+        raise ValueError(f"Invalid expected status: {expected_status}")
+
+    model = FORM_MODELS[form_type]
+    form_ids = list(dict.fromkeys(form_ids))
+    if expected_status is not None:
+        source_statuses = [expected_status] if expected_status != new_status else []
+    else:
+        source_statuses = [status for status in FORM_STATUSES if status != new_status]
+
+    results = {}
+    for chunk in _chunks(form_ids):
+        for old_status in source_statuses:
+            rows = db.session.execute(
+                update(model)
+                .where(model.id.in_(chunk), model.status == old_status)
+                .values(status=new_status)
+                .returning(model.id, model.user_id)
+                .execution_options(synchronize_session=False)
+            ).all()
+            updated = [row.id for row in rows]
+            if updated:
+                stats.record_status_change(form_type, old_status, new_status, amount=len(updated),
+                                           user_ids={row.user_id for row in rows})
+                record_status_events(form_type, updated, old_status, new_status, actor_id)
+                results.update(dict.fromkeys(updated, 'updated'))
+
+        # Classify the ids that no UPDATE touched
+        remaining = [form_id for form_id in chunk if form_id not in results]
+        if remaining:
+            current = dict(db.session.execute(
+                select(model.id, model.status).where(model.id.in_(remaining))).all())
+            for form_id in remaining:
+                if form_id not in current:
+                    results[form_id] = 'not_found'
+                elif current[form_id] == new_status and expected_status in (None, new_status):
+                    results[form_id] = 'unchanged'
+                else:
+                    results[form_id] = 'conflict'
+    return {form_id: results[form_id] for form_id in form_ids}
@@ -0,0 +1,183 @@
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import click
+from flask import current_app
+from sqlalchemy import select, func
+
+from app import app, db, GEVENT_PATCHED
+from auth import run_blocking
+from models import StoredFile, AdmissionForm, HostelForm
+
+IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+
+# Form columns that hold upload names, used to recount references
+UPLOAD_COLUMNS = (
+    AdmissionForm.student_photo,
+    AdmissionForm.parent_photo,
+    HostelForm.parent_signature,
+    HostelForm.student_signature,
+    HostelForm.warden_signature,
+)
+
+CHUNK_SIZE = 64 * 1024
+
+_pool = None
+
+def content_name(digest, extension):
+    # Two-level fan-out keeps directories small: ab/abcdef....jpg
+    return f"{digest[:2]}/{digest}.{extension}"
+
+def thumbnail_name(name):
+    base, _ = os.path.splitext(name)
+    return f"{base}.thumb.jpg"
+
+def digest_from_name(name):
+    # Content-addressed names carry their sha256; legacy timestamp names return None
+    stem = os.path.splitext(os.path.basename(name))[0]
+    if stem.endswith('.thumb'):
+        stem = stem[:-len('.thumb')]
+    if len(stem) == 64 and all(char in '0123456789abcdef' for char in stem):
+        return stem
+    return None
+
+def etag_for(name):
+    # Strong validator for content-addressed files (thumbnails get their own tag)
+    digest = digest_from_name(name)
+    if digest is None:
+        return None
+    return f"{digest}.thumb" if name.endswith('.thumb.jpg') else digest
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=current_app.config['UPLOAD_WORKERS'],
+                                   thread_name_prefix='upload')
+    return _pool
+
+def _in_background(fn, *args):
+    # Under gevent the executor's threads would be greenlets, and Pillow decoding in them would
+    # stall every request of the worker: the hub's pool of real threads runs them instead
+    if GEVENT_PATCHED:
+        from gevent import get_hub
+        get_hub().threadpool.spawn(fn, *args)
+    else:
+        _get_pool().submit(fn, *args)
+
+def _downscale(data, extension, max_dimension, quality):
+    # Returns re-encoded bytes when the image exceeds max_dimension, otherwise the original
+    try:
+        from PIL import Image
+    except ImportError:
+        return data
+    if extension not in IMAGE_EXTENSIONS or extension == 'gif':
+        return data
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if max(image.size) <= max_dimension:
+                return data
+            image.draft('RGB', (max_dimension, max_dimension))
+            image.thumbnail((max_dimension, max_dimension))
+            output = io.BytesIO()
+            if extension in ('jpg', 'jpeg'):
+                image.convert('RGB').save(output, 'JPEG', quality=quality, optimize=True)
+            else:
+                image.save(output, 'PNG', optimize=True)
+            return output.getvalue()
+    except OSError:
+        # Not a readable image; keep the bytes the student sent
+        return data
+
+def make_thumbnail(folder, name, size, quality):
+    try:
+        from PIL import Image
+    except ImportError:
+        return
+    target = os.path.join(folder, thumbnail_name(name))
+    if os.path.exists(target):
+        return
+    try:
+        with Image.open(os.path.join(folder, name)) as image:
+            image.draft('RGB', (size, size))
+            image.thumbnail((size, size))
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as handle:
+                image.convert('RGB').save(handle, 'JPEG', quality=quality, optimize=True)
+            os.replace(tmp_path, target)
+    except OSError:
+        logging.exception("Thumbnail generation failed for %s", name)
+
+def _add_reference(digest, name, size):
+    # Atomic upsert so two students uploading the same file at once both succeed
+    dialect = db.session.get_bind().dialect.name
+    # Only the dialect in use is imported; the PostgreSQL one is a noticeable share of startup
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    stmt = insert(StoredFile).values(digest=digest, filename=name, size=size, ref_count=1,
+                                     created_at=datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(index_elements=[StoredFile.digest],
+                                      set_={'ref_count': StoredFile.ref_count + 1})
+    db.session.execute(stmt)
+
+def store_upload(file):
+    # Stores an uploaded FileStorage under its sha256 and returns the relative name
+    config = current_app.config
+    folder = config['UPLOAD_FOLDER']
+    extension = file.filename.rsplit('.', 1)[1].lower()
+    if extension == 'jpeg':
+        extension = 'jpg'
+
+    data = file.read()
+    digest = hashlib.sha256(data).hexdigest()
+    name = content_name(digest, extension)
+    path = os.path.join(folder, name)
+
+    if not os.path.exists(path):
+        data = run_blocking(_downscale, data, extension, config['UPLOAD_MAX_DIMENSION'],
+                            config['UPLOAD_JPEG_QUALITY'])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(data)
+        # Atomic publish; a concurrent identical upload just replaces equal bytes
+        os.replace(tmp_path, path)
+        if extension in IMAGE_EXTENSIONS:
+            _in_background(make_thumbnail, folder, name,
+                           config['UPLOAD_THUMBNAIL_SIZE'], config['UPLOAD_JPEG_QUALITY'])
+
+    _add_reference(digest, name, len(data))
+    return name
+
+def recount_references():
+    counts = {}
+    for column in UPLOAD_COLUMNS:
+        rows = db.session.execute(
+            select(column, func.count()).where(column.isnot(None)).group_by(column))
+        for name, total in rows:
+            counts[name] = counts.get(name, 0) + total
+    for stored in StoredFile.query.all():
+        stored.ref_count = counts.get(stored.filename, 0)
+    db.session.flush()
+
+@app.cli.command('gc-uploads')
+def gc_uploads_command():
+    """Recount upload references and delete files no form points at."""
+    recount_references()
+    folder = current_app.config['UPLOAD_FOLDER']
+    removed = 0
+    for stored in StoredFile.query.filter(StoredFile.ref_count <= 0).all():
+        for name in (stored.filename, thumbnail_name(stored.filename)):
+            path = os.path.join(folder, name)
+            if os.path.exists(path):
+                os.remove(path)
+        db.session.delete(stored)
+        removed += 1
+    db.session.commit()
+    click.echo(f"Removed {removed} unreferenced uploads")